@@ -0,0 +1,111 @@
+"""P/L analytics over a synthetic positions table.
+
+    python -m benchmarks.analytics [rows] [orm_rows]
+
+Fills a scratch database with ``rows`` closed positions (50 traders, 200
+symbols, two years) and times:
+
+- the ORM baseline: ``Position`` objects read through SQLAlchemy and
+  summed per trader and month in Python, on the first ``orm_rows`` rows
+  and extrapolated;
+- ``analytics`` streaming the table in chunks into numpy and aggregating
+  it per day, week and month;
+- rebuilding the ``pnl_daily`` rollup and a monthly report from it;
+- a Parquet export, if pyarrow is installed.
+"""
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bitget_trader import analytics
+from bitget_trader.db import init_db, make_engine
+from bitget_trader.models import Position
+
+def _fill(path: Path, rows: int):
+    asyncio.run(_create(path))
+    rng = np.random.default_rng(1)
+    start = np.datetime64("2023-01-01T00:00:00", "us")
+    with sqlite3.connect(path) as conn:
+        for offset in range(0, rows, 100_000):
+            n = min(100_000, rows - offset)
+            opened = start + rng.integers(0, 730 * 86_400_000_000, n).astype("timedelta64[us]")
+            closed = opened + rng.integers(60_000_000, 7 * 86_400_000_000, n).astype("timedelta64[us]")
+            buy = rng.uniform(10, 1000, n)
+            sell = buy * rng.normal(1.0, 0.05, n)
+            fee = buy * 0.001
+            conn.executemany(
+                "INSERT INTO positions (user_id, symbol, status, qty, avg_cost_usdt, total_buy_fees, total_sell_fees,"
+                " total_buy_amount, total_sell_amount, realised_pnl, opened_at, closed_at)"
+                " VALUES (?, ?, 'CLOSED', ?, 100.0, ?, ?, ?, ?, ?, ?, ?)",
+                zip((f"t{i}" for i in rng.integers(0, 50, n).tolist()),
+                    (f"C{i}USDT" for i in rng.integers(0, 200, n).tolist()),
+                    (buy / 100).tolist(), fee.tolist(), fee.tolist(), buy.tolist(), sell.tolist(),
+                    (sell - buy - 2 * fee).tolist(),
+                    np.datetime_as_string(opened).tolist(), np.datetime_as_string(closed).tolist()),
+            )
+
+async def _create(path: Path):
+    engine = make_engine(path)
+    await init_db(engine)
+    await engine.dispose()
+
+async def _orm(path: Path, limit: int) -> float:
+    engine = make_engine(path)
+    session = async_sessionmaker(engine, expire_on_commit=False)
+    started = time.perf_counter()
+    totals: dict[tuple, list[float]] = defaultdict(lambda: [0, 0, 0.0])
+    async with session() as sess:
+        result = await sess.stream_scalars(select(Position).where(Position.status == "CLOSED").limit(limit))
+        async for pos in result:
+            row = totals[(pos.user_id, pos.closed_at.strftime("%Y-%m"))]
+            row[0] += 1
+            row[1] += pos.realised_pnl > 0
+            row[2] += pos.realised_pnl
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return elapsed
+
+def _timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:34s} {time.perf_counter() - started:7.2f}s")
+    return result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    orm_rows = min(int(sys.argv[2]) if len(sys.argv) > 2 else 100_000, rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.sqlite3"
+        _timed(f"fill {rows} positions", lambda: _fill(path, rows))
+        orm = asyncio.run(_orm(path, orm_rows))
+        print(f"{'ORM, per trader and month':34s} {orm * rows / orm_rows:7.2f}s  "
+              f"(extrapolated from {orm_rows} rows in {orm:.2f}s)")
+        for period in analytics.PERIODS:
+            groups = _timed(f"numpy, per trader and {period}", lambda: analytics.aggregate(
+                analytics.read_facts(path), period, ("user_id",)))
+        print(f"{'':34s} {len(groups['month'])} trader-months")
+        _timed("numpy, per trader, day and symbol", lambda: analytics.aggregate(
+            analytics.read_facts(path), "day"))
+        groups = _timed("rebuild pnl_daily", lambda: analytics.rebuild(path))
+        print(f"{'':34s} {groups} rollup rows")
+        _timed("monthly report from pnl_daily", lambda: analytics.aggregate(
+            analytics.read_rollup(path), "month", ("user_id",)))
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("parquet export skipped, pyarrow is not installed")
+        else:
+            _timed("parquet export", lambda: analytics.export(path, Path(tmp) / "positions.parquet"))
+
+if __name__ == "__main__":
+    main()
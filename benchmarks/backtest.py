@@ -0,0 +1,76 @@
+"""Backtest throughput on synthetic candles and signals.
+
+    python -m benchmarks.backtest [days] [runs]
+
+Writes a month (by default) of one-minute candles for 10 symbols, a random
+walk each, and a buy or sell signal every ten minutes for 5 traders, then
+reports:
+
+- one run: signals, fills, simulated time covered and wall time taken;
+- a grid of ``runs`` fee and slippage settings, run one after another in
+  this process and then spread over a process pool.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bitget_trader import backtest
+
+SYMBOLS = [f"C{i}USDT" for i in range(10)]
+TRADERS = [f"t{i}" for i in range(5)]
+START = 1_704_067_200  # 2024-01-01
+
+def _write(directory: Path, days: int):
+    rng = np.random.default_rng(1)
+    candles = directory / "candles"
+    candles.mkdir()
+    minutes = days * 1440
+    times = (START + 60 * np.arange(minutes)) * 1000
+    for symbol in SYMBOLS:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, minutes)))
+        opens = np.concatenate([[100.0], close[:-1]])
+        rows = np.column_stack([times, opens, np.maximum(opens, close), np.minimum(opens, close), close,
+                                rng.uniform(1_000, 10_000, minutes)])
+        np.savetxt(candles / f"{symbol}.csv", rows, fmt=["%d"] + ["%.6f"] * 5, delimiter=",")
+    signals = directory / "signals.jsonl"
+    with open(signals, "w") as fh:
+        for n, ts in enumerate(range(START + 30, START + days * 86_400, 600)):
+            symbol = SYMBOLS[n % len(SYMBOLS)]
+            body = {"ts": ts, "type": "buy", "symbol": symbol, "amount": 50} if rng.random() < 0.6 else \
+                {"ts": ts, "type": "sell", "symbol": symbol}
+            fh.write(json.dumps(body) + "\n")
+    return str(signals), str(candles)
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    with tempfile.TemporaryDirectory() as tmp:
+        signals, candles = _write(Path(tmp), days)
+        base = backtest.BacktestJob(signals, candles, traders=TRADERS)
+        report = backtest.run(base)
+        totals = report["totals"]
+        print(f"one run: {report['signals']} signals, {totals['fills']} fills, {totals['trades']} trades; "
+              f"{report['virtual_seconds'] / 86_400:.1f} simulated days in {report['wall_seconds']:.2f}s "
+              f"({report['virtual_seconds'] / report['wall_seconds']:,.0f}x real time)")
+
+        half = max(runs // 2, 1)
+        jobs = backtest.jobs_for(base, {"fee_rate": [0.001, 0.002], "slippage_bps": list(range(half))})
+        started = time.perf_counter()
+        for job in jobs:
+            backtest.run(job)
+        serial = time.perf_counter() - started
+        started = time.perf_counter()
+        backtest.run_many(jobs)
+        pooled = time.perf_counter() - started
+        print(f"{len(jobs)} runs: serial {serial:.2f}s, process pool ({os.cpu_count()} CPUs) {pooled:.2f}s "
+              f"({serial / pooled:.1f}x)")
+
+if __name__ == "__main__":
+    main()
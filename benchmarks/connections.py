@@ -0,0 +1,84 @@
+"""First-request latency after quiet periods, with and without the shared pool.
+
+    python -m benchmarks.connections [clients] [rounds] [rtt_ms]
+
+Points ``clients`` ccxt clients at a local HTTPS stand-in for Bitget,
+behind a proxy adding ``rtt_ms`` of round-trip time, whose server drops
+connections idle for a second. Each round waits longer than that and then
+has every client call ``fetch_time`` once, like traders woken by an
+alert. Compares:
+
+- ccxt's default, a private session per client;
+- the shared ``ConnectionPool`` without keep-warm;
+- the shared pool pinging the server every half second.
+
+Reports the median and worst latency of those requests and how many TLS
+handshakes the server saw.
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+
+from bitget_trader.config import _HttpCfg
+from bitget_trader.connections import ConnectionPool
+from .mock_bitget import FakeRestServer, self_signed
+
+IDLE = 1.5  # seconds between rounds; the server closes connections idle for 1s
+
+def _client(url: str, context, pool: ConnectionPool | None):
+    import ccxt.async_support as ccxt
+    client = ccxt.bitget({})
+    client.urls["api"] = dict.fromkeys(client.urls["api"], url)
+    client.ssl_context = context  # trust the stand-in's certificate
+    if pool is not None:
+        pool.attach(client)
+    return client
+
+async def _timed(client) -> float:
+    started = time.perf_counter()
+    await client.fetch_time()
+    return time.perf_counter() - started
+
+async def _mode(server_ctx, client_ctx, clients: int, rounds: int, rtt: float, pool_cfg: _HttpCfg | None):
+    async with FakeRestServer(server_ctx, rtt=rtt, keepalive=1.0) as server:
+        pool = None
+        if pool_cfg is not None:
+            pool = ConnectionPool(pool_cfg.model_copy(update={"ping_urls": [server.url + "/api/v2/public/time"]}),
+                                  ssl_context=client_ctx)
+            await pool.start()
+        exchanges = [_client(server.url, client_ctx, pool) for _ in range(clients)]
+        await asyncio.gather(*(c.fetch_time() for c in exchanges))  # connected once, as after startup
+        handshakes = server.connections
+        latencies = []
+        for _ in range(rounds):
+            await asyncio.sleep(IDLE)
+            latencies += await asyncio.gather(*(_timed(c) for c in exchanges))
+        handshakes = server.connections - handshakes
+        await asyncio.gather(*(c.close() for c in exchanges))
+        if pool is not None:
+            await pool.close()
+    return statistics.median(latencies) * 1000, max(latencies) * 1000, handshakes
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rtt = (float(sys.argv[3]) if len(sys.argv) > 3 else 50.0) / 1000
+    modes = {
+        "session per client (ccxt default)": None,
+        "shared pool": _HttpCfg(keep_warm=0),
+        "shared pool + keep-warm": _HttpCfg(keep_warm=0.5, warm_connections=clients),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        server_ctx, client_ctx = self_signed(tmp)
+        print(f"{clients} clients, {rounds} rounds after {IDLE}s idle, {rtt * 1000:.0f}ms RTT")
+        print(f"{'':36s} {'median ms':>10} {'max ms':>8} {'handshakes':>11}")
+        for name, cfg in modes.items():
+            median, worst, handshakes = asyncio.run(_mode(server_ctx, client_ctx, clients, rounds, rtt, cfg))
+            print(f"{name:36s} {median:10.1f} {worst:8.1f} {handshakes:11d}")
+
+if __name__ == "__main__":
+    main()
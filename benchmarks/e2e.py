@@ -0,0 +1,147 @@
+"""End-to-end webhook latency and throughput against a mock Bitget.
+
+    python -m benchmarks.e2e [--traders N] [--symbols M] [--bursts K] [--balance-max-age S] [--compare FILE]
+
+``receiver.app`` runs in-process with its real lifespan, dispatcher,
+ledger, position book and notifier; only the ccxt client, Telegram and
+the database location are replaced (see ``benchmarks/harness.py``). Each
+burst posts one alert per symbol at once, buys and sells alternating, and
+waits until every trader's order has been seen filled.
+
+Alert-to-order runs from just before the POST to the mock accepting the
+order, alert-to-fill to the trader first seeing it filled.
+``--balance-max-age 0`` makes every buy find its cached balance stale, as
+the first buy after a quiet spell does. Results are
+written to ``benchmarks/results/e2e-<commit>.json``; ``--compare`` prints
+the change against an earlier file.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+from bitget_trader.config import settings
+
+from .harness import alert, running_app
+from .mock_bitget import MockBitget, StubBot
+
+RESULTS = Path(__file__).resolve().parent / "results"
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[max(int(len(values) * q + 0.5) - 1, 0)] if values else 0.0
+
+def _ms(values: list[float]) -> dict[str, float]:
+    return {"p50": round(_pct(values, 0.50) * 1000, 3), "p99": round(_pct(values, 0.99) * 1000, 3)}
+
+def _commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def _run(args) -> dict:
+    saved = settings.balance
+    if args.balance_max_age is not None:
+        settings.balance = saved.model_copy(update={"max_age": args.balance_max_age})
+    try:
+        return await _bursts(args)
+    finally:
+        settings.balance = saved
+
+async def _bursts(args) -> dict:
+    venue = MockBitget(latency=args.latency, fill_delay=args.fill_delay, markets=max(args.symbols, 4))
+    symbols = [m["id"] for m in venue.markets[:args.symbols]]
+    to_order, to_fill, accept = [], [], []
+    by_side: dict[str, list[float]] = {"buy": [], "sell": []}
+    busy = 0.0
+    async with running_app(venue, args.traders, StubBot(args.telegram_latency)) as client:
+        for burst in range(args.bursts):
+            side = "buy" if burst % 2 == 0 else "sell"
+            start, expected = len(venue.log), venue.filled() + args.traders * len(symbols)
+            sent: dict[str, float] = {}
+
+            async def post(symbol: str):
+                sent[symbol] = time.perf_counter()
+                r = await client.post("/webhook", json=alert(side, symbol, args.amount if side == "buy" else None,
+                                                              id=f"{burst}-{symbol}"))
+                r.raise_for_status()
+                accept.append(time.perf_counter() - sent[symbol])
+
+            began = time.perf_counter()
+            await asyncio.gather(*(post(s) for s in symbols))
+            await venue.wait_filled(expected, args.timeout)
+            busy += time.perf_counter() - began
+            for order in venue.log[start:]:
+                t0 = sent[order.symbol.replace("/", "")]
+                to_order.append(order.created - t0)
+                by_side[order.side].append(order.created - t0)
+                to_fill.append(order.seen_filled - t0)
+    orders = len(to_order)
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("compare", "out")},
+        "orders": orders,
+        "throughput_orders_per_s": round(orders / busy, 2) if busy else 0.0,
+        "webhook_ms": _ms(accept),
+        "alert_to_order_ms": _ms(to_order),
+        "buy_to_order_ms": _ms(by_side["buy"]),
+        "sell_to_order_ms": _ms(by_side["sell"]),
+        "alert_to_fill_ms": _ms(to_fill),
+        "exchange_calls": dict(sorted(venue.calls.items())),
+    }
+
+def _compare(new: dict, old: dict):
+    print(f"vs {old['commit']}:")
+    rows = [("throughput_orders_per_s", None)] + [
+        (k, q) for k in ("webhook_ms", "alert_to_order_ms", "buy_to_order_ms", "sell_to_order_ms",
+                         "alert_to_fill_ms") for q in ("p50", "p99")
+        if k in old and k in new
+    ]
+    for key, q in rows:
+        a = old[key][q] if q else old[key]
+        b = new[key][q] if q else new[key]
+        change = (b - a) / a * 100 if a else 0.0
+        print(f"  {key + (' ' + q if q else ''):28} {a:10.2f} -> {b:10.2f}  ({change:+.1f}%)")
+
+def main(argv: list[str] | None = None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--traders", type=int, default=5)
+    p.add_argument("--symbols", type=int, default=10)
+    p.add_argument("--bursts", type=int, default=6, help="alternating buy and sell bursts")
+    p.add_argument("--amount", type=float, default=50.0, help="USDT per buy")
+    p.add_argument("--latency", type=float, default=0.02, help="seconds per mock exchange call")
+    p.add_argument("--fill-delay", type=float, default=0.05, help="seconds from accept to fill")
+    p.add_argument("--telegram-latency", type=float, default=0.05)
+    p.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for a burst to fill")
+    p.add_argument("--balance-max-age", type=float, help="override balance.max_age, e.g. 0 for always stale")
+    p.add_argument("--out", type=Path, default=RESULTS)
+    p.add_argument("--compare", type=Path, help="earlier result file to diff against")
+    args = p.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with contextlib.redirect_stdout(io.StringIO()):  # the receiver prints every signal
+        result = asyncio.run(_run(args))
+
+    print(f"{result['orders']} orders, {result['throughput_orders_per_s']:.1f} orders/s")
+    for key in ("webhook_ms", "alert_to_order_ms", "buy_to_order_ms", "sell_to_order_ms", "alert_to_fill_ms"):
+        print(f"  {key:18} p50 {result[key]['p50']:8.1f} ms  p99 {result[key]['p99']:8.1f} ms")
+    args.out.mkdir(parents=True, exist_ok=True)
+    path = args.out / f"e2e-{result['commit']}.json"
+    path.write_text(json.dumps(result, indent=2) + "\n")
+    print(f"saved {path}")
+    if args.compare:
+        _compare(result, json.loads(args.compare.read_text()))
+
+if __name__ == "__main__":
+    main()
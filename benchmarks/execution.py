@@ -0,0 +1,49 @@
+"""Slippage of a large market buy, whole vs. sliced, on a thin mock order book.
+
+    python -m benchmarks.execution [usdt] [depth] [refill]
+
+One trader buys ``usdt`` of BTC through the whole app, once per execution
+mode. The mock book holds ``depth`` BTC per 0.1% price level and refills
+``refill`` levels per second; TWAP sends 4 children 2 s apart, iceberg
+children of at most a quarter of the order at the same spacing. Reports
+the average price against the mid and how long the order took.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+from benchmarks.harness import alert, running_app
+from benchmarks.mock_bitget import MockBitget
+from bitget_trader.config import _ExecutionCfg, settings
+
+MID = 100.0
+
+async def _run(mode: str, usdt: float, depth: float, refill: float) -> tuple[float, float, int]:
+    venue = MockBitget(latency=0.02, fill_delay=0.05, price=MID, depth=depth, refill=refill)
+    async with running_app(venue, traders=1) as client:
+        started = time.perf_counter()
+        await client.post("/webhook", json=alert("buy", "BTCUSDT", usdt, execution=mode))
+        await venue.wait_filled(1 if mode == "market" else 4, timeout=60)
+        elapsed = time.perf_counter() - started
+    amount = sum(o.amount for o in venue.log)
+    cost = sum(o.cost for o in venue.log)
+    return cost / amount, elapsed, len(venue.log)
+
+def main():
+    usdt = float(sys.argv[1]) if len(sys.argv) > 1 else 5000.0
+    depth = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    refill = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    saved = settings.execution
+    settings.execution = _ExecutionCfg(slices=4, max_slice=usdt / 4, interval=2.0)
+    try:
+        for mode in ("market", "twap", "iceberg"):
+            price, elapsed, orders = asyncio.run(_run(mode, usdt, depth, refill))
+            print(f"{mode:8s}: avg ${price:,.4f} ({(price / MID - 1) * 1e4:6.1f} bps over the mid), "
+                  f"{orders} orders, {elapsed:5.2f}s")
+    finally:
+        settings.execution = saved
+
+if __name__ == "__main__":
+    main()
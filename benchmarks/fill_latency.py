@@ -0,0 +1,93 @@
+"""Fill detection latency: 1s REST polling vs. the private order stream.
+
+    python -m benchmarks.fill_latency [orders]
+
+Each order fills after a random delay; we report how long after the fill
+``Trader._await_fill`` noticed it and how many REST ``fetch_order`` calls it
+spent doing so.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import sys
+from types import SimpleNamespace
+
+from pydantic import SecretStr
+
+from bitget_trader.trader import Trader
+from bitget_trader.ws import OrderStream
+from .mock_bitget import FakeOrderServer, order_message
+
+REST_LATENCY = 0.05
+CONCURRENCY = 10
+
+class PollClient:
+    def __init__(self, fills: dict[str, float]):
+        self.fills = fills
+        self.calls = 0
+
+    async def fetch_order(self, order_id, symbol):
+        self.calls += 1
+        await asyncio.sleep(REST_LATENCY)
+        loop = asyncio.get_running_loop()
+        done = loop.time() >= self.fills[order_id]
+        return {"id": order_id, "status": "closed" if done else "open"}
+
+def _trader(stream: bool) -> Trader:
+    cfg = SimpleNamespace(
+        id="bench", api_key=SecretStr("k"), api_secret=SecretStr("s"), passphrase=SecretStr("p"),
+        demo_mode=False, notify_chat=0, order_stream=stream,
+    )
+    return Trader(cfg)
+
+async def _run(orders: int, stream: bool) -> tuple[list[float], int]:
+    loop = asyncio.get_running_loop()
+    fills: dict[str, float] = {}
+    trader = _trader(stream)
+    client = trader._exchange._client = PollClient(fills)
+    server = None
+    if stream:
+        server = await FakeOrderServer().__aenter__()
+        trader._exchange.orders = OrderStream("k", "s", "p", url=server.url)
+        await trader._exchange.orders.start()
+        await server.subscribed.wait()
+
+    gate = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i: int) -> float:
+        async with gate:
+            return await detect(str(i))
+
+    async def detect(oid: str) -> float:
+        delay = random.uniform(0, 1.5)
+        fills[oid] = loop.time() + delay
+        if server is not None:
+            async def push():
+                await asyncio.sleep(delay)
+                await server.push(order_message(oid))
+            asyncio.create_task(push())
+        await trader._await_fill(oid, "BTCUSDT")
+        return loop.time() - fills[oid]
+
+    latencies = await asyncio.gather(*(one(i) for i in range(orders)))
+    if server is not None:
+        await trader._exchange.orders.close()
+        await server.__aexit__()
+    return list(latencies), client.calls
+
+def main(orders: int = 200):
+    random.seed(1)
+    for stream in (False, True):
+        latencies, calls = asyncio.run(_run(orders, stream))
+        latencies.sort()
+        mode = "stream " if stream else "polling"
+        print(
+            f"{mode}: p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.1f} ms  "
+            f"REST calls/order {calls / orders:.2f}"
+        )
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,84 @@
+"""Run the real ``receiver.app`` in-process against :class:`MockBitget`.
+
+``patched`` swaps in the mock exchange client, a stub Telegram bot, a
+throwaway database and market cache; ``running_app`` also starts the app
+through its own lifespan and yields an ``httpx`` client bound to it.
+Everything is put back on exit.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+
+from bitget_trader import db, dedup, exchange, markets, receiver
+from bitget_trader import shards as sharding
+from bitget_trader.config import _TraderCfg, settings
+from bitget_trader.notifier import outbox
+from .mock_bitget import MockBitget, StubBot
+
+def trader_configs(count: int) -> list[_TraderCfg]:
+    return [
+        _TraderCfg(id=f"t{i}", api_key=f"key{i}", api_secret="secret", passphrase="pass", notify_chat=1000 + i)
+        for i in range(count)
+    ]
+
+def alert(type: str, symbol: str, amount: float | None = None, **extra) -> dict:
+    """A TradingView webhook body signed with the configured secret."""
+    body = {"auth": settings.tradingview_secret.get_secret_value(), "type": type, "symbol": symbol, **extra}
+    if amount is not None:
+        body["amount"] = amount
+    return body
+
+@asynccontextmanager
+async def patched(venue: MockBitget, traders: int = 2, bot: StubBot | None = None, data_dir: str | None = None):
+    """Point the app at ``venue``, a stub bot and a (temporary) data directory."""
+    saved = (settings.traders, settings.shards, exchange.client_factory, markets.CACHE_DIR,
+             db.engine, db.async_session, outbox._bot, receiver._public_ip, sharding.worker_target, dedup.seen,
+             settings.journal, settings.tickers, settings.http, settings.reload)
+    with contextlib.nullcontext(data_dir) if data_dir else tempfile.TemporaryDirectory() as tmp:
+        settings.traders = trader_configs(traders)
+        exchange.client_factory = venue.client
+        markets.CACHE_DIR = Path(tmp)
+        markets._caches.clear()
+        db.configure(Path(tmp) / "bench.sqlite3")
+        outbox._bot = bot or StubBot()
+        receiver._public_ip = lambda: "127.0.0.1"
+        dedup.seen = dedup.DedupCache(settings.dedup.ttl, settings.dedup.max_entries)
+        settings.journal = settings.journal.model_copy(update={"path": str(Path(tmp) / "journal")})
+        settings.tickers = settings.tickers.model_copy(update={"stream": False})  # prices over REST from the mock
+        settings.http = settings.http.model_copy(update={"ping_urls": []})  # no keep-warm pings to Bitget
+        settings.reload = settings.reload.model_copy(update={"watch": False})  # not the local config.yaml
+        sharding.worker_target = functools.partial(shard_worker, venue.settings(), traders, tmp)
+        try:
+            yield
+        finally:
+            await db.engine.dispose()
+            markets._caches.clear()
+            (settings.traders, settings.shards, exchange.client_factory, markets.CACHE_DIR,
+             db.engine, db.async_session, outbox._bot, receiver._public_ip, sharding.worker_target, dedup.seen,
+             settings.journal, settings.tickers, settings.http, settings.reload) = saved
+
+def shard_worker(venue: dict, traders: int, data_dir: str, index: int, count: int, path: str):
+    """``shards.run_worker`` against a mock venue, in a spawned process."""
+    async def run():
+        async with patched(MockBitget(**venue), traders, data_dir=data_dir):
+            await sharding.serve(index, count, path)
+
+    asyncio.run(run())
+
+@asynccontextmanager
+async def running_app(venue: MockBitget, traders: int = 2, bot: StubBot | None = None, shards: int = 0,
+                      data_dir: str | None = None):
+    """With ``shards`` the traders run in worker processes, each on its own copy of ``venue``."""
+    async with patched(venue, traders, bot, data_dir):
+        settings.shards = shards
+        async with receiver.app.router.lifespan_context(receiver.app):
+            transport = httpx.ASGITransport(app=receiver.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                yield client
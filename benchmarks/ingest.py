@@ -0,0 +1,118 @@
+"""Webhook ingestion throughput of a single uvicorn worker.
+
+    python -m benchmarks.ingest [--seconds S] [--connections C] [--batch B]
+
+Starts ``receiver.app`` under uvicorn in a child process, patched onto the
+mock Bitget (see ``benchmarks/harness.py``), and drives it from this
+process over keep-alive connections with a minimal HTTP/1.1 client.
+Alerts are sells for symbols without a position, so traders answer them
+without trading and the numbers are dominated by ingestion. Reports
+requests/s for ``/webhook`` and requests/s and signals/s for
+``/webhook/batch`` with ``B`` signals per request.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import socket
+import subprocess
+import sys
+import time
+from typing import Callable
+
+from .harness import alert
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"] + [f"C{i}USDT" for i in range(46)]
+
+def _serve(port: int):
+    import uvicorn
+    from bitget_trader import receiver
+    from .harness import patched
+    from .mock_bitget import MockBitget
+
+    async def run():
+        async with patched(MockBitget(latency=0, fill_delay=0), traders=2):
+            config = uvicorn.Config(receiver.app, port=port, log_level="warning", access_log=False)
+            await uvicorn.Server(config).serve()
+
+    asyncio.run(run())
+
+def _request(path: str, body: dict) -> bytes:
+    data = json.dumps(body).encode()
+    head = f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n"
+    return head.encode() + data
+
+async def _connection(port: int, make: Callable[[int], bytes], until: float) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    done = 0
+    while time.perf_counter() < until:
+        writer.write(make(done))
+        head = await reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(head.split(b"\r\n", 1)[0].decode())
+        length = int(head.lower().split(b"content-length:", 1)[1].split(b"\r\n", 1)[0])
+        await reader.readexactly(length)
+        done += 1
+    writer.close()
+    return done
+
+async def _load(port: int, make: Callable[[str, int], bytes], seconds: float, connections: int) -> float:
+    """Requests/s; ``make(connection, n)`` builds a connection's ``n``-th request."""
+    until = time.perf_counter() + seconds
+    counts = await asyncio.gather(*(
+        _connection(port, functools.partial(make, f"c{c}"), until) for c in range(connections)
+    ))
+    return sum(counts) / seconds
+
+def _wait_for(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), 0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+def main(argv: list[str] | None = None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--seconds", type=float, default=5.0)
+    p.add_argument("--connections", type=int, default=32)
+    p.add_argument("--batch", type=int, default=20)
+    p.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+    if args.serve:
+        return _serve(args.serve)
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.ingest", "--serve", str(port)],
+                              stdout=subprocess.DEVNULL)
+    try:
+        _wait_for(port)
+        time.sleep(1.0)  # let the lifespan finish loading markets
+        # unique ids, so no request is answered as a duplicate
+        def single(conn: str, n: int) -> bytes:
+            return _request("/webhook", alert("sell", SYMBOLS[n % len(SYMBOLS)], id=f"s{conn}-{n}"))
+
+        rps = asyncio.run(_load(port, single, args.seconds, args.connections))
+        print(f"/webhook        {rps:8.0f} requests/s")
+        auth = alert("sell", "BTCUSDT")["auth"]
+
+        def batch(conn: str, n: int) -> bytes:
+            return _request("/webhook/batch", {"auth": auth, "signals": [
+                {"id": f"b{conn}-{n}-{j}", "type": "sell", "symbol": SYMBOLS[(n + j) % len(SYMBOLS)]}
+                for j in range(args.batch)
+            ]})
+
+        rps = asyncio.run(_load(port, batch, args.seconds, args.connections))
+        print(f"/webhook/batch  {rps:8.0f} requests/s  {rps * args.batch:8.0f} signals/s  ({args.batch} per request)")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
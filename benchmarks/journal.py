@@ -0,0 +1,79 @@
+"""Signal journal: append throughput and recovery time.
+
+    python -m benchmarks.journal [signals] [concurrency] [recovery_signals]
+
+Appends ``signals`` signals to a scratch journal, first one at a time, so
+every signal waits for its own fsync, then from ``concurrency`` concurrent
+callers, as webhooks arrive under load, so they share fsyncs. Then writes
+a journal of ``recovery_signals`` signals, every tenth still unfinished,
+and times opening it again.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+
+from bitget_trader.journal import Journal
+from bitget_trader.signals import Signal
+
+TRADERS = ["t0", "t1"]
+
+def _sig(n: int) -> Signal:
+    return Signal("buy", "BTCUSDT", 10.0, None, key=f"k{n}")
+
+async def _append(path: str, signals: int, concurrency: int) -> tuple[float, int]:
+    journal = Journal(path, TRADERS)
+    await journal.open()
+    queue = iter(range(signals))
+
+    async def caller():
+        for n in queue:
+            await journal.received([_sig(n)])
+            for uid in TRADERS:
+                journal.note(f"k{n}", uid, "done")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await journal.close()
+    return signals / elapsed, journal.commits
+
+def _write_history(path: str, signals: int):
+    with open(f"{path}/00000001.log", "w") as fh:
+        for n in range(signals):
+            fh.write(json.dumps({"k": f"k{n}", "e": "received", "ts": time.time(),
+                                 "s": {"type": "buy", "symbol": "BTCUSDT", "amount": 10.0, "users": None}}) + "\n")
+            for uid in TRADERS:
+                fh.write(json.dumps({"k": f"k{n}", "e": "submitted", "t": uid, "o": str(n)}) + "\n")
+                if n % 10:
+                    fh.write(json.dumps({"k": f"k{n}", "e": "persisted", "t": uid}) + "\n")
+
+async def _recover(path: str) -> tuple[float, int, int]:
+    journal = Journal(path, TRADERS)
+    started = time.perf_counter()
+    records = await journal.open()
+    pending = journal.pending()
+    elapsed = time.perf_counter() - started
+    await journal.close()
+    return elapsed, records, len(pending)
+
+def main():
+    signals = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    recovery = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+    for callers in (1, concurrency):
+        with tempfile.TemporaryDirectory() as tmp:
+            rate, commits = asyncio.run(_append(tmp, signals, callers))
+        print(f"append, {callers:3d} concurrent: {rate:9.0f} signals/s  "
+              f"({signals * (1 + len(TRADERS))} records in {commits} fsyncs)")
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_history(tmp, recovery)
+        elapsed, records, pending = asyncio.run(_recover(tmp))
+    print(f"recovery: {records} records in {elapsed:.2f}s ({records / elapsed:,.0f} records/s), "
+          f"{pending} signals to replay")
+
+if __name__ == "__main__":
+    main()
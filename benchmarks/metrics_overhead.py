@@ -0,0 +1,58 @@
+"""Cost of the latency instrumentation itself.
+
+    python -m benchmarks.metrics_overhead [iterations]
+
+Times ``metrics.record``, ``metrics.span`` and a full ``/metrics`` render
+with every stage populated, against an empty loop as baseline.
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+from bitget_trader import metrics
+from bitget_trader.signals import Signal
+
+STAGES = ("receive", "parse", "queue_wait", "lock_wait", "balance", "submit", "fill", "db", "notify", "total")
+
+def _per_op(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    fn(iterations)
+    return (time.perf_counter() - started) / iterations * 1e9
+
+def _baseline(n):
+    sig = Signal("buy", "BTCUSDT", 10.0, None)
+    for _ in range(n):
+        sig.spans
+
+def _record(n):
+    sig = Signal("buy", "BTCUSDT", 10.0, None)
+    record = metrics.record
+    for _ in range(n):
+        record(sig, "submit", 0.0123)
+
+def _span(n):
+    sig = Signal("buy", "BTCUSDT", 10.0, None)
+    span = metrics.span
+    for _ in range(n):
+        with span(sig, "submit"):
+            pass
+
+def main(iterations: int = 200_000):
+    base = _per_op(_baseline, iterations)
+    print(f"baseline loop:       {base:7.1f} ns/op")
+    print(f"metrics.record:      {_per_op(_record, iterations) - base:7.1f} ns/op")
+    print(f"metrics.span:        {_per_op(_span, iterations) - base:7.1f} ns/op")
+    for stage in STAGES:
+        metrics.record(None, stage, 0.01)
+    renders = 200
+    started = time.perf_counter()
+    for _ in range(renders):
+        text = metrics.render()
+    elapsed = (time.perf_counter() - started) / renders
+    print(f"/metrics render:     {elapsed * 1e6:7.1f} us ({len(text)} bytes)")
+    per_signal = (_per_op(_span, iterations) - base) * len(STAGES)
+    print(f"per signal (10 spans): {per_signal / 1000:5.1f} us")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
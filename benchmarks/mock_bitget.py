@@ -0,0 +1,489 @@
+"""Local stand-ins for Bitget used by the tests and benchmarks."""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import json
+import ssl
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+def order_message(order_id: str, status: str = "filled", symbol: str = "BTCUSDT",
+                  qty: float = 0.001, price: float = 60000.0, fee: float = 0.06) -> dict:
+    """A v2 spot ``orders`` channel push as Bitget sends it."""
+    now = str(int(time.time() * 1000))
+    return {
+        "action": "snapshot",
+        "arg": {"instType": "SPOT", "channel": "orders", "instId": "default"},
+        "data": [{
+            "instId": symbol,
+            "orderId": order_id,
+            "clientOid": f"oid-{order_id}",
+            "orderType": "market",
+            "side": "buy",
+            "accBaseVolume": str(qty),
+            "priceAvg": str(price),
+            "status": status,
+            "cTime": now,
+            "uTime": now,
+            "feeDetail": [{"feeCoin": "USDT", "fee": str(-fee)}],
+        }],
+        "ts": int(now),
+    }
+
+def ticker_message(symbol: str, last: float) -> dict:
+    """A v2 spot ``ticker`` channel push as Bitget sends it."""
+    now = str(int(time.time() * 1000))
+    return {
+        "action": "snapshot",
+        "arg": {"instType": "SPOT", "channel": "ticker", "instId": symbol},
+        "data": [{"instId": symbol, "lastPr": str(last), "bidPr": str(last), "askPr": str(last), "ts": now}],
+        "ts": int(now),
+    }
+
+class FakeOrderServer:
+    """Minimal Bitget WebSocket server replaying channel messages.
+
+    Serves the private ``orders`` channel and, without a login, the public
+    ``ticker`` channel; ``channels`` holds what clients are subscribed to.
+    """
+
+    def __init__(self):
+        self.channels: set[str] = set()
+        self._clients: set = set()
+        self._server = None
+        self.subscribed = asyncio.Event()
+        self.url = ""
+
+    async def _handler(self, ws):
+        try:
+            await self._serve(ws)
+        except ConnectionClosed:
+            pass
+        finally:
+            self._clients.discard(ws)
+
+    async def _serve(self, ws):
+        async for raw in ws:
+            if raw == "ping":
+                await ws.send("pong")
+                continue
+            msg = json.loads(raw)
+            if msg["op"] == "login":
+                await ws.send(json.dumps({"event": "login", "code": 0}))
+            elif msg["op"] == "subscribe":
+                self._clients.add(ws)
+                for arg in msg["args"]:
+                    self.channels.add(arg.get("instId", ""))
+                    await ws.send(json.dumps({"event": "subscribe", "arg": arg}))
+                self.subscribed.set()
+            elif msg["op"] == "unsubscribe":
+                for arg in msg["args"]:
+                    self.channels.discard(arg.get("instId", ""))
+                    await ws.send(json.dumps({"event": "unsubscribe", "arg": arg}))
+
+    async def push(self, message: dict):
+        for ws in list(self._clients):
+            await ws.send(json.dumps(message))
+
+    async def __aenter__(self) -> "FakeOrderServer":
+        self._server = await serve(self._handler, "127.0.0.1", 0)
+        port = next(iter(self._server.sockets)).getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *_):
+        self._server.close()
+        await self._server.wait_closed()
+
+def self_signed(directory: Path | str) -> tuple[ssl.SSLContext, ssl.SSLContext]:
+    """Server and client TLS contexts for a throwaway ``localhost`` certificate."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number()).not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost"),
+                                                    x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_file, key_file = Path(directory) / "cert.pem", Path(directory) / "key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+    server = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server.load_cert_chain(cert_file, key_file)
+    return server, ssl.create_default_context(cafile=str(cert_file))
+
+class FakeRestServer:
+    """HTTPS stand-in for Bitget's REST host answering ``/api/v2/public/time``.
+
+    ``connections`` counts the TLS connections clients opened. With
+    ``rtt`` every byte crosses a local proxy that delays it by half of
+    that each way, so handshakes cost round trips as they would over the
+    internet; ``keepalive`` is how long the server keeps idle connections.
+    """
+
+    def __init__(self, context: ssl.SSLContext, rtt: float = 0.0, keepalive: float = 75.0):
+        self._context, self.rtt, self.keepalive = context, rtt, keepalive
+        self._transports: set = set()
+        self._runner = None
+        self._proxy = None
+        self._links: set[asyncio.StreamWriter] = set()
+        self.requests = 0
+        self.url = ""
+
+    @property
+    def connections(self) -> int:
+        return len(self._transports)
+
+    async def _time(self, request):
+        from aiohttp import web
+        self.requests += 1
+        self._transports.add(request.transport)
+        return web.json_response({"code": "00000", "msg": "success", "requestTime": int(time.time() * 1000),
+                                  "data": {"serverTime": str(int(time.time() * 1000))}})
+
+    async def _pipe(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # every chunk is delayed on its own, so bytes in flight overlap as on a real link
+        loop = asyncio.get_running_loop()
+        try:
+            while data := await reader.read(65536):
+                loop.call_later(self.rtt / 2, writer.write, data)
+        except ConnectionError:
+            pass
+        loop.call_later(self.rtt / 2, writer.close)
+
+    async def _forward(self, reader, writer, port: int):
+        upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", port)
+        self._links |= {writer, upstream_writer}
+        await asyncio.gather(self._pipe(reader, upstream_writer), self._pipe(upstream_reader, writer))
+
+    async def __aenter__(self) -> "FakeRestServer":
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_get("/api/v2/public/time", self._time)
+        self._runner = web.AppRunner(app, keepalive_timeout=self.keepalive, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0, ssl_context=self._context)
+        await site.start()
+        port = upstream = site._server.sockets[0].getsockname()[1]
+        if self.rtt:
+            self._proxy = await asyncio.start_server(lambda r, w: self._forward(r, w, upstream), "127.0.0.1", 0)
+            port = self._proxy.sockets[0].getsockname()[1]
+        self.url = f"https://localhost:{port}"
+        return self
+
+    async def __aexit__(self, *_):
+        if self._proxy is not None:
+            self._proxy.close()
+            for link in self._links:
+                link.close()
+            await self._proxy.wait_closed()
+        await self._runner.cleanup()
+
+def make_market(base: str, quote: str = "USDT", amount_step: float = 1e-6, price_step: float = 0.01,
+                min_cost: float = 1.0) -> dict:
+    """A parsed ccxt spot market, shaped like ``bitget.fetch_markets`` returns it."""
+    return {
+        "id": f"{base}{quote}", "symbol": f"{base}/{quote}", "base": base, "quote": quote,
+        "baseId": base, "quoteId": quote, "settle": None, "settleId": None,
+        "type": "spot", "spot": True, "margin": False, "swap": False, "future": False,
+        "option": False, "contract": False, "linear": None, "inverse": None, "active": True,
+        "taker": 0.001, "maker": 0.001, "contractSize": None,
+        "precision": {"amount": amount_step, "price": price_step},
+        "limits": {
+            "amount": {"min": amount_step, "max": None},
+            "price": {"min": None, "max": None},
+            "cost": {"min": min_cost, "max": None},
+        },
+        "info": {"symbol": f"{base}{quote}", "status": "online"},
+    }
+
+def make_markets(count: int = 500) -> tuple[list[dict], dict]:
+    bases = ["BTC", "ETH", "SOL", "XRP"] + [f"C{i}" for i in range(max(count - 4, 0))]
+    markets = [make_market(b) for b in bases[:count]]
+    currencies = {b: {"id": b, "code": b, "precision": 1e-8, "info": {}} for b in bases[:count] + ["USDT"]}
+    return markets, currencies
+
+class MockOrder:
+    """One order on the mock venue, with the timings the benchmarks report."""
+
+    __slots__ = ("id", "client_oid", "key", "symbol", "side", "amount", "cost", "price",
+                 "created", "fills_at", "seen_filled", "canceled")
+
+    def __init__(self, id: str, client_oid: str, key: str, symbol: str, side: str,
+                 amount: float, cost: float, price: float, created: float, fills_at: float):
+        self.id, self.client_oid, self.key, self.symbol, self.side = id, client_oid, key, symbol, side
+        self.amount, self.cost, self.price = amount, cost, price
+        self.created, self.fills_at = created, fills_at
+        self.seen_filled = 0.0  # perf_counter() when a client first saw the fill
+        self.canceled = False
+
+class OrderBook:
+    """Depth on each side of the mid price, for market orders to walk through.
+
+    Levels are ``tick`` (a fraction of the mid) apart, the first at the mid,
+    each holding ``depth`` of the base coin. A market order takes levels
+    from the top; what it took comes back at ``refill`` levels per second.
+    """
+
+    def __init__(self, depth: float, tick: float = 0.001, refill: float = 1.0):
+        self.depth, self.tick, self.refill = depth, tick, refill
+        self._taken = {"buy": 0.0, "sell": 0.0}  # base taken off the top of each side
+        self._at = {"buy": 0.0, "sell": 0.0}
+
+    def fill(self, side: str, mid: float, now: float, amount: float = 0.0, cost: float = 0.0) -> tuple[float, float]:
+        """Fill a buy for ``cost`` quote or a sell of ``amount`` base; returns ``(amount, cost)``."""
+        taken = max(self._taken[side] - (now - self._at[side]) * self.refill * self.depth, 0.0)
+        sign = 1 if side == "buy" else -1
+        got = spent = 0.0
+        while (cost - spent if side == "buy" else amount - got) > 1e-12:
+            level = int(taken // self.depth)
+            price = mid * max(1 + sign * self.tick * level, self.tick)
+            room = (level + 1) * self.depth - taken
+            need = (cost - spent) / price if side == "buy" else amount - got
+            take = min(room, need)
+            got += take
+            spent += take * price
+            taken = (level + 1) * self.depth if take == room else taken + take
+        self._taken[side], self._at[side] = taken, now
+        return got, spent
+
+class MockBitget:
+    """In-memory spot venue shared by every :class:`MockClient`.
+
+    Each call sleeps ``latency`` seconds; market orders fill ``fill_delay``
+    seconds after they are accepted, at ``price`` with a ``fee_rate`` fee in
+    USDT. Balances are kept per API key. With ``depth`` the orders walk an
+    :class:`OrderBook` around ``price`` instead of all filling at it.
+    """
+
+    def __init__(self, latency: float = 0.02, fill_delay: float = 0.05, price: float = 100.0,
+                 fee_rate: float = 0.001, balance: float = 1_000_000.0, markets: int = 50,
+                 depth: float = 0.0, tick: float = 0.001, refill: float = 1.0):
+        self.latency = latency
+        self.fill_delay = fill_delay
+        self.price = price
+        self.fee_rate = fee_rate
+        self.start_balance = balance
+        self.book = OrderBook(depth, tick, refill) if depth else None
+        self.markets, self.currencies = make_markets(markets)
+        self.balances: dict[str, float] = {}
+        self.orders: dict[str, MockOrder] = {}
+        self.log: list[MockOrder] = []
+        self.calls: dict[str, int] = {}
+        self._ids = 0
+        self._filled = asyncio.Event()
+
+    def settings(self) -> dict:
+        """Constructor arguments for an identical venue, e.g. in another process."""
+        return {"latency": self.latency, "fill_delay": self.fill_delay, "price": self.price,
+                "fee_rate": self.fee_rate, "balance": self.start_balance, "markets": len(self.markets),
+                **({"depth": self.book.depth, "tick": self.book.tick, "refill": self.book.refill} if self.book else {})}
+
+    def client(self, config: dict) -> "MockClient":
+        """Use as ``exchange.client_factory``."""
+        self.balances.setdefault(config["apiKey"], self.start_balance)
+        return MockClient(self, config)
+
+    async def _call(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _market(self, symbol: str) -> dict:
+        for m in self.markets:
+            if symbol in (m["symbol"], m["id"]):
+                return m
+        raise ValueError(f"bitget does not have market symbol {symbol}")
+
+    def place(self, key: str, symbol: str, side: str, amount: float | None, params: dict) -> MockOrder:
+        market = self._market(symbol)
+        self._ids += 1
+        now = time.perf_counter()
+        if side == "buy":
+            cost = float(params["cost"])
+            if cost > self.balances.get(key, self.start_balance):
+                from ccxt.base.errors import InsufficientFunds
+                raise InsufficientFunds(f"bitget Insufficient balance for a {cost} USDT buy")
+            if self.book is not None:
+                amount, cost = self.book.fill(side, self.price, now, cost=cost)
+            else:
+                amount = cost / self.price
+        else:
+            amount = float(amount)
+            if self.book is not None:
+                amount, cost = self.book.fill(side, self.price, now, amount=amount)
+            else:
+                cost = amount * self.price
+        order = MockOrder(str(self._ids), params.get("clientOid", ""), key, market["symbol"], side,
+                          amount, cost, cost / amount, now, now + self.fill_delay)
+        self.orders[order.id] = order
+        self.log.append(order)
+        return order
+
+    def view(self, order: MockOrder) -> dict:
+        now = time.perf_counter()
+        filled = now >= order.fills_at and not order.canceled
+        if filled and not order.seen_filled:
+            order.seen_filled = now
+            fee = order.cost * self.fee_rate
+            sign = -1 if order.side == "buy" else 1
+            self.balances[order.key] += sign * order.cost - fee
+            self._filled.set()
+        return {
+            "id": order.id,
+            "clientOrderId": order.client_oid,
+            "symbol": order.symbol,
+            "side": order.side,
+            "status": "closed" if filled else "canceled" if order.canceled else "open",
+            "filled": order.amount if filled else 0.0,
+            "average": order.price if filled else None,
+            "cost": order.cost if filled else 0.0,
+            "fee": {"cost": order.cost * self.fee_rate if filled else 0.0, "currency": "USDT"},
+        }
+
+    def epoch_ms(self, perf: float) -> int:
+        """A ``perf_counter()`` reading as exchange time, epoch milliseconds."""
+        return int((time.time() - time.perf_counter() + perf) * 1000)
+
+    def filled(self) -> int:
+        return sum(1 for o in self.log if o.seen_filled)
+
+    async def wait_filled(self, count: int, timeout: float = 30.0):
+        """Wait until ``count`` orders in total have been seen filled."""
+        async def _wait():
+            while self.filled() < count:
+                self._filled.clear()
+                await self._filled.wait()
+        await asyncio.wait_for(_wait(), timeout)
+
+class MockClient:
+    """The part of ``ccxt.async_support.bitget`` that :class:`Exchange` uses."""
+
+    def __init__(self, venue: MockBitget, config: dict):
+        self.venue = venue
+        self.apiKey = config["apiKey"]
+        self.options = dict(config.get("options", {}))
+        self.markets: dict[str, dict] | None = None
+        self.markets_by_id: dict[str, list[dict]] | None = None
+        self.currencies: dict | None = None
+
+    def set_sandbox_mode(self, enabled: bool):
+        pass
+
+    async def fetch_currencies(self) -> dict:
+        await self.venue._call("fetch_currencies")
+        return self.venue.currencies
+
+    async def fetch_markets(self) -> list[dict]:
+        await self.venue._call("fetch_markets")
+        return self.venue.markets
+
+    def set_markets(self, markets: list[dict], currencies: dict | None = None):
+        self.markets = {m["symbol"]: m for m in markets}
+        self.markets_by_id = {m["id"]: [m] for m in markets}
+        self.currencies = currencies
+
+    def set_markets_from_exchange(self, source: "MockClient"):
+        self.markets, self.markets_by_id, self.currencies = source.markets, source.markets_by_id, source.currencies
+
+    def market(self, symbol: str) -> dict:
+        if symbol in self.markets:
+            return self.markets[symbol]
+        return self.markets_by_id[symbol][0]
+
+    def amount_to_precision(self, symbol: str, amount: float) -> str:
+        step = self.market(symbol)["precision"]["amount"]
+        return repr(int(amount / step) * step)
+
+    async def fetch_tickers(self, symbols: list[str] | None = None, params: dict | None = None) -> dict:
+        await self.venue._call("fetch_tickers")
+        markets = self.venue.markets if symbols is None else [self.venue._market(s) for s in symbols]
+        return {m["symbol"]: {"symbol": m["symbol"], "last": self.venue.price} for m in markets}
+
+    async def fetch_balance(self) -> dict:
+        await self.venue._call("fetch_balance")
+        free = self.venue.balances[self.apiKey]
+        return {"free": {"USDT": free}, "total": {"USDT": free}}
+
+    async def create_order(self, symbol: str, type: str, side: str, amount, price=None, params=None) -> dict:
+        await self.venue._call("create_order")
+        order = self.venue.place(self.apiKey, symbol, side, amount, params or {})
+        return {"id": order.id, "clientOrderId": order.client_oid, "info": {}}
+
+    async def fetch_order(self, id: str, symbol: str | None = None, params: dict | None = None) -> dict:
+        await self.venue._call("fetch_order")
+        client_oid = (params or {}).get("clientOid")
+        if client_oid:
+            order = next((o for o in self.venue.log if o.client_oid == client_oid and o.key == self.apiKey), None)
+        else:
+            order = self.venue.orders.get(id)
+        if order is None:
+            from ccxt.base.errors import OrderNotFound
+            raise OrderNotFound(f"bitget fetchOrder() could not find order {id or client_oid}")
+        return self.venue.view(order)
+
+    async def fetch_my_trades(self, symbol: str, since: int | None = None, limit: int | None = None,
+                              params: dict | None = None) -> list[dict]:
+        """One trade per filled order, timestamped when it filled."""
+        await self.venue._call("fetch_my_trades")
+        market = self.venue._market(symbol)
+        trades = []
+        for order in self.venue.log:
+            if order.key != self.apiKey or order.symbol != market["symbol"]:
+                continue
+            view = self.venue.view(order)
+            if view["status"] != "closed":
+                continue
+            ts = self.venue.epoch_ms(order.fills_at)
+            if since is None or ts >= since:
+                trades.append({"id": f"t{order.id}", "order": order.id, "symbol": order.symbol,
+                               "side": order.side, "amount": view["filled"], "price": view["average"],
+                               "cost": view["cost"], "fee": view["fee"], "timestamp": ts})
+        trades.sort(key=lambda t: t["timestamp"])
+        return trades[:limit] if limit else trades
+
+    async def cancel_order(self, id: str, symbol: str | None = None) -> dict:
+        await self.venue._call("cancel_order")
+        order = self.venue.orders.get(id)
+        if order is None or order.canceled or self.venue.view(order)["status"] == "closed":
+            from ccxt.base.errors import OrderNotFound
+            raise OrderNotFound(f"bitget cancelOrder() order {id} is not open")
+        order.canceled = True
+        return {"id": id, "status": "canceled"}
+
+    async def close(self):
+        pass
+
+class StubBot:
+    """Records Telegram messages instead of sending them."""
+
+    def __init__(self, latency: float = 0.0, fail_first: int = 0):
+        self.latency = latency
+        self.fail_first = fail_first  # sends that raise before the bot starts working
+        self.messages: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id, text, **_):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_first:
+            self.fail_first -= 1
+            raise RuntimeError("telegram down")
+        self.messages.append((chat_id, text))
+
+    async def shutdown(self):
+        pass
@@ -0,0 +1,78 @@
+"""Latency of a ``/portfolio`` snapshot as traders and symbols grow.
+
+    python -m benchmarks.portfolio [repeats]
+
+Fills a position book with one position per trader and symbol and a
+ticker cache with a price per symbol, then times ``Portfolio.snapshot``
+(numpy, positions indexed once per book change) against the plain loop
+it replaces, which looks up every price and accumulates the totals in
+Python. Also reports a snapshot right after a book change, which pays
+for rebuilding the arrays, and one without the per-position rows
+(``/portfolio?positions=false``). No network or database is touched.
+"""
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+
+from bitget_trader import tickers
+from bitget_trader.portfolio import Portfolio
+from bitget_trader.positions import PositionBook
+from bitget_trader.tickers import TickerCache
+
+SIZES = [(5, 10), (20, 50), (50, 200), (200, 250)]
+
+def _loop(book: PositionBook, cache: TickerCache) -> dict:
+    traders: dict[str, dict] = {}
+    for p in book.positions():
+        price = cache.prices.get(p.symbol)
+        basis = p.total_buy_amount + p.total_buy_fees
+        row = traders.setdefault(p.user_id, {"exposure": 0.0, "cost_basis": 0.0, "unrealised_pnl": 0.0,
+                                             "positions": {}})
+        row["cost_basis"] += basis
+        value = pnl = None
+        if price is not None:
+            value, pnl = p.qty * price, p.qty * price - basis
+            row["exposure"] += value
+            row["unrealised_pnl"] += pnl
+        row["positions"][p.symbol] = {"qty": p.qty, "avg_cost": p.avg_cost_usdt, "price": price,
+                                      "exposure": value, "cost_basis": basis, "unrealised_pnl": pnl}
+    return traders
+
+def _time(fn, repeats: int) -> float:
+    runs = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs) * 1000
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'traders':>8} {'symbols':>8} {'positions':>10} {'snapshot ms':>12} {'after change':>13} {'totals only':>12} {'loop ms':>8}")
+    for n_traders, n_symbols in SIZES:
+        book = PositionBook(write_behind=True)
+        cache = tickers._caches[False] = TickerCache(False, 10, stream=False)
+        symbols = [f"C{i}USDT" for i in range(n_symbols)]
+        for t in range(n_traders):
+            for i, symbol in enumerate(symbols):
+                book.open(f"t{t}", symbol, 1.0 + i, 100.0, 100.0 * (1.0 + i), 0.1)
+        cache.prices.update({s: 101.0 + i for i, s in enumerate(symbols)})
+        cache.updated.update(dict.fromkeys(symbols, time.time()))
+        portfolio = Portfolio(book, {f"t{t}": False for t in range(n_traders)})
+        portfolio.snapshot()
+        warm = _time(portfolio.snapshot, repeats)
+
+        def changed():
+            book.version += 1
+            portfolio.snapshot()
+
+        cold = _time(changed, repeats)
+        totals = _time(lambda: portfolio.snapshot(positions=False), repeats)
+        loop = _time(lambda: _loop(book, cache), repeats)
+        print(f"{n_traders:8d} {n_symbols:8d} {n_traders * n_symbols:10d} {warm:12.2f} {cold:13.2f} {totals:12.2f} {loop:8.2f}")
+    tickers._caches.clear()
+
+if __name__ == "__main__":
+    main()
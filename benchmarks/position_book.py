@@ -0,0 +1,58 @@
+"""Trades per second through the position book, write-behind vs. write-through.
+
+    python -m benchmarks.position_book [trades] [traders]
+
+Trades are applied one after another. Each is a buy that opens or averages
+into a position and every third one also closes it, the same mutations
+``Trader`` performs. Runs against a scratch SQLite file in WAL mode.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bitget_trader.db import init_db, make_engine
+from bitget_trader.positions import PositionBook
+
+async def _trade(book: PositionBook, uid: str, symbol: str, n: int):
+    pos = book.get(uid, symbol)
+    if pos is None:
+        pos = book.open(uid, symbol, 1.0, 100.0, 100.0, 0.1)
+    else:
+        pos.avg_cost_usdt = (pos.avg_cost_usdt * pos.qty + 100.0) / (pos.qty + 1.0)
+        pos.qty += 1.0
+        pos.total_buy_amount += 100.0
+        pos.total_buy_fees += 0.1
+    await book.save(pos)
+    if n % 3 == 0:
+        pos.status = "CLOSED"
+        pos.total_sell_amount = pos.qty * 101.0
+        book.close(pos)
+        await book.save(pos)
+
+async def _run(trades: int, traders: int, write_behind: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(Path(tmp) / "bench.sqlite3")
+        await init_db(engine)
+        book = PositionBook(async_sessionmaker(engine, expire_on_commit=False), write_behind=write_behind)
+        await book.start()
+        started = time.perf_counter()
+        for i in range(trades):
+            await _trade(book, f"t{i % traders}", f"S{i % 50}USDT", i)
+        await book.stop()
+        elapsed = time.perf_counter() - started
+        await engine.dispose()
+    return trades / elapsed
+
+def main(trades: int = 2000, traders: int = 15):
+    for write_behind in (False, True):
+        rate = asyncio.run(_run(trades, traders, write_behind))
+        print(f"{'write-behind ' if write_behind else 'write-through'}: {rate:10.0f} trades/s")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,71 @@
+"""Startup reconciliation: reading the whole fill history vs. from the cursor.
+
+    python -m benchmarks.reconcile [history] [new] [latency_ms]
+
+A mock account holds ``history`` old fills of one symbol, a second apart,
+already applied, then ``new`` fills a crash left out of the positions. The
+reconciler runs once with only the trader's start, older than the whole
+history, and a lookback covering it, the way a scan from scratch would,
+and once from a cursor saved before the new fills. Every request costs ``latency_ms`` plus its weight
+in the per-key query budget.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+from benchmarks.harness import patched
+from benchmarks.mock_bitget import MockBitget
+from bitget_trader import db
+from bitget_trader.config import _ReconcileCfg
+from bitget_trader.exchange import Exchange
+from bitget_trader.notifier import outbox
+from bitget_trader.positions import book
+from bitget_trader.reconcile import _START, Reconciler
+
+class _Trader:
+    def __init__(self, exchange: Exchange):
+        self.id, self.chat_id, self.exchange, self.released = "t0", 1000, exchange, {}
+
+async def _run(history: int, new: int, latency: float, cursor: bool):
+    venue = MockBitget(latency=latency, fill_delay=0)
+    async with patched(venue, traders=1):
+        await db.init_db()
+        await book.start()
+        exchange = Exchange("key0", "secret", "pass", False)
+        await exchange.load_markets()
+        trader = _Trader(exchange)
+        now = time.perf_counter()
+        for n in range(history):
+            order = venue.place("key0", "BTCUSDT", "buy", None, {"cost": 10.0})
+            order.fills_at = now - history + n
+            book.mark_applied("t0", order.id, "BTCUSDT", "buy")
+        pos = book.open("t0", "BTCUSDT", history * 0.1, 100.0, history * 10.0, 0.0)
+        await book.save(pos)
+        await book.flush()
+        reconciler = Reconciler([trader], book, cfg=_ReconcileCfg(lookback=history + 3600.0))
+        await reconciler._save_cursors("t0", {_START: venue.epoch_ms(now - history - 1)})
+        if cursor:
+            await reconciler._save_cursors("t0", {"BTCUSDT": venue.epoch_ms(now)})
+        for _ in range(new):
+            order = venue.place("key0", "BTCUSDT", "buy", None, {"cost": 10.0})
+            order.fills_at = order.created
+        await asyncio.sleep(0.002)
+        report = (await reconciler.run(grace=0))[0]
+        await book.stop()
+        await outbox.close()
+        await exchange.close()
+    return report
+
+def main():
+    history = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    new = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.02
+    for label, cursor in (("full history", False), ("from cursor ", True)):
+        report = asyncio.run(_run(history, new, latency, cursor))
+        print(f"{label}: {report.seconds * 1000:8.1f} ms, {report.requests:3d} requests, "
+              f"{report.trades:5d} fills read, {len(report.applied)} orders applied")
+
+if __name__ == "__main__":
+    main()
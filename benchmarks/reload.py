@@ -0,0 +1,65 @@
+"""Applying a config edit in place vs. restarting the server.
+
+    python -m benchmarks.reload [traders] [latency]
+
+Starts the app with ``traders`` traders against a mock venue that answers
+every request after ``latency`` seconds, then times three edits applied
+by the reloader: adding a trader, rotating one trader's keys, and new
+timeouts and rate limits. A restart, for comparison, stops the app and
+starts it again, loading every trader's markets and balance anew.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+
+from pydantic import SecretStr
+
+from benchmarks.harness import patched, trader_configs
+from benchmarks.mock_bitget import MockBitget
+from bitget_trader import receiver
+from bitget_trader.config import _RateLimits, _Timeouts, settings
+from bitget_trader.exchange import rate_limiter
+
+async def _run(traders: int, latency: float) -> tuple[dict[str, float], float]:
+    venue = MockBitget(latency=latency)
+    cfgs = trader_configs(traders + 1)
+    rotated = cfgs[0].model_copy(update={"api_key": SecretStr("rotated")})
+    edits = {
+        "add a trader": {"traders": cfgs},
+        "rotate keys": {"traders": [rotated, *cfgs[1:]]},
+        "timeouts and limits": {"timeouts": _Timeouts(buy=5, sell=5), "rate_limits": _RateLimits(order=10)},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        async with patched(venue, traders, data_dir=tmp):
+            settings.shards = 0
+            applied = {}
+            async with receiver.app.router.lifespan_context(receiver.app):
+                for name, update in edits.items():
+                    change = await receiver._reloader.apply(settings.model_copy(update=update))
+                    applied[name] = change.seconds
+                await receiver._reloader.settled()
+            started = time.perf_counter()
+            async with receiver.app.router.lifespan_context(receiver.app):
+                restart = time.perf_counter() - started
+    return applied, restart
+
+def main():
+    traders = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    saved = settings.timeouts, settings.rate_limits
+    try:
+        applied, restart = asyncio.run(_run(traders, latency))
+    finally:
+        settings.timeouts, settings.rate_limits = saved
+        rate_limiter.configure(settings.rate_limits.model_dump(exclude={"burst"}), settings.rate_limit_rps,
+                               settings.rate_limits.burst)
+    print(f"{traders} traders, {latency * 1000:.0f} ms per request")
+    for name, seconds in applied.items():
+        print(f"{name:20s}: applied in {seconds * 1000:7.1f} ms")
+    print(f"{'full restart':20s}: ready after {restart * 1000:7.1f} ms (stop not included)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Trader startup time: per-client serial loading vs. shared cold and warm cache.
+
+    python -m benchmarks.startup [traders]
+
+Market downloads and balance calls are simulated with fixed latencies;
+``set_markets`` runs for real on a market list the size of Bitget spot.
+The import time of ``bitget_trader.receiver`` is measured in a fresh
+interpreter.
+"""
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from pydantic import SecretStr
+
+from bitget_trader import markets
+from bitget_trader.trader import Trader
+from .mock_bitget import make_markets
+
+DOWNLOAD = 1.0   # seconds for symbols + coins
+BALANCE = 0.1
+MARKETS = make_markets(1200)
+
+def _traders(count: int) -> list[Trader]:
+    traders = []
+    for i in range(count):
+        cfg = SimpleNamespace(
+            id=f"t{i}", api_key=SecretStr(f"k{i}"), api_secret=SecretStr("s"), passphrase=SecretStr("p"),
+            demo_mode=False, notify_chat=0, order_stream=False,
+        )
+        trader = Trader(cfg)
+        ex = trader._exchange
+
+        async def fetch_market_data():
+            await asyncio.sleep(DOWNLOAD)
+            return MARKETS
+
+        async def get_available_usdt():
+            await asyncio.sleep(BALANCE)
+            return 1000.0
+
+        ex.fetch_market_data = fetch_market_data
+        ex.get_available_usdt = get_available_usdt
+        traders.append(trader)
+    return traders
+
+async def _serial(count: int) -> float:
+    traders = _traders(count)
+    started = time.perf_counter()
+    for trader in traders:  # what startup used to do: every client downloads its own copy
+        ex = trader._exchange
+        ex.use_markets(*await ex.fetch_market_data())
+        await trader._balance.refresh()
+    return time.perf_counter() - started
+
+async def _shared(count: int, path: Path) -> float:
+    markets._caches[False] = cache = markets.MarketCache(False, ttl=3600, path=path)
+    traders = _traders(count)
+    started = time.perf_counter()
+    await asyncio.gather(*(trader.start() for trader in traders))
+    elapsed = time.perf_counter() - started
+    await cache.close()
+    for trader in traders:
+        await trader._balance.close()
+    return elapsed
+
+def _import_time() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", "import time; t = time.perf_counter(); import bitget_trader.receiver; print(time.perf_counter() - t)"],
+        capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip())
+
+def main(count: int = 15):
+    print(f"import bitget_trader.receiver: {_import_time() * 1000:7.0f} ms")
+    print(f"serial, per client ({count}):  {asyncio.run(_serial(count)) * 1000:7.0f} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "markets.json"
+        print(f"shared, cold cache:         {asyncio.run(_shared(count, path)) * 1000:7.0f} ms")
+        print(f"shared, warm cache:         {asyncio.run(_shared(count, path)) * 1000:7.0f} ms")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
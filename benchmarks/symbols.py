@@ -0,0 +1,68 @@
+"""Per-order symbol handling: string rewriting and ccxt helpers vs. the registry.
+
+    python -m benchmarks.symbols [markets] [repeats]
+
+Loads ``markets`` synthetic spot markets into a real ``ccxt.bitget`` and a
+``SymbolRegistry`` and times, per order:
+
+- the old path: ``replace("USDT", "/USDT")`` for each exchange call and
+  ccxt's ``amount_to_precision`` for the quantity;
+- the registry: one lookup and ``round_amount``.
+
+Also times building the registry from scratch and updating it after a
+refresh that changed one market.
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+from bitget_trader.symbols import SymbolRegistry
+from .mock_bitget import make_market, make_markets
+
+def _per_call(fn, n: int) -> float:
+    started = time.perf_counter()
+    fn(n)
+    return (time.perf_counter() - started) / n * 1e6
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1200
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    import ccxt.async_support as ccxt
+    markets, currencies = make_markets(count)
+    client = ccxt.bitget({})
+    client.set_markets(markets, currencies)
+    ids = [m["id"] for m in markets]
+
+    def old(n):
+        for i in range(n):
+            symbol_id = ids[i % count]
+            for _ in range(3):  # submit, poll, cancel
+                symbol = symbol_id.replace("USDT", "/USDT")
+            client.amount_to_precision(symbol, 0.123456789)
+
+    registry = SymbolRegistry()
+    started = time.perf_counter()
+    registry.update(markets)
+    build = (time.perf_counter() - started) * 1000
+
+    def new(n):
+        for i in range(n):
+            info = registry.info(ids[i % count])
+            info.symbol
+            info.round_amount(0.123456789)
+
+    changed = list(markets)
+    changed[0] = make_market(markets[0]["base"], min_cost=5.0)
+    started = time.perf_counter()
+    registry.update(changed)
+    update = (time.perf_counter() - started) * 1000
+
+    print(f"{count} markets, {n} orders")
+    print(f"{'replace + amount_to_precision':32s} {_per_call(old, n):7.2f} us/order")
+    print(f"{'registry lookup + round_amount':32s} {_per_call(new, n):7.2f} us/order")
+    print(f"{'build registry':32s} {build:7.2f} ms")
+    print(f"{'update after a refresh':32s} {update:7.2f} ms (one market changed)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Realised P/L reporting over the ``positions`` table.
+
+    python -m bitget_trader.analytics report [--period day|week|month] [--by trader|symbol|all]
+    python -m bitget_trader.analytics symbols
+    python -m bitget_trader.analytics export OUT [--format parquet|arrow] [--all]
+    python -m bitget_trader.analytics rebuild
+
+Rows are streamed from SQLite in chunks straight into numpy columns,
+without the ORM, and every aggregate is computed per chunk with
+``np.unique``/``np.bincount`` and merged at the end, so memory stays at
+one chunk however long the history. Reports normally read ``pnl_daily``,
+the rollup the position book updates as positions close; ``rebuild``
+recomputes it from ``positions``. Export needs the optional ``pyarrow``.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import sqlite3
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+
+from .models import PnlDaily
+
+Chunk = dict[str, np.ndarray]
+
+CHUNK_ROWS = 100_000
+SUMS = ("trades", "wins", "realised_pnl", "fees", "buy_amount", "sell_amount")
+PERIODS = ("day", "week", "month")
+
+_JULIAN_EPOCH = 2440587.5  # julianday('1970-01-01')
+_POSITIONS = """
+    SELECT id, user_id, symbol, status, qty, avg_cost_usdt, total_buy_fees, total_sell_fees,
+           total_buy_amount, total_sell_amount, realised_pnl, julianday(opened_at), julianday(closed_at)
+    FROM positions {where} ORDER BY id
+"""
+# only what the aggregates need, with the UTC day computed by SQLite
+_FACTS = f"""
+    SELECT user_id, symbol, CAST(julianday(closed_at) - {_JULIAN_EPOCH} AS INTEGER), realised_pnl,
+           total_buy_fees + total_sell_fees, total_buy_amount, total_sell_amount
+    FROM positions
+    WHERE status = 'CLOSED' AND closed_at IS NOT NULL AND realised_pnl IS NOT NULL
+"""
+_ROLLUP = """
+    SELECT day, user_id, symbol, trades, wins, realised_pnl, fees, buy_amount, sell_amount, best, worst
+    FROM pnl_daily {where}
+"""
+
+def _connect(path: Path | str) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+def _timestamps(julian: tuple) -> np.ndarray:
+    days = np.array(julian, dtype=np.float64) - _JULIAN_EPOCH
+    micros = np.round(days * 86_400_000_000)
+    out = np.full(len(days), np.datetime64("NaT", "us"))
+    known = ~np.isnan(micros)
+    out[known] = micros[known].astype(np.int64).astype("datetime64[us]")
+    return out
+
+def read_positions(path: Path | str, chunk_rows: int = CHUNK_ROWS, closed: bool = True) -> Iterator[Chunk]:
+    """Stream ``positions`` as column arrays, ``chunk_rows`` rows at a time."""
+    where = "WHERE status = 'CLOSED'" if closed else ""
+    with contextlib.closing(_connect(path)) as conn:
+        cursor = conn.execute(_POSITIONS.format(where=where))
+        while rows := cursor.fetchmany(chunk_rows):
+            cols = list(zip(*rows))
+            yield {
+                "id": np.array(cols[0], np.int64),
+                "user_id": np.array(cols[1], str),
+                "symbol": np.array(cols[2], str),
+                "status": np.array(cols[3], str),
+                "qty": np.array(cols[4], np.float64),
+                "avg_cost_usdt": np.array(cols[5], np.float64),
+                "total_buy_fees": np.array(cols[6], np.float64),
+                "total_sell_fees": np.array(cols[7], np.float64),
+                "total_buy_amount": np.array(cols[8], np.float64),
+                "total_sell_amount": np.array(cols[9], np.float64),
+                "realised_pnl": np.array(cols[10], np.float64),
+                "opened_at": _timestamps(cols[11]),
+                "closed_at": _timestamps(cols[12]),
+            }
+
+def read_facts(path: Path | str, chunk_rows: int = CHUNK_ROWS) -> Iterator[Chunk]:
+    """One aggregation row per closed position, in the columns of ``pnl_daily``.
+
+    Reads only the columns the aggregates use, which makes it several
+    times faster than :func:`read_positions`.
+    """
+    with contextlib.closing(_connect(path)) as conn:
+        cursor = conn.execute(_FACTS)
+        while rows := cursor.fetchmany(chunk_rows):
+            cols = list(zip(*rows))
+            pnl = np.array(cols[3], np.float64)
+            yield {
+                "day": np.array(cols[2], np.int64).astype("datetime64[D]"),
+                "user_id": np.array(cols[0], str),
+                "symbol": np.array(cols[1], str),
+                "trades": np.ones(len(pnl)),
+                "wins": (pnl > 0).astype(np.float64),
+                "realised_pnl": pnl,
+                "fees": np.array(cols[4], np.float64),
+                "buy_amount": np.array(cols[5], np.float64),
+                "sell_amount": np.array(cols[6], np.float64),
+                "best": pnl,
+                "worst": pnl,
+            }
+
+def read_rollup(path: Path | str, chunk_rows: int = CHUNK_ROWS, since: date | None = None) -> Iterator[Chunk]:
+    """Stream ``pnl_daily`` in the same columns as :func:`read_facts`."""
+    where, args = ("WHERE day >= ?", (since.isoformat(),)) if since else ("", ())
+    with contextlib.closing(_connect(path)) as conn:
+        cursor = conn.execute(_ROLLUP.format(where=where), args)
+        while rows := cursor.fetchmany(chunk_rows):
+            cols = list(zip(*rows))
+            chunk = {"day": np.array(cols[0], "datetime64[D]"),
+                     "user_id": np.array(cols[1], str), "symbol": np.array(cols[2], str)}
+            for i, name in enumerate(SUMS + ("best", "worst"), start=3):
+                chunk[name] = np.array(cols[i], np.float64)
+            yield chunk
+
+def _bucket(days: np.ndarray, period: str) -> np.ndarray:
+    """First day of the period (weeks start on Monday) as days since the epoch."""
+    n = days.astype(np.int64)
+    if period == "day":
+        return n
+    if period == "week":
+        return n - (n + 3) % 7  # 1970-01-01 was a Thursday
+    return days.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+
+def _group(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct rows of ``codes`` and the group of every row."""
+    low = codes.min(axis=0) if len(codes) else np.zeros(codes.shape[1], np.int64)
+    dims = codes.max(axis=0) - low + 1 if len(codes) else np.ones(codes.shape[1], np.int64)
+    if np.prod(dims.astype(np.float64)) < 2 ** 62:
+        # one int64 per row sorts far faster than rows compared as a whole
+        flat = np.ravel_multi_index(tuple((codes - low).T), tuple(dims))
+        uniq, inverse = np.unique(flat, return_inverse=True)
+        return np.stack(np.unravel_index(uniq, tuple(dims)), axis=1) + low, inverse
+    keys, inverse = np.unique(codes, axis=0, return_inverse=True)
+    return keys, inverse.ravel()
+
+def _reduce(codes: np.ndarray, values: Chunk) -> tuple[np.ndarray, Chunk]:
+    """Sum, max and min ``values`` over the distinct rows of ``codes``."""
+    keys, inverse = _group(codes)
+    count = len(keys)
+    out = {name: np.bincount(inverse, values[name], count) for name in SUMS}
+    order = np.argsort(inverse, kind="stable")
+    starts = np.searchsorted(inverse[order], np.arange(count))
+    out["best"] = np.fmax.reduceat(values["best"][order], starts) if count else np.empty(0)
+    out["worst"] = np.fmin.reduceat(values["worst"][order], starts) if count else np.empty(0)
+    return keys, out
+
+def aggregate(chunks: Iterable[Chunk], period: str | None = "day",
+              by: tuple[str, ...] = ("user_id", "symbol")) -> Chunk:
+    """Group fact or rollup chunks by ``period`` and the ``by`` columns.
+
+    Returns columns sorted by group, with ``win_rate`` (wins per closed
+    position) and ``fee_drag`` (fees per USDT bought) derived at the end.
+    """
+    vocab: dict[str, dict[str, int]] = {name: {} for name in by}
+    partial_keys, partial_values = [], []
+    for chunk in chunks:
+        codes = []
+        if period is not None:
+            codes.append(_bucket(chunk["day"], period))
+        for name in by:
+            uniq, inverse = np.unique(chunk[name], return_inverse=True)
+            known = vocab[name]
+            codes.append(np.array([known.setdefault(v, len(known)) for v in uniq.tolist()], np.int64)[inverse])
+        if not codes:
+            codes.append(np.zeros(len(chunk["trades"]), np.int64))  # a single group
+        keys, values = _reduce(np.stack(codes, axis=1), chunk)
+        partial_keys.append(keys)
+        partial_values.append(values)
+    width = max(len(by) + (period is not None), 1)
+    if not partial_keys:
+        keys, values = np.empty((0, width), np.int64), {name: np.empty(0) for name in SUMS + ("best", "worst")}
+    else:
+        merged = {name: np.concatenate([v[name] for v in partial_values]) for name in partial_values[0]}
+        keys, values = _reduce(np.concatenate(partial_keys), merged)
+    out: Chunk = {}
+    column = 0
+    if period is not None:
+        out[period] = keys[:, 0].astype("datetime64[D]")
+        column = 1
+    for i, name in enumerate(by, start=column):
+        labels = np.array(list(vocab[name]), str) if vocab[name] else np.empty(0, str)
+        out[name] = labels[keys[:, i]] if len(keys) else labels
+    out.update(values)
+    out["trades"] = out["trades"].astype(np.int64)
+    out["wins"] = out["wins"].astype(np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["win_rate"] = out["wins"] / out["trades"]
+        out["fee_drag"] = np.where(out["buy_amount"] > 0, out["fees"] / out["buy_amount"], np.nan)
+    # codes follow first appearance; present groups in label order
+    names = ((period,) if period is not None else ()) + by
+    if not names:
+        return out
+    order = np.lexsort([out[name] for name in reversed(names)])
+    return {name: values[order] for name, values in out.items()}
+
+# ---- rollup -------------------------------------------------------------
+
+def rollup_rows(closed: Iterable[dict]) -> list[dict]:
+    """``pnl_daily`` increments for closed position rows (dicts of ``Position`` columns)."""
+    rows: dict[tuple, dict] = {}
+    for pos in closed:
+        if pos["closed_at"] is None or pos["realised_pnl"] is None:
+            continue
+        pnl = pos["realised_pnl"]
+        key = (pos["closed_at"].date().isoformat(), pos["user_id"], pos["symbol"])
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = {"day": key[0], "user_id": key[1], "symbol": key[2], "trades": 0, "wins": 0,
+                               "realised_pnl": 0.0, "fees": 0.0, "buy_amount": 0.0, "sell_amount": 0.0,
+                               "best": pnl, "worst": pnl}
+        row["trades"] += 1
+        row["wins"] += pnl > 0
+        row["realised_pnl"] += pnl
+        row["fees"] += (pos["total_buy_fees"] or 0.0) + (pos["total_sell_fees"] or 0.0)
+        row["buy_amount"] += pos["total_buy_amount"] or 0.0
+        row["sell_amount"] += pos["total_sell_amount"] or 0.0
+        row["best"], row["worst"] = max(row["best"], pnl), min(row["worst"], pnl)
+    return list(rows.values())
+
+def rollup_upsert():
+    """Statement adding :func:`rollup_rows` output onto the existing ``pnl_daily`` rows."""
+    stmt = insert(PnlDaily)
+    new, old = stmt.excluded, PnlDaily.__table__.c
+    return stmt.on_conflict_do_update(
+        index_elements=["day", "user_id", "symbol"],
+        set_={
+            **{name: old[name] + new[name] for name in SUMS},
+            "best": func.max(func.coalesce(old.best, new.best), new.best),
+            "worst": func.min(func.coalesce(old.worst, new.worst), new.worst),
+        },
+    )
+
+def rebuild(path: Path | str, chunk_rows: int = CHUNK_ROWS) -> int:
+    """Recompute ``pnl_daily`` from ``positions``; returns the number of rollup rows.
+
+    Runs in one write transaction, so a live trader's position writes wait
+    for it (up to SQLite's busy timeout); best run while trading is quiet.
+    """
+    with contextlib.closing(sqlite3.connect(path, isolation_level=None)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = aggregate(read_facts(path, chunk_rows), "day")
+            conn.execute("DELETE FROM pnl_daily")
+            conn.executemany(
+                "INSERT INTO pnl_daily (day, user_id, symbol, trades, wins, realised_pnl, fees,"
+                " buy_amount, sell_amount, best, worst) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(np.datetime_as_string(rows["day"]).tolist(), rows["user_id"].tolist(),
+                    rows["symbol"].tolist(), *(rows[name].tolist() for name in SUMS + ("best", "worst"))),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return len(rows["day"])
+
+# ---- export -------------------------------------------------------------
+
+def export(path: Path | str, out: Path | str, fmt: str = "parquet", closed: bool = True,
+           chunk_rows: int = CHUNK_ROWS) -> int:
+    """Write ``positions`` to a Parquet or Arrow IPC file, one record batch per chunk."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("export needs pyarrow: pip install pyarrow") from None
+    writer = None
+    rows = 0
+    try:
+        for chunk in read_positions(path, chunk_rows, closed):
+            table = pa.table(chunk)
+            if writer is None:
+                writer = (pq.ParquetWriter(str(out), table.schema) if fmt == "parquet"
+                          else pa.ipc.new_file(str(out), table.schema))
+            writer.write_table(table)
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+# ---- command line -------------------------------------------------------
+
+def _print(table: Chunk, columns: list[str]):
+    cells = [[_cell(table[name][i]) for name in columns] for i in range(len(table[columns[0]]))]
+    widths = [max([len(name)] + [len(row[j]) for row in cells]) for j, name in enumerate(columns)]
+    print("  ".join(name.rjust(w) for name, w in zip(columns, widths)))
+    for row in cells:
+        print("  ".join(cell.rjust(w) for cell, w in zip(row, widths)))
+
+def _cell(value) -> str:
+    if isinstance(value, np.datetime64):
+        return str(value)
+    if isinstance(value, (np.floating, float)):
+        return "-" if np.isnan(value) else f"{value:,.4f}"
+    return str(value)
+
+def main(argv: list[str] | None = None):
+    from .db import DB_PATH
+
+    p = argparse.ArgumentParser(prog="python -m bitget_trader.analytics", description=__doc__.splitlines()[0])
+    p.add_argument("--db", default=str(DB_PATH))
+    sub = p.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="realised P/L per period")
+    report.add_argument("--period", choices=PERIODS, default="day")
+    report.add_argument("--by", choices=("trader", "symbol", "all"), default="trader")
+    report.add_argument("--since", type=date.fromisoformat)
+    report.add_argument("--from-positions", action="store_true", help="aggregate positions, not the rollup")
+    sub.add_parser("symbols", help="all-time stats per symbol")
+    exp = sub.add_parser("export", help="write positions to Parquet or Arrow")
+    exp.add_argument("out")
+    exp.add_argument("--format", choices=("parquet", "arrow"), default="parquet")
+    exp.add_argument("--all", action="store_true", help="open positions too")
+    sub.add_parser("rebuild", help="recompute the pnl_daily rollup")
+    args = p.parse_args(argv)
+
+    started = time.perf_counter()
+    stats = ["trades", "win_rate", "realised_pnl", "fees", "fee_drag"]
+    if args.command == "report":
+        if args.from_positions:
+            source = read_facts(args.db)
+            if args.since:
+                since = np.datetime64(args.since, "D")
+                source = ({k: v[c["day"] >= since] for k, v in c.items()} for c in source)
+        else:
+            source = read_rollup(args.db, since=args.since)
+        by = {"trader": ("user_id",), "symbol": ("symbol",), "all": ()}[args.by]
+        _print(aggregate(source, args.period, by), [args.period, *by] + stats)
+    elif args.command == "symbols":
+        _print(aggregate(read_rollup(args.db), None, ("symbol",)), ["symbol"] + stats + ["best", "worst"])
+    elif args.command == "export":
+        rows = export(args.db, args.out, args.format, closed=not args.all)
+        print(f"wrote {rows} positions to {args.out}")
+    else:
+        print(f"pnl_daily rebuilt with {rebuild(args.db)} rows")
+    print(f"({time.perf_counter() - started:.2f}s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,518 @@
+"""Replay recorded signals through the real ``Dispatcher`` and ``Trader`` against historical candles.
+
+    python -m bitget_trader.backtest SIGNALS CANDLES [--balance USDT] [--fee-rate R ...]
+        [--slippage-bps B ...] [--impact K] [--latency S] [--amount USDT ...]
+        [--range START:END ...] [--per-trader] [--processes N] [--out report.json]
+
+SIGNALS is a JSON-lines file of webhook bodies, each with a ``ts`` (epoch
+seconds or ISO 8601), or a signal journal directory. CANDLES is a
+directory of ``<SYMBOL>.csv`` files of ``timestamp_ms,open,high,low,close,volume``
+rows, as ccxt's ``fetch_ohlcv`` returns them.
+
+Every run gets an event loop whose clock jumps straight to the next timer
+when nothing is ready, so fill polling, order timeouts and the gaps
+between signals take no wall time. An order fills ``latency`` seconds
+after it is placed, at the price interpolated between the open and close
+of that candle, moved against the order by ``slippage_bps`` plus
+``impact`` times the order's share of the candle's volume, and pays a
+``fee_rate`` fee in USDT. Options given several values, ranges and
+``--per-trader`` multiply into independent runs spread over a process
+pool; each returns a report.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import selectors
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Sequence
+
+import numpy as np
+
+from .config import _TraderCfg, settings
+from .dispatcher import Dispatcher
+from .exchange import InsufficientBalance
+from .positions import PositionBook
+from .signals import Alert, Signal
+from .symbols import SymbolRegistry
+from .trader import Trader
+
+_log = logging.getLogger(__name__)
+
+# ---- virtual time -------------------------------------------------------
+
+class _JumpingSelector(selectors.DefaultSelector):
+    def __init__(self):
+        super().__init__()
+        self.loop: VirtualClockLoop | None = None
+
+    def select(self, timeout: float | None = None):
+        # poll only; an idle wait for a timer becomes a jump of the clock
+        events = super().select(None if timeout is None else 0)
+        if not events and timeout:
+            self.loop.now += timeout
+        return events
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """Event loop on simulated time, starting at ``start`` (epoch seconds)."""
+
+    def __init__(self, start: float = 0.0):
+        selector = _JumpingSelector()
+        super().__init__(selector)
+        selector.loop = self
+        self.now = start
+        # a timer is due within this of now; the monotonic clock's 1ns is
+        # below the float resolution of epoch seconds and would never match
+        self._clock_resolution = 1e-6
+
+    def time(self) -> float:
+        return self.now
+
+# ---- market data --------------------------------------------------------
+
+class Candles:
+    """OHLCV bars of one symbol; times in epoch seconds."""
+
+    def __init__(self, rows: np.ndarray):
+        rows = rows[np.argsort(rows[:, 0])]
+        self.times = rows[:, 0] / 1000
+        self.open, self.close, self.volume = rows[:, 1], rows[:, 4], rows[:, 5]
+        self.step = float(np.median(np.diff(self.times))) if len(self.times) > 1 else 60.0
+
+    def _bar(self, t: float) -> int | None:
+        i = int(np.searchsorted(self.times, t, side="right")) - 1
+        if i < 0 or t >= self.times[i] + self.step:
+            return None
+        return i
+
+    def price(self, t: float) -> float | None:
+        """Price at ``t``, interpolated between the open and close of its bar."""
+        i = self._bar(t)
+        if i is None:
+            return None
+        frac = (t - self.times[i]) / self.step
+        return float(self.open[i] + (self.close[i] - self.open[i]) * frac)
+
+    def last(self, t: float) -> float | None:
+        """Close of the last bar that started at or before ``t``."""
+        i = int(np.searchsorted(self.times, t, side="right")) - 1
+        return float(self.close[i]) if i >= 0 else None
+
+    def volume_at(self, t: float) -> float:
+        i = self._bar(t)
+        return float(self.volume[i]) if i is not None else 0.0
+
+def load_candles(directory: Path | str) -> dict[str, Candles]:
+    candles = {}
+    for path in sorted(Path(directory).glob("*.csv")):
+        with open(path, newline="") as fh:
+            rows = [r[:6] for r in csv.reader(fh) if r and r[0].replace(".", "", 1).isdigit()]
+        if rows:
+            candles[path.stem.upper()] = Candles(np.array(rows, np.float64))
+    return candles
+
+def _timestamp(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value) / 1000 if value > 1e11 else float(value)  # ms or s
+    when = datetime.fromisoformat(value)
+    return (when if when.tzinfo else when.replace(tzinfo=timezone.utc)).timestamp()
+
+def load_signals(path: Path | str) -> list[tuple[float, Signal]]:
+    """Timestamped signals from a JSON-lines file of alerts or a journal directory."""
+    path = Path(path)
+    out = []
+    if path.is_dir():
+        for segment in sorted(path.glob("*.log")):
+            with open(segment, "rb") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("e") == "received":
+                        s = record["s"]
+                        out.append((record["ts"], Signal(s["type"], s["symbol"], s["amount"], s["users"],
+                                                         key=record["k"])))
+    else:
+        with open(path, encoding="utf-8") as fh:
+            for n, line in enumerate(fh):
+                if line.strip():
+                    body = json.loads(line)
+                    ts = _timestamp(body.pop("ts"))
+                    alert = Alert.model_validate(body)
+                    out.append((ts, alert.signal(f"id:{alert.id}:{n}" if alert.id else f"line:{n}")))
+    out.sort(key=lambda item: item[0])
+    return out
+
+# ---- simulated venue ----------------------------------------------------
+
+class _SimOrder:
+    __slots__ = ("id", "client_oid", "symbol", "side", "amount", "cost", "price", "fee", "fills_at", "settled")
+
+    def __init__(self, id, client_oid, symbol, side, fills_at):
+        self.id, self.client_oid, self.symbol, self.side, self.fills_at = id, client_oid, symbol, side, fills_at
+        self.amount = self.cost = self.price = self.fee = 0.0
+        self.settled = False
+
+class SimExchange:
+    """One account on a simulated spot venue, with the interface of :class:`Exchange`.
+
+    Balances change when an order fills, which is the first time anyone
+    looks at the account at or after the order's fill time.
+    """
+
+    def __init__(self, candles: dict[str, Candles], clock: Callable[[], float], balance: float,
+                 fee_rate: float = 0.001, slippage_bps: float = 5.0, impact: float = 0.0, latency: float = 0.25):
+        self._candles = candles
+        self._clock = clock
+        self.usdt = balance
+        self.holdings: dict[str, float] = {}
+        self.fee_rate, self.slippage, self.impact, self.latency = fee_rate, slippage_bps / 1e4, impact, latency
+        self.orders: None = None  # no order stream; fills are polled
+        self.symbols = SymbolRegistry()  # empty: quantities are not rounded
+        self._orders: dict[str, _SimOrder] = {}
+        self._by_oid: dict[str, _SimOrder] = {}
+        self._pending: list[_SimOrder] = []
+        self.equity: list[tuple[float, float]] = [(clock(), balance)]
+        self.fills = 0
+        self.unfilled = 0
+        self.fees = 0.0
+
+    async def load_markets(self, reload: bool = False):
+        return {}
+
+    async def start_stream(self):
+        pass
+
+    def _symbol(self, symbol: str) -> str:
+        return symbol.replace("/", "")
+
+    def _settle(self):
+        now = self._clock()
+        due = [o for o in self._pending if o.fills_at <= now]
+        if not due:
+            return
+        self._pending = [o for o in self._pending if o.fills_at > now]
+        for order in due:
+            self._fill(order)
+        self.equity.append((now, self.mark(now)))
+
+    def _fill(self, order: _SimOrder):
+        candles = self._candles.get(order.symbol)
+        price = candles.price(order.fills_at) if candles is not None else None
+        held = self.holdings.get(order.symbol, 0.0)
+        if price is None or (order.side == "sell" and held <= 0):
+            self.unfilled += 1  # no market data at that time: the order stays open until cancelled
+            return
+        notional = order.cost if order.side == "buy" else order.amount * price
+        volume = candles.volume_at(order.fills_at) * price
+        slip = self.slippage + (self.impact * notional / volume if volume else 0.0)
+        order.price = price * (1 + slip) if order.side == "buy" else price * (1 - slip)
+        if order.side == "buy":
+            order.amount = order.cost / order.price
+            order.fee = order.cost * self.fee_rate
+            self.usdt -= order.cost + order.fee
+            self.holdings[order.symbol] = held + order.amount
+        else:
+            order.amount = min(order.amount, held)
+            order.cost = order.amount * order.price
+            order.fee = order.cost * self.fee_rate
+            self.usdt += order.cost - order.fee
+            self.holdings[order.symbol] = held - order.amount
+        order.settled = True
+        self.fills += 1
+        self.fees += order.fee
+
+    def mark(self, t: float) -> float:
+        """USDT plus holdings at the last close at or before ``t``."""
+        value = self.usdt
+        for symbol, qty in self.holdings.items():
+            price = self._candles[symbol].last(t) if symbol in self._candles else None
+            value += qty * (price or 0.0)
+        return value
+
+    def _view(self, order: _SimOrder) -> dict:
+        filled = order.settled
+        return {
+            "id": order.id, "clientOrderId": order.client_oid, "symbol": order.symbol, "side": order.side,
+            "status": "closed" if filled else "open",
+            "filled": order.amount if filled else 0.0,
+            "average": order.price if filled else None,
+            "cost": order.cost if filled else 0.0,
+            "fee": {"cost": order.fee if filled else 0.0, "currency": "USDT"},
+        }
+
+    def _place(self, symbol: str, side: str, client_oid: str) -> _SimOrder:
+        self._settle()
+        if client_oid in self._by_oid:
+            raise ValueError(f"duplicate clientOid {client_oid}")
+        order = _SimOrder(uuid.uuid4().hex[:16], client_oid, self._symbol(symbol), side,
+                          self._clock() + self.latency)
+        self._orders[order.id] = self._by_oid[client_oid] = order
+        self._pending.append(order)
+        return order
+
+    async def get_available_usdt(self):
+        self._settle()
+        return self.usdt
+
+    async def create_market_buy(self, symbol: str, quote_qty: float, client_oid: str):
+        self._settle()
+        # buys placed but not yet filled have spent their USDT as far as the venue is concerned
+        committed = sum(o.cost for o in self._pending if o.side == "buy") * (1 + self.fee_rate)
+        if quote_qty * (1 + self.fee_rate) > self.usdt - committed + 1e-9:
+            raise InsufficientBalance(f"insufficient USDT for a {quote_qty} buy")
+        order = self._place(symbol, "buy", client_oid)
+        order.cost = float(quote_qty)
+        return {"id": order.id, "clientOrderId": client_oid}
+
+    async def create_market_sell(self, symbol: str, base_qty: float, client_oid: str):
+        order = self._place(symbol, "sell", client_oid)
+        order.amount = math.floor(float(base_qty) * 1e8) / 1e8
+        return {"id": order.id, "clientOrderId": client_oid}
+
+    async def fetch_order(self, order_id: str, symbol: str):
+        self._settle()
+        return self._view(self._orders[order_id])
+
+    async def find_order(self, client_oid: str, symbol: str) -> dict | None:
+        self._settle()
+        order = self._by_oid.get(client_oid)
+        return self._view(order) if order is not None else None
+
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        order = self._orders[order_id]
+        if order not in self._pending:
+            return False
+        self._pending.remove(order)
+        return True
+
+    async def close(self):
+        pass
+
+class SimBook(PositionBook):
+    """Position book kept in memory only, remembering every closed position.
+
+    Opening and closing times are rewritten to the simulated clock.
+    """
+
+    def __init__(self, clock: Callable[[], float]):
+        super().__init__(write_behind=False)
+        self._clock = clock
+        self.closed: list = []
+        self._ids = 0
+        self._done: set[tuple[str, str]] = set()  # (trader id, order id) of every applied order
+
+    async def load(self, user_ids: Sequence[str] | None = None):
+        self._open = {}
+        self.version += 1
+
+    async def applied(self, user_id: str, order_ids: Iterable[str]) -> set[str]:
+        pending = {(a["user_id"], a["order_id"]) for a in self._applied}
+        return {oid for oid in order_ids if (user_id, oid) in self._done or (user_id, oid) in pending}
+
+    async def flush(self):
+        batch, self._dirty = list(self._dirty.values()), {}
+        after, self._after = self._after, []
+        applied, self._applied = self._applied, []
+        self._done.update((a["user_id"], a["order_id"]) for a in applied)
+        now = datetime.fromtimestamp(self._clock(), timezone.utc)
+        for pos in batch:
+            if pos.id is None:
+                self._ids += 1
+                pos.id = self._ids
+                pos.opened_at = now
+            if pos.status == "CLOSED":
+                pos.closed_at = now
+                self.closed.append(pos)
+        for callback in after:
+            callback()
+
+# ---- runs ---------------------------------------------------------------
+
+@dataclass
+class BacktestJob:
+    signals: str
+    candles: str
+    name: str = ""
+    traders: list[str] = field(default_factory=list)  # default: everyone the signals name
+    balance: float = 10_000.0
+    fee_rate: float = 0.001
+    slippage_bps: float = 5.0
+    impact: float = 0.0
+    latency: float = 0.25
+    amount: float | None = None  # replaces every buy's USDT amount
+    start: str | None = None     # ISO dates, end exclusive
+    end: str | None = None
+
+class _Muted:
+    """Stands in for the Telegram outbox; a backtest only counts its messages."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def put(self, chat_id: int, text: str):
+        self.sent += 1
+
+def _max_drawdown(curve: list[tuple[float, float]]) -> float:
+    equity = np.array([value for _, value in curve])
+    peaks = np.maximum.accumulate(equity)
+    return float(np.max((peaks - equity) / peaks)) if len(equity) else 0.0
+
+def _trader_report(uid: str, venue: SimExchange, book: SimBook, end: float, balance: float) -> dict:
+    closed = [p for p in book.closed if p.user_id == uid]
+    pnl = np.array([p.realised_pnl for p in closed])
+    equity = venue.mark(end)
+    return {
+        "trades": len(closed),
+        "wins": int((pnl > 0).sum()),
+        "win_rate": float((pnl > 0).mean()) if len(pnl) else None,
+        "realised_pnl": float(pnl.sum()),
+        "fees": venue.fees,
+        "fills": venue.fills,
+        "unfilled": venue.unfilled,
+        "open_positions": len(book.positions(uid)),
+        "final_usdt": venue.usdt,
+        "final_equity": equity,
+        "return_pct": (equity / balance - 1) * 100,
+        "max_drawdown_pct": _max_drawdown(venue.equity + [(end, equity)]) * 100,
+    }
+
+async def _replay(job: BacktestJob, signals: list[tuple[float, Signal]], candles: dict[str, Candles]) -> dict:
+    loop = asyncio.get_running_loop()
+    book = SimBook(loop.time)
+    await book.start()
+    venues = {uid: SimExchange(candles, loop.time, job.balance, job.fee_rate, job.slippage_bps, job.impact,
+                               job.latency) for uid in job.traders}
+    # the simulated account is the only source of balance changes; no periodic reconcile
+    balance = settings.balance.model_copy(update={"reconcile_every": 0})
+    muted = _Muted()
+    traders = [
+        Trader(_TraderCfg(id=uid, api_key="sim", api_secret="sim", passphrase="sim", notify_chat=0),
+               book=book, exchange=venue, balance=balance, outbox=muted)
+        for uid, venue in venues.items()
+    ]
+    dispatcher = Dispatcher(traders)
+    await dispatcher.start()
+    await asyncio.gather(*(trader.start() for trader in traders))
+    for ts, sig in signals:
+        if ts > loop.time():
+            await asyncio.sleep(ts - loop.time())
+        await dispatcher.enqueue(sig)
+    await dispatcher.join()
+    stats = dispatcher.stats()
+    await dispatcher.stop()
+    for trader in traders:
+        await trader.close()
+    end = loop.time()
+    per_trader = {uid: _trader_report(uid, venue, book, end, job.balance) | {"dispatcher": stats[uid]}
+                  for uid, venue in venues.items()}
+    totals = {name: sum(r[name] for r in per_trader.values())
+              for name in ("trades", "wins", "realised_pnl", "fees", "fills", "unfilled", "final_equity")}
+    return {"totals": totals, "traders": per_trader}
+
+def run(job: BacktestJob) -> dict:
+    """Run one backtest in this process; returns its report."""
+    started = time.perf_counter()
+    signals = load_signals(job.signals)
+    lo = _timestamp(job.start) if job.start else -math.inf
+    hi = _timestamp(job.end) if job.end else math.inf
+    signals = [(ts, sig) for ts, sig in signals if lo <= ts < hi]
+    if job.amount is not None:
+        for _, sig in signals:
+            if sig.type == "buy":
+                sig.amount = job.amount
+    if not job.traders:
+        named = sorted({uid for _, sig in signals for uid in (sig.users or ())})
+        job = replace(job, traders=named or ["backtest"])
+    candles = load_candles(job.candles)
+    loop = VirtualClockLoop(signals[0][0] if signals else time.time())
+    try:
+        report = loop.run_until_complete(_replay(job, signals, candles))
+        virtual = loop.time() - (signals[0][0] if signals else loop.time())
+    finally:
+        loop.close()
+    return {"job": asdict(job), "signals": len(signals), "virtual_seconds": virtual,
+            "wall_seconds": time.perf_counter() - started, **report}
+
+def run_many(jobs: Sequence[BacktestJob], processes: int | None = None) -> list[dict]:
+    """Run ``jobs`` in parallel worker processes; reports come back in job order."""
+    if len(jobs) == 1 or processes == 1:
+        return [run(job) for job in jobs]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as pool:
+        return list(pool.map(run, jobs))
+
+def jobs_for(base: BacktestJob, grid: dict[str, list], ranges: Sequence[tuple[str, str]] = (),
+             per_trader: Sequence[str] = ()) -> list[BacktestJob]:
+    """Every combination of the ``grid`` values, date ``ranges`` and traders."""
+    names = list(grid)
+    jobs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        for start, end in ranges or [(base.start, base.end)]:
+            for uid in per_trader or [None]:
+                params = dict(zip(names, values))
+                label = [f"{k}={v}" for k, v in params.items() if len(grid[k]) > 1]
+                if ranges:
+                    label.append(f"{start}..{end}")
+                if uid is not None:
+                    label.append(uid)
+                jobs.append(replace(base, **params, start=start, end=end,
+                                    traders=[uid] if uid is not None else base.traders,
+                                    name=" ".join(label) or "backtest"))
+    return jobs
+
+def main(argv: list[str] | None = None):
+    p = argparse.ArgumentParser(prog="python -m bitget_trader.backtest", description=__doc__.splitlines()[0])
+    p.add_argument("signals")
+    p.add_argument("candles")
+    p.add_argument("--balance", type=float, nargs="+", default=[10_000.0])
+    p.add_argument("--fee-rate", type=float, nargs="+", default=[0.001])
+    p.add_argument("--slippage-bps", type=float, nargs="+", default=[5.0])
+    p.add_argument("--impact", type=float, nargs="+", default=[0.0])
+    p.add_argument("--latency", type=float, nargs="+", default=[0.25])
+    p.add_argument("--amount", type=float, nargs="+", default=[None])
+    p.add_argument("--range", nargs="+", default=[], help="START:END in ISO dates, END exclusive")
+    p.add_argument("--traders", nargs="+", default=[])
+    p.add_argument("--per-trader", action="store_true", help="one run per trader")
+    p.add_argument("--processes", type=int)
+    p.add_argument("--out")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    base = BacktestJob(args.signals, args.candles, traders=args.traders)
+    grid = {"balance": args.balance, "fee_rate": args.fee_rate, "slippage_bps": args.slippage_bps,
+            "impact": args.impact, "latency": args.latency, "amount": args.amount}
+    ranges = [tuple(r.split(":", 1)) for r in args.range]
+    per_trader = []
+    if args.per_trader:
+        per_trader = args.traders or sorted({u for _, s in load_signals(args.signals) for u in (s.users or ())})
+    jobs = jobs_for(base, grid, ranges, per_trader)
+    started = time.perf_counter()
+    reports = run_many(jobs, args.processes)
+    print(f"{'run':40s} {'trades':>7} {'win%':>6} {'realised':>12} {'fees':>10} {'equity':>14} {'maxDD%':>7}")
+    for job, report in zip(jobs, reports):
+        totals, traders = report["totals"], report["traders"].values()
+        win = totals["wins"] / totals["trades"] * 100 if totals["trades"] else 0.0
+        drawdown = max((t["max_drawdown_pct"] for t in traders), default=0.0)
+        print(f"{job.name[:40]:40s} {totals['trades']:7d} {win:6.1f} {totals['realised_pnl']:12.2f} "
+              f"{totals['fees']:10.2f} {totals['final_equity']:14.2f} {drawdown:7.2f}")
+    print(f"{len(jobs)} runs in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(reports, fh, indent=2)
+
+if __name__ == "__main__":
+    main()
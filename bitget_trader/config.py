@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Literal
+
 import yaml
 from pydantic import BaseModel, SecretStr
 
 ROOT = Path(__file__).resolve().parent.parent
 _DEFAULT_CFG = ROOT / "config.yaml"
 
+class _ExecutionCfg(BaseModel):
+    mode: Literal["market", "twap", "iceberg"] = "market"
+    slices: int = 4             # twap: child orders per order
+    max_slice: float = 1000.0   # iceberg: USDT per child order at most
+    interval: float = 2.0       # seconds between child orders
+    min_total: float = 0.0      # orders worth less USDT go out whole
+
 class _TraderCfg(BaseModel):
     id: str
     api_key: SecretStr
@@ -14,15 +23,85 @@ class _TraderCfg(BaseModel):
     passphrase: SecretStr
     demo_mode: bool = False
     notify_chat: int
+    order_stream: bool = False  # detect fills from the private WebSocket
+    execution: _ExecutionCfg | None = None  # overrides the global execution settings
 
 class _Timeouts(BaseModel):
     buy: int = 8
     sell: int = 8
 
+class _RateLimits(BaseModel):
+    # weight units per second, per API key (Bitget's base is 20/s;
+    # order placement weighs 2, so 20 here means 10 orders/s)
+    order: float = 20
+    query: float = 20
+    account: float = 20
+    burst: float = 1.0  # seconds of budget that may be spent at once
+
+class _BalanceCfg(BaseModel):
+    max_age: float = 30.0          # seconds before the cached balance is refreshed, behind the next buy
+    reconcile_every: float = 60.0  # background fetch_balance interval, 0 to disable
+
+class _DispatcherCfg(BaseModel):
+    workers: int = 4        # concurrent signals per trader
+    queue_size: int = 100   # pending signals per trader before enqueue waits
+
+class _PositionsCfg(BaseModel):
+    write_behind: bool = True    # batch position writes in the background
+    flush_interval: float = 0.05 # seconds between write-behind commits
+
+class _DedupCfg(BaseModel):
+    ttl: float = 600.0          # seconds an alert is remembered
+    window: float = 10.0        # identical alerts without an id this close together are one
+    max_entries: int = 100_000  # upper bound on remembered alerts
+
+class _JournalCfg(BaseModel):
+    enabled: bool = True
+    path: str = "journal"             # directory, relative to the project root
+    segment_bytes: int = 64 << 20     # start a new segment file past this size
+    replay_max_age: float = 300.0     # older unfinished signals are only reconciled, not traded
+
+class _ReconcileCfg(BaseModel):
+    enabled: bool = True
+    interval: float = 600.0        # seconds between runs after the one at startup, 0 for startup only
+    grace: float = 60.0            # fills younger than this are left to the trader that placed them
+    lookback: float = 86_400.0     # at most this many seconds of fills read for a symbol without a cursor yet
+
+class _ReloadCfg(BaseModel):
+    watch: bool = True     # apply edits of config.yaml without a restart
+    interval: float = 2.0  # seconds between checks of the file
+
+class _TickersCfg(BaseModel):
+    stream: bool = True            # follow prices on the public ticker WebSocket
+    refresh_interval: float = 1.0  # seconds between syncs of the tracked symbols
+    max_age: float = 10.0          # prices older than this are fetched over REST
+
+class _HttpCfg(BaseModel):
+    limit: int = 100              # open connections in the shared pool
+    limit_per_host: int = 20
+    keepalive: float = 120.0      # seconds an idle connection is kept
+    dns_ttl: int = 300            # seconds a DNS answer is cached
+    keep_warm: float = 20.0       # ping after this many idle seconds, 0 to disable
+    warm_connections: int = 2     # connections kept open per ping URL
+    ping_urls: list[str] = ["https://api.bitget.com/api/v2/public/time"]
+
 class Settings(BaseModel):
     traders: list[_TraderCfg]
     timeouts: _Timeouts = _Timeouts()
-    rate_limit_rps: int = 15
+    rate_limit_rps: int = 15  # shared budget for public endpoints
+    rate_limits: _RateLimits = _RateLimits()
+    balance: _BalanceCfg = _BalanceCfg()
+    dispatcher: _DispatcherCfg = _DispatcherCfg()
+    positions: _PositionsCfg = _PositionsCfg()
+    reconcile: _ReconcileCfg = _ReconcileCfg()
+    execution: _ExecutionCfg = _ExecutionCfg()
+    reload: _ReloadCfg = _ReloadCfg()
+    dedup: _DedupCfg = _DedupCfg()
+    journal: _JournalCfg = _JournalCfg()
+    tickers: _TickersCfg = _TickersCfg()
+    http: _HttpCfg = _HttpCfg()
+    market_cache_ttl: float = 3600.0  # seconds before cached market metadata is refreshed
+    shards: int = 0  # worker processes for the traders; 0 or 1 runs them in the webhook process
     tradingview_secret: SecretStr
     telegram_token: SecretStr
 
@@ -0,0 +1,184 @@
+"""One pooled HTTP session shared by every ccxt client of a process.
+
+ccxt opens a private aiohttp session per client, so each trader pays its
+own DNS lookup, TCP connect and TLS handshake, and again whenever an idle
+connection has been dropped. Here all clients share one connector with a
+DNS cache and long keep-alive, and a background task pings Bitget while
+the process is quiet so the first order after a lull finds a warm
+connection. Trace hooks count new connections (each one a handshake),
+reuses and DNS lookups.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import ssl
+import time
+
+import aiohttp
+
+from .config import _HttpCfg, settings
+from .metrics import HTTP_CONNECT
+from .utils import RateLimiter
+
+_log = logging.getLogger(__name__)
+
+class ConnectionPool:
+    """Lazily created aiohttp session bound to the running loop.
+
+    ``cfg`` defaults to ``settings.http``, read when the session is made.
+    """
+
+    def __init__(self, cfg: _HttpCfg | None = None, limiter: RateLimiter | None = None,
+                 ssl_context: ssl.SSLContext | None = None):
+        self._cfg = cfg
+        self._limiter = limiter
+        self._ssl = ssl_context
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._last_used = 0.0
+        self.requests = 0
+        self.in_flight = 0  # requests sent and not yet answered
+        self.connections = 0  # new connections, i.e. TCP + TLS handshakes
+        self.reused = 0
+        self.dns_lookups = 0
+        self.dns_cache_hits = 0
+        self.pings = 0
+        self.ping_failures = 0
+
+    @property
+    def cfg(self) -> _HttpCfg:
+        return self._cfg or settings.http
+
+    def _trace(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def request_start(session, ctx, params):
+            self.requests += 1
+            self.in_flight += 1
+            self._last_used = time.monotonic()
+
+        async def request_done(session, ctx, params):
+            self.in_flight -= 1
+
+        async def create_start(session, ctx, params):
+            ctx.connect_started = time.perf_counter()
+
+        async def create_end(session, ctx, params):
+            self.connections += 1
+            HTTP_CONNECT.observe(time.perf_counter() - ctx.connect_started)
+
+        async def reuse(session, ctx, params):
+            self.reused += 1
+
+        async def resolved(session, ctx, params):
+            self.dns_lookups += 1
+
+        async def cache_hit(session, ctx, params):
+            self.dns_cache_hits += 1
+
+        trace.on_request_start.append(request_start)
+        trace.on_request_end.append(request_done)
+        trace.on_request_exception.append(request_done)
+        trace.on_connection_create_start.append(create_start)
+        trace.on_connection_create_end.append(create_end)
+        trace.on_connection_reuseconn.append(reuse)
+        trace.on_dns_resolvehost_end.append(resolved)
+        trace.on_dns_cache_hit.append(cache_hit)
+        return trace
+
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, created on first use in the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            cfg = self.cfg
+            if self._ssl is None:
+                import certifi  # the CA bundle ccxt uses too
+                self._ssl = ssl.create_default_context(cafile=certifi.where())
+            connector = aiohttp.TCPConnector(
+                ssl=self._ssl,
+                limit=cfg.limit,
+                limit_per_host=cfg.limit_per_host,
+                ttl_dns_cache=cfg.dns_ttl,
+                keepalive_timeout=cfg.keepalive,
+                happy_eyeballs_delay=0,  # as ccxt's own connector: race IPv4 and IPv6
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace()])
+            self._loop = loop
+        return self._session
+
+    def attach(self, client) -> bool:
+        """Make the ccxt ``client`` send its requests through the shared session.
+
+        Outside a running loop the client keeps its own session.
+        """
+        try:
+            session = self.session()
+        except RuntimeError:
+            return False
+        client.session = session
+        client.own_session = False  # ccxt's close() then leaves it open
+        return True
+
+    async def _ping(self, session: aiohttp.ClientSession, url: str):
+        try:
+            if self._limiter is not None:
+                async with self._limiter.limit("", RateLimiter.PUBLIC, 1):
+                    pass
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                await response.read()
+            self.pings += 1
+        except Exception as exc:
+            self.ping_failures += 1
+            _log.debug("Keep-warm ping to %s failed: %s", url, exc)
+
+    async def warm(self):
+        """Open (or keep open) ``warm_connections`` connections to every ping URL."""
+        session = self.session()
+        await asyncio.gather(*(self._ping(session, url)
+                               for url in self.cfg.ping_urls for _ in range(self.cfg.warm_connections)))
+
+    async def _keep_warm(self):
+        interval = self.cfg.keep_warm
+        while True:
+            # only ping once nothing has used the pool for a whole interval
+            wait = self._last_used + interval - time.monotonic()
+            if wait <= 0:
+                await self.warm()
+                wait = interval
+            await asyncio.sleep(wait)
+
+    async def start(self):
+        """Warm the pool, then keep it warm in the background."""
+        if not self.cfg.ping_urls:
+            return
+        await self.warm()
+        if self.cfg.keep_warm > 0 and self._task is None:
+            self._task = asyncio.create_task(self._keep_warm())
+
+    def stats(self) -> dict[str, int]:
+        """Event counters, plus ``in_flight`` and ``free``: how much of the connection limit is left."""
+        limit = self.cfg.limit
+        if self._session is not None and not self._session.closed:
+            limit = self._session.connector.limit
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "reused": self.reused,
+            "dns_lookups": self.dns_lookups,
+            "dns_cache_hits": self.dns_cache_hits,
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+            "in_flight": self.in_flight,
+            "free": max(limit - self.in_flight, 0),
+        }
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
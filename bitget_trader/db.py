@@ -1,14 +1,54 @@
 from __future__ import annotations
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from pathlib import Path
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from .config import ROOT
 
 DB_PATH = ROOT / "bitget_trader.sqlite3"
 
-engine = create_async_engine(f"sqlite+aiosqlite:///{DB_PATH}", echo=False)
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers never block the writer
+    "PRAGMA synchronous=NORMAL",    # fsync at checkpoints, still crash safe in WAL mode
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",     # 16 MiB page cache
+    "PRAGMA busy_timeout=5000",
+)
+
+def make_engine(path: Path | str = DB_PATH) -> AsyncEngine:
+    eng = create_async_engine(f"sqlite+aiosqlite:///{path}", echo=False)
+
+    @event.listens_for(eng.sync_engine, "connect")
+    def _tune(dbapi_conn, _):
+        cur = dbapi_conn.cursor()
+        for pragma in _PRAGMAS:
+            cur.execute(pragma)
+        cur.close()
+
+    return eng
+
+engine = make_engine()
 async_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
-async def init_db() -> None:
+def configure(path: Path | str) -> None:
+    """Point the module-level engine and session factory at another database."""
+    global engine, async_session
+    engine = make_engine(path)
+    async_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+def _create(conn) -> None:
     from .models import Base
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+    # fill_cursors once held one cursor per trader; each becomes that trader's start row
+    old = inspect(conn).has_table("fill_cursors") and not any(
+        c["name"] == "symbol" for c in inspect(conn).get_columns("fill_cursors"))
+    if old:
+        conn.exec_driver_sql("ALTER TABLE fill_cursors RENAME TO fill_cursors_old")
+    Base.metadata.create_all(conn)
+    if old:
+        conn.exec_driver_sql("INSERT INTO fill_cursors (user_id, symbol, since_ms, updated_at)"
+                             " SELECT user_id, '*', since_ms, updated_at FROM fill_cursors_old")
+        conn.exec_driver_sql("DROP TABLE fill_cursors_old")
+
+async def init_db(eng: AsyncEngine | None = None) -> None:
+    async with (eng or engine).begin() as conn:
+        await conn.run_sync(_create)
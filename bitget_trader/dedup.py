@@ -0,0 +1,84 @@
+"""Recently seen webhook alerts, so retried deliveries are not traded twice."""
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+
+from .config import settings
+from .signals import Alert
+
+def alert_key(alert: Alert, window: float, now: float | None = None) -> tuple[str, str | None]:
+    """Dedup key of ``alert`` and the one of the previous window.
+
+    The key is the alert's ``id``, or else a hash of the normalised payload,
+    together with the ``window``-second slot it arrived in; checking the
+    previous slot as well catches copies straddling a boundary. Ids get a
+    slot too, since senders reuse them (a TradingView strategy's
+    ``{{strategy.order.id}}`` is e.g. "Long" on every entry) and the key
+    also seeds the orders' clientOids, which Bitget never lets us reuse.
+    """
+    slot = int((time.time() if now is None else now) // window)
+    if alert.id:
+        return f"id:{alert.id}:{slot}", f"id:{alert.id}:{slot - 1}"
+    users = ",".join(sorted(alert.users)) if alert.users else ""
+    payload = f"{alert.type}|{alert.symbol}|{alert.amount}|{users}"
+    if alert.execution:
+        payload += f"|{alert.execution}"
+    payload = payload.encode()
+
+    def key(s: int) -> str:
+        return "h:" + hashlib.blake2b(payload + s.to_bytes(8, "big"), digest_size=12).hexdigest()
+
+    return key(slot), key(slot - 1)
+
+class DedupCache:
+    """Bounded set of keys that expire ``ttl`` seconds after insertion.
+
+    Keys are kept in insertion order, which with a fixed TTL is also expiry
+    order, so eviction only ever looks at the oldest entries and every
+    operation is O(1) amortised. Past ``max_entries`` the oldest keys go
+    first, whatever their age.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._expiry: OrderedDict[str, float] = OrderedDict()
+        self.hits = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def _expire(self, now: float):
+        expiry = self._expiry
+        while expiry:
+            key, at = next(iter(expiry.items()))
+            if at > now:
+                break
+            del expiry[key]
+
+    def __contains__(self, key: str) -> bool:
+        at = self._expiry.get(key)
+        return at is not None and at > self._clock()
+
+    def add(self, key: str, *also: str | None) -> bool:
+        """Record ``key``; False (a duplicate) if it or any of ``also`` is already known."""
+        now = self._clock()
+        self._expire(now)
+        if key in self._expiry or any(k is not None and k in self._expiry for k in also):
+            self.hits += 1
+            return False
+        self._expiry[key] = now + self.ttl
+        if len(self._expiry) > self.max_entries:
+            self._expiry.popitem(last=False)
+            self.evicted += 1
+        return True
+
+    def discard(self, key: str):
+        """Forget ``key``, e.g. when its signal could not be queued after all."""
+        self._expiry.pop(key, None)
+
+seen = DedupCache(settings.dedup.ttl, settings.dedup.max_entries)
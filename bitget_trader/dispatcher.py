@@ -1,31 +1,268 @@
 from __future__ import annotations
 
-import asyncio, logging
-from collections import defaultdict
-from typing import Sequence
+import asyncio, logging, time, uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Sequence
 
+from .journal import Journal
 from .signals import Signal
 from .trader import Trader
+from .config import settings
+from .metrics import record
 
 _log = logging.getLogger(__name__)
 
+@dataclass(slots=True)
+class _Job:
+    sig: Signal
+    enqueued: float
+
+class _Lane:
+    """Bounded work queue of one trader.
+
+    Sells are served before pending buys. Redundant signals are merged on
+    arrival: a sell drops the buys still queued for its symbol (the sell
+    closes whatever they would have added) and repeated sells collapse
+    into one. Which signals of one symbol may run at once is up to the
+    trader's per-symbol gate.
+    """
+
+    def __init__(self, maxsize: int, dropped: Callable[[Signal], None] | None = None):
+        self.maxsize = maxsize
+        self._dropped = dropped  # told about every signal merged away
+        self._sells: deque[_Job] = deque()
+        self._buys: deque[_Job] = deque()
+        self._active = 0  # jobs taken by a worker and not done yet
+        self._reserved = 0  # room held for a batch still waiting on other lanes
+        self._cond = asyncio.Condition()
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._sells) + len(self._buys)
+
+    def _merge(self, sig: Signal) -> bool:
+        if sig.type != "sell":
+            return False
+        gone = [j.sig for j in self._buys if j.sig.symbol == sig.symbol]
+        if gone:
+            self._buys = deque(j for j in self._buys if j.sig.symbol != sig.symbol)
+        if any(j.sig.symbol == sig.symbol for j in self._sells):
+            gone.append(sig)
+        self.coalesced += len(gone)
+        if self._dropped is not None:
+            for dropped in gone:
+                self._dropped(dropped)
+        return gone[-1:] == [sig]
+
+    async def put(self, sig: Signal):
+        await self.put_many([sig])
+
+    def _fits(self, count: int) -> bool:
+        return len(self) + self._reserved <= max(self.maxsize - count, 0)
+
+    async def reserve(self, count: int):
+        """Wait until ``count`` more signals fit and hold that room for ``put_many(..., reserved=True)``."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._fits(count))
+            self._reserved += count
+
+    async def release(self, count: int):
+        async with self._cond:
+            self._reserved -= count
+            self._cond.notify_all()
+
+    async def put_many(self, sigs: Sequence[Signal], reserved: bool = False):
+        """Queue ``sigs`` in order and in one go; waits until all of them fit, unless ``reserved``."""
+        loop = asyncio.get_running_loop()
+        async with self._cond:
+            if reserved:
+                self._reserved -= len(sigs)
+            else:
+                await self._cond.wait_for(lambda: self._fits(len(sigs)))
+            now = loop.time()
+            for sig in sigs:
+                sig.queued = True  # merged away or not, the lane has dealt with it
+                if not self._merge(sig):
+                    (self._sells if sig.type == "sell" else self._buys).append(_Job(sig, now))
+            self._cond.notify_all()
+
+    async def get(self) -> _Job:
+        async with self._cond:
+            await self._cond.wait_for(lambda: len(self))
+            job = (self._sells or self._buys).popleft()
+            self._active += 1
+            self._cond.notify_all()
+            return job
+
+    async def done(self, job: _Job):
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    async def join(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: not len(self) and not self._active)
+
 class Dispatcher:
-    def __init__(self, traders: Sequence[Trader]):
+    def __init__(self, traders: Sequence[Trader], workers: int | None = None, queue_size: int | None = None,
+                 journal: Journal | None = None):
         self._traders = {t.id: t for t in traders}
-        self._queue: asyncio.Queue[Signal] = asyncio.Queue()
+        self._workers = workers or settings.dispatcher.workers
+        self._queue_size = queue_size or settings.dispatcher.queue_size
+        self._journal = journal
+        self._lanes = {uid: _Lane(self._queue_size, self._finisher(uid)) for uid in self._traders}
+        self._tasks: dict[asyncio.Task, str] = {}
+        self.processed: dict[str, int] = dict.fromkeys(self._traders, 0)
+        self.failed: dict[str, int] = dict.fromkeys(self._traders, 0)
+        self.wait_time: dict[str, float] = dict.fromkeys(self._traders, 0.0)
+        self.max_wait: dict[str, float] = dict.fromkeys(self._traders, 0.0)
+
+    def _finisher(self, uid: str) -> Callable[[Signal], None] | None:
+        if self._journal is None:
+            return None
+        return lambda sig: self._journal.note(sig.key, uid, "done")
+
+    async def _journal_received(self, sigs: Sequence[Signal]):
+        if self._journal is not None:
+            for sig in sigs:
+                if not sig.key:
+                    sig.key = uuid.uuid4().hex
+            await self._journal.received(sigs)
 
     async def enqueue(self, sig: Signal):
-        await self._queue.put(sig)
+        """Route ``sig`` to its traders' lanes, waiting while a lane is full."""
+        await self.enqueue_many([sig])
+
+    async def enqueue_many(self, sigs: Sequence[Signal]):
+        """Route a batch; each lane receives its share contiguously and in order.
+
+        All or nothing: room is reserved in every target lane before any
+        lane gets a signal, so a call cancelled while it waits for room has
+        queued nothing, and one that got its room queues everything.
+        """
+        await self._journal_received(sigs)
+        shares: dict[str, list[Signal]] = {}
+        for sig in sigs:
+            for uid in sig.users or self._traders:
+                if uid in self._lanes:
+                    shares.setdefault(uid, []).append(sig)
+        if len(shares) == 1:
+            (uid, share), = shares.items()
+            await self._lanes[uid].put_many(share)  # one lane fills in a single step
+            return
+        lanes = [(self._lanes[uid], shares[uid]) for uid in sorted(shares)]  # one order, so no two batches deadlock
+        held: list[tuple[_Lane, int]] = []
+        try:
+            for lane, share in lanes:
+                await lane.reserve(len(share))
+                held.append((lane, len(share)))
+        except BaseException:
+            await asyncio.shield(asyncio.gather(*(lane.release(count) for lane, count in held)))
+            raise
+        commit = asyncio.ensure_future(asyncio.gather(*(lane.put_many(share, True) for lane, share in lanes)))
+        try:
+            await asyncio.shield(commit)
+        except asyncio.CancelledError:
+            await asyncio.wait([commit])  # the room is ours: finish queueing before letting the cancellation through
+            raise
 
-    async def _consume(self):
+    async def join(self):
+        """Wait until every queued signal has been handled."""
+        await asyncio.gather(*(lane.join() for lane in self._lanes.values()))
+
+    async def _work(self, uid: str):
+        lane = self._lanes[uid]
+        loop = asyncio.get_running_loop()
         while True:
-            sig = await self._queue.get()
-            targets = sig.users or list(self._traders.keys())
-            for uid in targets:
-                trader = self._traders.get(uid)
-                if trader:
-                    asyncio.create_task(trader.handle(sig))
-            self._queue.task_done()
+            job = await lane.get()
+            trader = self._traders[uid]  # looked up per job: a reload may have replaced it
+            waited = loop.time() - job.enqueued
+            self.wait_time[uid] += waited
+            self.max_wait[uid] = max(self.max_wait[uid], waited)
+            record(job.sig, "queue_wait", waited)
+            try:
+                await trader.handle(job.sig)
+            except Exception:
+                self.failed[uid] += 1
+                if self._journal is not None:
+                    self._journal.note(job.sig.key, uid, "failed")
+                _log.exception("Trader %s failed on %s", uid, job.sig)
+            finally:
+                if job.sig.received_at:
+                    record(job.sig, "total", time.perf_counter() - job.sig.received_at)
+                self.processed[uid] += 1
+                await lane.done(job)
+
+    async def replay(self, max_age: float | None = None) -> int:
+        """Queue the journal's unfinished signals; call once traders are started."""
+        if self._journal is None:
+            return 0
+        pending = self._journal.pending(max_age)
+        for sig in pending:
+            await self._lanes[sig.users[0]].put(sig)
+        if pending:
+            _log.warning("Replaying %d unfinished signals from the journal", len(pending))
+        return len(pending)
+
+    def add(self, trader: Trader):
+        """Start serving a new trader, with its own lane and workers."""
+        uid = trader.id
+        self._traders[uid] = trader
+        self._lanes[uid] = _Lane(self._queue_size, self._finisher(uid))
+        for stat in (self.processed, self.failed, self.wait_time, self.max_wait):
+            stat.setdefault(uid, 0)
+        for _ in range(self._workers):
+            self._spawn(uid)
+
+    def replace(self, trader: Trader) -> Trader:
+        """Hand the lane of ``trader.id`` to ``trader``; returns the one it had, which may still be busy."""
+        old, self._traders[trader.id] = self._traders[trader.id], trader
+        return old
+
+    async def retire(self, uid: str) -> Trader:
+        """Stop routing signals to ``uid``, finish those it has, then stop its workers; returns its trader."""
+        lane = self._lanes.pop(uid)
+        await lane.join()
+        tasks = [task for task, owner in self._tasks.items() if owner == uid]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return self._traders.pop(uid)
+
+    def _spawn(self, uid: str):
+        task = asyncio.create_task(self._work(uid))
+        self._tasks[task] = uid
+        task.add_done_callback(self._on_exit)
+
+    def _on_exit(self, task: asyncio.Task):
+        uid = self._tasks.pop(task)
+        if task.cancelled():
+            return
+        _log.error("Worker for %s died, restarting", uid, exc_info=task.exception())
+        if uid in self._lanes:  # not if the trader was retired meanwhile
+            self._spawn(uid)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            uid: {
+                "depth": len(lane),
+                "processed": self.processed[uid],
+                "failed": self.failed[uid],
+                "coalesced": lane.coalesced,
+                "avg_wait": self.wait_time[uid] / self.processed[uid] if self.processed[uid] else 0.0,
+                "max_wait": self.max_wait[uid],
+            }
+            for uid, lane in self._lanes.items()
+        }
 
     async def start(self):
-        asyncio.create_task(self._consume())
\ No newline at end of file
+        for uid in self._traders:
+            for _ in range(self._workers):
+                self._spawn(uid)
+
+    async def stop(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,61 +1,170 @@
 from __future__ import annotations
 
-import ccxt.async_support as ccxt  # type: ignore
+import hashlib
 from .utils import retry, RateLimiter
 from .config import settings
+from .connections import ConnectionPool
+from .symbols import SymbolRegistry
+from .markets import cache_for
+from .ws import OrderStream
 
-rate_limiter = RateLimiter(settings.rate_limit_rps)
+# builds the ccxt client from its config; swapped for a stand-in by the benchmarks
+client_factory = None
+
+rate_limiter = RateLimiter(
+    settings.rate_limits.model_dump(exclude={"burst"}),
+    settings.rate_limit_rps,
+    settings.rate_limits.burst,
+)
+
+# HTTP connections shared by every client of this process; keep-warm pings count against the public budget
+pool = ConnectionPool(limiter=rate_limiter)
+
+# endpoint group and weight charged per wrapper call, in ccxt/Bitget cost units
+# (symbols 1 + coins 6.67 for markets, place/cancel 2, orderInfo 1, assets 2)
+WEIGHTS: dict[str, tuple[str, float]] = {
+    "load_markets": (RateLimiter.PUBLIC, 8),
+    "fetch_tickers": (RateLimiter.PUBLIC, 1),
+    "get_available_usdt": ("account", 2),
+    "create_market_buy": ("order", 2),
+    "create_market_sell": ("order", 2),
+    "cancel_order": ("order", 2),
+    "fetch_order": ("query", 1),
+    "fetch_my_trades": ("query", 1),
+}
+
+class InsufficientBalance(Exception):
+    """Bitget refused an order for lack of funds."""
 
 class Exchange:
-    """Thin async wrapper around ccxt.bitget with shared rate‑limit."""
+    """Thin async wrapper around ccxt.bitget with per-key weighted rate limits."""
 
-    def __init__(self, api_key: str, secret: str, password: str, demo: bool):
-        self._client = ccxt.bitget({
+    def __init__(self, api_key: str, secret: str, password: str, demo: bool,
+                 limiter: RateLimiter | None = None, stream: bool = False):
+        config = {
             "apiKey": api_key,
             "secret": secret,
             "password": password,
-            "options": {"defaultType": "spot"},
-        })
+            "options": {"defaultType": "spot", "fetchMarkets": {"types": ["spot"]}},
+        }
+        if client_factory is not None:
+            self._client = client_factory(config)
+        else:
+            import ccxt.async_support as ccxt  # type: ignore  # deferred, ccxt is slow to import
+            self._client = ccxt.bitget(config)
+            pool.attach(self._client)
+        self._demo = demo
         if demo:
             self._client.set_sandbox_mode(True)
-            
+        self._limiter = limiter or rate_limiter
+        self._key = hashlib.sha256(api_key.encode()).hexdigest()[:8]
+        # optional private WebSocket feed of order updates for fill detection
+        self.orders: OrderStream | None = OrderStream(api_key, secret, password, demo) if stream else None
+
     @classmethod
     async def create(cls, api_key: str, secret: str, password: str, demo: bool) -> Exchange:
         instance = cls(api_key, secret, password, demo)
         await instance.load_markets()
         return instance
 
+    async def start_stream(self):
+        if self.orders is not None:
+            await self.orders.start()
+
+    def _limit(self, method: str):
+        endpoint, weight = WEIGHTS[method]
+        return self._limiter.limit(self._key, endpoint, weight)
+
+    async def load_markets(self, reload: bool = False):
+        """Markets come from the cache shared by every client of this environment."""
+        return await cache_for(self._demo).load(self, reload)
+
     @retry()
-    async def load_markets(self):
-        async with rate_limiter:
-            return await self._client.load_markets()
-    
+    async def fetch_market_data(self) -> tuple[list[dict], dict]:
+        async with self._limit("load_markets"):
+            currencies = await self._client.fetch_currencies()
+            self._client.options["cachedCurrencies"] = currencies
+            try:
+                markets = await self._client.fetch_markets()
+            finally:
+                self._client.options.pop("cachedCurrencies", None)
+            return markets, currencies
+
+    @property
+    def markets(self) -> dict:
+        return self._client.markets
+
+    @property
+    def symbols(self) -> SymbolRegistry:
+        return cache_for(self._demo).symbols
+
+    def use_markets(self, markets: list[dict], currencies: dict | None):
+        self._client.set_markets(markets, currencies)
+
+    def share_markets(self, source: Exchange):
+        self._client.set_markets_from_exchange(source._client)
+
+    @retry()
+    async def fetch_tickers(self, symbols: list[str]) -> dict[str, float]:
+        """Last prices of ``symbols`` (unified, e.g. ``BTC/USDT``) in one request."""
+        async with self._limit("fetch_tickers"):
+            tickers = await self._client.fetch_tickers(symbols)
+        return {symbol: float(t["last"]) for symbol, t in tickers.items() if t.get("last") is not None}
+
     @retry()
     async def get_available_usdt(self):
-        async with rate_limiter:
+        async with self._limit("get_available_usdt"):
             balance = await self._client.fetch_balance()
             return balance['free'].get('USDT', 0.0)
 
-    @retry()
+    @retry(fatal=(InsufficientBalance,))
     async def create_market_buy(self, symbol: str, quote_qty: float, client_oid: str):
-        async with rate_limiter:
-            return await self._client.create_order(symbol, "market", "buy", None, params={"cost":quote_qty, "clientOid": client_oid})
+        from ccxt.base.errors import InsufficientFunds  # type: ignore
+        async with self._limit("create_market_buy"):
+            try:
+                return await self._client.create_order(symbol, "market", "buy", None, params={"cost":quote_qty, "clientOid": client_oid})
+            except InsufficientFunds as exc:
+                raise InsufficientBalance(str(exc)) from exc
 
     @retry()
     async def create_market_sell(self, symbol: str, base_qty: float, client_oid: str):
-        base_qty = self._client.amount_to_precision(symbol, base_qty)
-        async with rate_limiter:
+        """Sell ``base_qty``, already rounded to the amount step (``SymbolInfo.round_amount``)."""
+        async with self._limit("create_market_sell"):
             return await self._client.create_order(symbol, "market", "sell", base_qty, params={"clientOid": client_oid})
 
     @retry()
     async def fetch_order(self, order_id: str, symbol: str):
-        async with rate_limiter:
+        async with self._limit("fetch_order"):
             return await self._client.fetch_order(order_id, symbol)
-        
+
+    @retry()
+    async def fetch_my_trades(self, symbol: str, since: int | None = None, limit: int = 100) -> list[dict]:
+        """Our fills of ``symbol`` from ``since`` (ms) on, oldest first, at most ``limit``."""
+        async with self._limit("fetch_my_trades"):
+            return await self._client.fetch_my_trades(symbol, since, limit)
+
+    @retry()
+    async def find_order(self, client_oid: str, symbol: str) -> dict | None:
+        """The order placed with ``client_oid``, or None if Bitget has none."""
+        from ccxt.base.errors import OrderNotFound  # type: ignore
+        async with self._limit("fetch_order"):
+            try:
+                return await self._client.fetch_order("", symbol, params={"clientOid": client_oid})
+            except OrderNotFound:
+                return None
+
     @retry()
-    async def cancel_order(self, order_id: str, symbol: str):
-        async with rate_limiter:
-            return await self._client.cancel_order(order_id, symbol)
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        """Cancel an open order; False if Bitget no longer has it open (filled or canceled meanwhile)."""
+        from ccxt.base.errors import InvalidOrder, OrderNotFound  # type: ignore
+        async with self._limit("cancel_order"):
+            try:
+                await self._client.cancel_order(order_id, symbol)
+            except (OrderNotFound, InvalidOrder):
+                return False
+        return True
 
     async def close(self):
-        await self._client.close()
\ No newline at end of file
+        if self.orders is not None:
+            await self.orders.close()
+        await self._client.close()
@@ -0,0 +1,89 @@
+"""Splitting a market order into child orders.
+
+A large market order on a thin book walks through the levels and fills at
+ever worse prices. ``twap`` sends ``slices`` equal child orders
+``interval`` seconds apart, giving the book time to fill up again;
+``iceberg`` caps every child at ``max_slice`` USDT, at the same spacing.
+Each child's clientOid is derived from the order's, so a replay finds the
+children already placed. Children respect the symbol's amount step and
+minimum order size and value: an order too small for that many valid
+children gets fewer.
+"""
+from __future__ import annotations
+
+import math
+import uuid
+from dataclasses import dataclass
+
+from .config import _ExecutionCfg
+from .symbols import SymbolInfo
+
+_CHILD_NAMESPACE = uuid.UUID("fa4d03ec-f56d-4768-9fb4-34f37ddc4559")
+
+@dataclass(frozen=True, slots=True)
+class Plan:
+    mode: str
+    sizes: tuple[float, ...]  # per child: USDT for a buy, base amount for a sell
+    interval: float = 0.0     # seconds between child orders
+
+    @property
+    def sliced(self) -> bool:
+        return len(self.sizes) > 1
+
+def child_oid(client_oid: str, n: int) -> str:
+    """clientOid of child ``n`` of the order ``client_oid`` would have been."""
+    return str(uuid.uuid5(_CHILD_NAMESPACE, f"{client_oid}|{n}"))
+
+def _count(mode: str, value: float, cfg: _ExecutionCfg) -> int:
+    """Children wanted for an order worth ``value`` USDT."""
+    if mode == "twap" and value >= cfg.min_total:
+        return max(cfg.slices, 1)
+    if mode == "iceberg" and value >= cfg.min_total:
+        return max(math.ceil(value / cfg.max_slice), 1)
+    return 1
+
+def plan_buy(cost: float, info: SymbolInfo, cfg: _ExecutionCfg, mode: str) -> Plan:
+    """Children of a buy for ``cost`` USDT, each worth at least ``info.min_cost``."""
+    n = _count(mode, cost, cfg)
+    if info.min_cost:
+        n = max(min(n, math.floor(cost / info.min_cost)), 1)
+    if n == 1:
+        return Plan(mode, (cost,))
+    child = cost / n
+    return Plan(mode, (child,) * (n - 1) + (cost - child * (n - 1),), cfg.interval)
+
+def plan_sell(qty: float, info: SymbolInfo, cfg: _ExecutionCfg, mode: str, price: float) -> Plan:
+    """Children of a sell of ``qty`` (already on the amount step), valued at ``price``.
+
+    Every child but the last is ``qty / n`` truncated to the amount step;
+    the last takes the rest, so the children add up to ``qty`` exactly.
+    """
+    n = _count(mode, qty * price, cfg)
+    smallest = max(info.min_amount, info.min_cost / price if price else 0.0)
+    while n > 1:
+        child = info.round_amount(qty / n)
+        if child > 0 and child >= smallest:
+            break
+        n -= 1
+    if n == 1:
+        return Plan(mode, (qty,))
+    last = qty - child * (n - 1)
+    if info.amount_step:
+        last = round(last, info.amount_decimals)
+    return Plan(mode, (child,) * (n - 1) + (last,), cfg.interval)
+
+def merge(fills: list[dict]) -> dict:
+    """The fills of the children as one order, in the fields the trader reads."""
+    amount = sum(float(f["filled"]) for f in fills)
+    cost = sum(float(f["cost"]) for f in fills)
+    fees = [f.get("fee") or {} for f in fills]
+    currencies = {fee.get("currency") for fee in fees}
+    return {
+        "id": fills[0]["id"],
+        "status": "closed",
+        "filled": amount,
+        "cost": cost,
+        "average": cost / amount if amount else 0.0,
+        "fee": {"cost": sum(float(fee.get("cost") or 0) for fee in fees),
+                "currency": currencies.pop() if len(currencies) == 1 else None},
+    }
@@ -0,0 +1,216 @@
+"""Append-only journal of accepted signals and how far each trader got with them.
+
+One JSON record per line in numbered segment files::
+
+    {"k": key, "e": "received", "ts": 1700000000.0, "s": {"type": ..., "symbol": ..., "amount": ..., "users": ...}}
+    {"k": key, "e": "submitted", "t": trader_id, "o": order_id}
+    {"k": key, "e": "filled" | "persisted" | "done" | "failed" | "expired", "t": trader_id}
+
+``received`` is awaited by the dispatcher before a signal is queued, so an
+acknowledged webhook is on disk. Later events are fire-and-forget progress
+markers. All records go through one writer task that writes and fsyncs
+whatever has accumulated since its last fsync, so concurrent webhooks share
+one fsync (group commit). A segment is deleted once every signal that
+started in it or before it has finished.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from .config import ROOT, settings
+from .signals import Signal
+
+_log = logging.getLogger(__name__)
+
+TERMINAL = frozenset({"persisted", "done", "failed", "expired"})
+
+class _Entry:
+    __slots__ = ("segment", "ts", "signal", "pending", "state")
+
+    def __init__(self, segment: int, ts: float, signal: dict, pending: set[str]):
+        self.segment = segment
+        self.ts = ts
+        self.signal = signal
+        self.pending = pending             # traders that have not finished it
+        self.state: dict[str, str] = {}   # trader -> last event
+
+class Journal:
+    def __init__(self, path: Path | str, traders: Iterable[str], segment_bytes: int = 64 << 20):
+        self.path = Path(path)
+        self.traders = frozenset(traders)
+        self.segment_bytes = segment_bytes
+        self._live: dict[str, _Entry] = {}
+        self._segment = 0
+        self._file = None
+        self._size = 0
+        self._buffer: list[bytes] = []
+        self._waiters: list[asyncio.Future] = []
+        self._wake = asyncio.Event()
+        self._writer: asyncio.Task | None = None
+        self._closing = False
+        self.commits = 0
+        self.records = 0
+
+    # ---- recovery ----
+
+    def _segments(self) -> list[int]:
+        return sorted(int(p.stem) for p in self.path.glob("*.log") if p.stem.isdigit())
+
+    def _file_of(self, segment: int) -> Path:
+        return self.path / f"{segment:08d}.log"
+
+    def _apply(self, record: dict, segment: int):
+        key, event = record["k"], record["e"]
+        if event == "received":
+            users = record["s"].get("users")
+            pending = {t for t in (users or self.traders) if t in self.traders}
+            if pending:
+                self._live[key] = _Entry(segment, record.get("ts", 0.0), record["s"], pending)
+            return
+        entry = self._live.get(key)
+        if entry is None or record["t"] not in entry.pending:
+            return
+        entry.state[record["t"]] = event
+        if event in TERMINAL:
+            entry.pending.discard(record["t"])
+            if not entry.pending:
+                del self._live[key]
+
+    def _scan(self) -> int:
+        records = 0
+        for segment in self._segments():
+            with open(self._file_of(segment), "rb") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn tail of a write cut short by the crash
+                    self._apply(record, segment)
+                    records += 1
+            self._segment = segment
+        return records
+
+    async def open(self) -> int:
+        """Scan existing segments, start a fresh one and the writer. Returns records read."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        records = await asyncio.to_thread(self._scan)
+        self._wake = asyncio.Event()
+        self._rotate()
+        self._writer = asyncio.create_task(self._write_loop())
+        if self._live:
+            _log.warning("Journal has %d unfinished signals", len(self._live))
+        return records
+
+    def pending(self, max_age: float | None = None, now: float | None = None) -> list[Signal]:
+        """Unfinished signals, addressed to the traders that still owe work.
+
+        Each comes back with ``replay`` set to ``"resume"``, or to
+        ``"reconcile"`` if it is older than ``max_age`` seconds and should
+        only be matched with an order that already exists, not traded anew.
+        """
+        now = time.time() if now is None else now
+        out = []
+        for key, entry in self._live.items():
+            stale = max_age is not None and now - entry.ts > max_age
+            for uid in sorted(entry.pending):
+                s = entry.signal
+                mode = "reconcile" if stale and uid not in entry.state else "resume"
+                out.append(Signal(s["type"], s["symbol"], s["amount"], [uid], key=key, replay=mode,
+                                  execution=s.get("execution", "")))
+        return out
+
+    # ---- writing ----
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        self._segment += 1
+        self._file = open(self._file_of(self._segment), "ab")
+        self._size = 0
+        oldest = min((e.segment for e in self._live.values()), default=self._segment)
+        for segment in self._segments():
+            if segment < oldest:
+                os.unlink(self._file_of(segment))
+
+    def _append(self, record: dict):
+        self._apply(record, self._segment)
+        self._buffer.append(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+        self._wake.set()
+
+    async def received(self, sigs: Sequence[Signal]):
+        """Record ``sigs`` as accepted; returns once they are on disk."""
+        now = time.time()
+        for sig in sigs:
+            self._append({"k": sig.key, "e": "received", "ts": now, "s": {
+                "type": sig.type, "symbol": sig.symbol, "amount": sig.amount,
+                "users": list(sig.users) if sig.users else None,
+                **({"execution": sig.execution} if sig.execution else {}),
+            }})
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        await future
+
+    def note(self, key: str, trader: str, event: str, order_id: str | None = None):
+        """Record progress of ``trader`` on signal ``key``; does not wait for the disk."""
+        record = {"k": key, "e": event, "t": trader}
+        if order_id is not None:
+            record["o"] = order_id
+        self._append(record)
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def _write_loop(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if not self._buffer:
+                if self._closing:
+                    return
+                continue
+            data, waiters = b"".join(self._buffer), self._waiters
+            records = len(self._buffer)
+            self._buffer, self._waiters = [], []
+            try:
+                await asyncio.to_thread(self._write, data)
+            except Exception as exc:
+                _log.error("Journal write failed: %s", exc)
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(exc)
+                continue
+            self.commits += 1
+            self.records += records
+            self._size += len(data)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+            if self._size >= self.segment_bytes:
+                self._rotate()
+            self._wake.set()  # pick up what arrived during the write, or finish closing
+
+    async def close(self):
+        """Write what is buffered, then stop."""
+        self._closing = True
+        if self._writer is not None:
+            self._wake.set()
+            await self._writer
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def open_journal(traders: Iterable[str], name: str = "") -> Journal | None:
+    """The configured journal for ``traders``, or None if journaling is off."""
+    cfg = settings.journal
+    if not cfg.enabled:
+        return None
+    return Journal(ROOT / cfg.path / name, traders, cfg.segment_bytes)
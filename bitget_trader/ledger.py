@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+_log = logging.getLogger(__name__)
+
+class BalanceLedger:
+    """Locally tracked free USDT balance of one trader.
+
+    Seeded from ``fetch_balance`` at startup and kept current from our own
+    fills, so the pre-trade check reads memory. The exchange stays the source
+    of truth: the value is refreshed when older than ``max_age`` and
+    reconciled every ``reconcile_every`` seconds (or from the account
+    WebSocket channel), but never while one of our orders is in flight.
+    Only the very first check waits for the exchange: a stale value is
+    still used and refreshed in the background, since Bitget rejects an
+    order the balance cannot cover anyway. The trader does wait for a
+    :meth:`refresh` before refusing a buy the cached value cannot cover,
+    which may be stale or predate a deposit. A refresh that lands while an
+    order is in flight is fetched again once the last order settles.
+    """
+
+    def __init__(self, exchange, max_age: float = 30.0, reconcile_every: float = 60.0, clock=time.monotonic):
+        self._exchange = exchange
+        self._max_age = max_age
+        self._reconcile_every = reconcile_every
+        self._clock = clock
+        self.free = 0.0
+        self.updated_at: float | None = None
+        self.refreshes = 0
+        self._inflight = 0
+        self._task: asyncio.Task | None = None
+        self._refreshing: asyncio.Task | None = None
+        self._recheck = False
+
+    @property
+    def stale(self) -> bool:
+        return self.updated_at is None or self._clock() - self.updated_at > self._max_age
+
+    async def refresh(self) -> float:
+        free = float(await self._exchange.get_available_usdt())
+        self.refreshes += 1
+        if self._inflight == 0:
+            self.set(free)
+        else:
+            self._recheck = True
+        return self.free
+
+    def set(self, free: float):
+        self.free = free
+        self.updated_at = self._clock()
+
+    async def available(self) -> float:
+        if self.updated_at is None:
+            await self.refresh()
+        elif self.stale and self._inflight == 0:
+            self.refresh_soon()
+        return self.free
+
+    def refresh_soon(self):
+        """Refresh in the background unless a refresh is already running."""
+        if self._refreshing is not None and not self._refreshing.done():
+            return
+        try:
+            self._refreshing = asyncio.get_running_loop().create_task(self._refresh_quietly())
+        except RuntimeError:  # settled outside a loop; the reconcile task catches up
+            pass
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except Exception as exc:
+            _log.warning("Balance refresh failed: %s", exc)
+
+    def reserve(self, amount: float = 0.0):
+        """Hold ``amount`` USDT for an order about to be submitted."""
+        self.free -= amount
+        self._inflight += 1
+
+    def settle(self, reserved: float = 0.0, spent: float = 0.0, received: float = 0.0):
+        """Release a reservation and book what the order actually spent or received."""
+        self.free += reserved - spent + received
+        self._inflight = max(self._inflight - 1, 0)
+        self.updated_at = self._clock()
+        if self._recheck and self._inflight == 0:
+            self._recheck = False
+            self.refresh_soon()
+
+    def on_account(self, data: dict):
+        """Handle a spot ``account`` channel update."""
+        if data.get("coin") == "USDT" and self._inflight == 0:
+            self.set(float(data.get("available") or 0))
+
+    async def start(self):
+        await self.refresh()
+        if self._reconcile_every and self._task is None:
+            self._task = asyncio.create_task(self._reconcile())
+
+    async def _reconcile(self):
+        while True:
+            await asyncio.sleep(self._reconcile_every)
+            try:
+                await self.refresh()
+            except Exception as exc:
+                _log.warning("Balance reconcile failed: %s", exc)
+
+    async def close(self):
+        for task in (self._task, self._refreshing):
+            if task is not None:
+                task.cancel()
+        self._task = self._refreshing = None
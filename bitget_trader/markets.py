@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .config import ROOT, settings
+from .symbols import SymbolInfo, SymbolRegistry
+
+if TYPE_CHECKING:
+    from .exchange import Exchange
+
+_log = logging.getLogger(__name__)
+
+CACHE_DIR = ROOT / ".cache"
+
+class MarketCache:
+    """Market metadata of one Bitget environment, shared by all its clients.
+
+    The first client to need markets downloads them once; every other client
+    gets the same, already indexed, dictionaries. The download is saved to ``path`` so a
+    restart serves markets from disk straight away; a cache older than
+    ``ttl`` seconds is still used but refreshed in the background, and a
+    refresh runs every ``ttl`` seconds while the service is up.
+    """
+
+    def __init__(self, demo: bool, ttl: float, path: Path | None = None):
+        self.path = path or CACHE_DIR / f"markets-{'demo' if demo else 'live'}.json"
+        self.ttl = ttl
+        self.markets: list[dict] | None = None
+        self.currencies: dict | None = None
+        self.fetched_at = 0.0
+        self.symbols = SymbolRegistry()  # active spot markets, updated in place on every refresh
+        self._members: weakref.WeakSet[Exchange] = weakref.WeakSet()
+        self._source: weakref.ref[Exchange] | None = None  # member holding indexed markets
+        self._loading: asyncio.Task | None = None
+        self._disk = asyncio.Lock()
+        self._refresher: asyncio.Task | None = None
+
+    def _read(self) -> bool:
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return False
+        self.markets, self.currencies, self.fetched_at = data["markets"], data["currencies"], data["fetched_at"]
+        self._index()
+        return True
+
+    def _index(self):
+        self.symbols.update(self.markets)
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # a file of our own: shard workers write the same cache at the same time
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", prefix=self.path.stem, dir=self.path.parent)
+        try:
+            with open(fd, "w", encoding="utf-8") as fh:
+                json.dump({"fetched_at": self.fetched_at, "markets": self.markets, "currencies": self.currencies}, fh)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    async def load(self, exchange: Exchange, reload: bool = False):
+        """Give ``exchange`` the shared markets, downloading them if needed."""
+        self._members.add(exchange)
+        if self.markets is None and not reload:
+            async with self._disk:
+                if self.markets is None:
+                    await asyncio.to_thread(self._read)
+        if self.markets is None or reload:
+            await self.refresh(exchange)
+        else:
+            self._apply(exchange)
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+        return exchange.markets
+
+    async def read(self) -> bool:
+        """Load the saved copy without a client, for processes that only validate symbols."""
+        async with self._disk:
+            return await asyncio.to_thread(self._read)
+
+    async def refresh(self, exchange: Exchange | None = None):
+        """Download markets once, however many callers ask at the same time."""
+        if self._loading is None:
+            source = exchange or next(iter(self._members))
+            self._loading = asyncio.create_task(self._download(source))
+        task = self._loading
+        try:
+            await asyncio.shield(task)
+        finally:
+            if self._loading is task and task.done():
+                self._loading = None
+
+    def _apply(self, exchange: Exchange):
+        source = self._source() if self._source is not None else None
+        if source is None or source is exchange:
+            exchange.use_markets(self.markets, self.currencies)
+            self._source = weakref.ref(exchange)
+        else:
+            exchange.share_markets(source)
+
+    async def _download(self, source: Exchange):
+        self.markets, self.currencies = await source.fetch_market_data()
+        self.fetched_at = time.time()
+        self._index()
+        self._source = None
+        self._apply(source)
+        for member in list(self._members):
+            if member is not source:
+                self._apply(member)
+        try:
+            await asyncio.to_thread(self._write)
+        except OSError as exc:
+            _log.warning("Could not write market cache %s: %s", self.path, exc)
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(max(self.ttl - (time.time() - self.fetched_at), 0))
+            if not self._members:
+                continue
+            try:
+                await self.refresh()
+            except Exception as exc:
+                _log.warning("Market refresh failed: %s", exc)
+                await asyncio.sleep(min(self.ttl, 60))
+
+    async def close(self):
+        for task in (self._refresher, self._loading):
+            if task is not None:
+                task.cancel()
+        self._refresher = self._loading = None
+
+_caches: dict[bool, MarketCache] = {}
+
+def cache_for(demo: bool) -> MarketCache:
+    cache = _caches.get(demo)
+    if cache is None:
+        cache = _caches[demo] = MarketCache(demo, settings.market_cache_ttl)
+    return cache
+
+def loaded() -> bool:
+    """Whether any environment has markets; until then alerts are not checked against them."""
+    return any(cache.markets is not None for cache in _caches.values())
+
+def lookup(symbol_id: str) -> SymbolInfo | None:
+    """``symbol_id`` (e.g. ``BTCUSDT``) in the first loaded environment that trades it."""
+    for cache in _caches.values():
+        info = cache.symbols.get(symbol_id)
+        if info is not None:
+            return info
+    return None
+
+async def close_all():
+    for cache in _caches.values():
+        await cache.close()
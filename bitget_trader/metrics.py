@@ -0,0 +1,115 @@
+"""Low-overhead counters and histograms rendered in Prometheus text format."""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+# seconds; fine at the bottom for in-process stages, coarse above for exchange round trips
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, values)) + "}"
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = {}
+        REGISTRY.append(self)
+
+    def inc(self, *labels, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` is a bisect and two additions."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        # per label set: one count per bucket plus +Inf, then the running sum
+        self._series: dict[tuple, list[float]] = {}
+        REGISTRY.append(self)
+
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self._series.items():
+            base = _labels(self.labels, labels)
+            prefix = base[:-1] + "," if base else "{"
+            total = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series):
+                total += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f'{self.name}_bucket{prefix}le="{le}"}} {total}'
+            yield f"{self.name}_sum{base} {series[-1]}"
+            yield f"{self.name}_count{base} {total}"
+
+class Gauge:
+    """Metric whose samples are read from ``collect`` at scrape time.
+
+    ``kind`` may be ``"counter"`` for totals kept elsewhere.
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...],
+                 collect: Callable[[], Iterable[tuple[tuple, float]]], kind: str = "gauge"):
+        self.name, self.help, self.labels, self.collect, self.kind = name, help, labels, collect, kind
+        REGISTRY.append(self)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in self.collect():
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+REGISTRY: list[Counter | Histogram | Gauge] = []
+
+STAGES = Histogram("bitget_stage_seconds", "Time spent per stage between webhook and fill.", ("stage",))
+RETRIES = Counter("bitget_retries_total", "Exchange calls retried by utils.retry.", ("call",))
+RATE_WAITS = Histogram("bitget_rate_limit_wait_seconds", "Time spent waiting on rate-limit buckets.", ("endpoint",))
+RECONCILED = Counter("bitget_reconciled_orders_total", "Exchange orders applied to positions by the reconciler.",
+                     ("trader", "side"))
+HTTP_CONNECT = Histogram("bitget_http_connect_seconds", "DNS, TCP and TLS setup time of new REST connections.")
+
+def record(sig, stage: str, seconds: float):
+    """Store a stage duration on the signal and in the stage histogram."""
+    if sig is not None:
+        sig.spans[stage] = seconds
+    STAGES.observe(seconds, stage)
+
+class span:
+    """``with span(sig, "submit"):`` records how long the block took."""
+
+    __slots__ = ("sig", "stage", "started")
+
+    def __init__(self, sig, stage: str):
+        self.sig, self.stage = sig, stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *_):
+        record(self.sig, self.stage, time.perf_counter() - self.started)
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
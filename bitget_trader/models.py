@@ -23,4 +23,51 @@ class Position(Base):
     total_sell_amount = mapped_column(Float, default=0.0)  # total USDT received from selling the asset
     realised_pnl = mapped_column(Float, nullable=True)
     opened_at = mapped_column(DateTime, default=datetime.now(timezone.utc))
-    closed_at = mapped_column(DateTime, nullable=True)
\ No newline at end of file
+    closed_at = mapped_column(DateTime, nullable=True)
+
+class PnlDaily(Base):
+    """Realised results of the positions closed per UTC day, trader and symbol.
+
+    Kept up to date by the position book as it writes closed positions;
+    ``python -m bitget_trader.analytics rebuild`` recomputes it from scratch.
+    """
+    __tablename__ = "pnl_daily"
+
+    day = mapped_column(String, primary_key=True)  # YYYY-MM-DD
+    user_id = mapped_column(String, primary_key=True)
+    symbol = mapped_column(String, primary_key=True)
+    trades = mapped_column(Integer, default=0)
+    wins = mapped_column(Integer, default=0)
+    realised_pnl = mapped_column(Float, default=0.0)
+    fees = mapped_column(Float, default=0.0)          # buy and sell fees
+    buy_amount = mapped_column(Float, default=0.0)
+    sell_amount = mapped_column(Float, default=0.0)
+    best = mapped_column(Float, nullable=True)        # highest realised P/L of one position
+    worst = mapped_column(Float, nullable=True)
+
+class AppliedOrder(Base):
+    """An order whose fills are reflected in ``positions``.
+
+    Written in the same transaction as the position change, so after a
+    crash the reconciler can tell which exchange fills are still missing.
+    """
+    __tablename__ = "applied_orders"
+
+    user_id = mapped_column(String, primary_key=True)
+    order_id = mapped_column(String, primary_key=True)
+    symbol = mapped_column(String)
+    side = mapped_column(String)
+    applied_at = mapped_column(DateTime)
+
+class FillCursor(Base):
+    """How far the reconciler has read a trader's fills of one symbol; every earlier one was looked at.
+
+    The row with symbol ``*`` records the trader's first reconciliation;
+    fills from before it are left alone.
+    """
+    __tablename__ = "fill_cursors"
+
+    user_id = mapped_column(String, primary_key=True)
+    symbol = mapped_column(String, primary_key=True)  # Bitget id, e.g. BTCUSDT
+    since_ms = mapped_column(Integer)   # exchange timestamp, milliseconds
+    updated_at = mapped_column(DateTime)
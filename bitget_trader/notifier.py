@@ -1,17 +1,120 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from datetime import timedelta
+
 from .config import settings
-from .telegram_wrapper import TextMessage, send_notifications_to_multiple_chats
+from .telegram_wrapper import TextMessage
+from .utils import TokenBucket
+from .metrics import span
 
 _log = logging.getLogger(__name__)
 
-async def notify(chat_id: int, text: str) -> None:
-    try:
-        await send_notifications_to_multiple_chats(
-            TextMessage(text),
-            settings.telegram_token.get_secret_value(),
-            [chat_id]
-        )
-    except Exception as exc:
-        _log.error("Telegram notify failed: %s", exc)
\ No newline at end of file
+MAX_MESSAGE = 4096  # Telegram's limit per message
+
+class Outbox:
+    """In-process Telegram outbox drained by background senders.
+
+    ``put`` only appends to a per-chat queue. One sender task per chat
+    waits ``window`` seconds to merge messages that arrive together, keeps
+    to the per-chat (``chat_interval``) and global (``global_rps``) Telegram
+    limits and retries failures with backoff, honouring ``RetryAfter``. All
+    chats share one ``telegram.Bot`` and therefore one HTTP client.
+    """
+
+    def __init__(self, token: str = "", bot=None, window: float = 0.25, chat_interval: float = 1.0,
+                 global_rps: float = 25, max_tries: int = 5):
+        self._token = token
+        self._bot = bot
+        self._window = window
+        self._chat_interval = chat_interval
+        self._global = TokenBucket(global_rps)
+        self._max_tries = max_tries
+        self._queues: dict[int, asyncio.Queue[str]] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+
+    @property
+    def bot(self):
+        if self._bot is None:
+            import telegram
+            self._bot = telegram.Bot(self._token)
+        return self._bot
+
+    def put(self, chat_id: int, text: str) -> None:
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = asyncio.Queue()
+            self._tasks[chat_id] = asyncio.create_task(self._sender(chat_id, queue))
+        queue.put_nowait(text)
+
+    def pending(self) -> int:
+        return sum(q.qsize() for q in self._queues.values())
+
+    async def _sender(self, chat_id: int, queue: asyncio.Queue[str]):
+        loop = asyncio.get_running_loop()
+        next_ok = 0.0
+        while True:
+            parts = [await queue.get()]
+            taken = 1
+            await asyncio.sleep(max(self._window, next_ok - loop.time()))
+            size = len(parts[0])
+            while not queue.empty():
+                text = queue.get_nowait()
+                taken += 1
+                if size + len(text) + 2 > MAX_MESSAGE:
+                    await self._send(chat_id, "\n\n".join(parts))
+                    parts, size = [], 0
+                parts.append(text)
+                size += len(text) + 2
+            await self._send(chat_id, "\n\n".join(parts))
+            self.merged += taken - 1
+            next_ok = loop.time() + self._chat_interval
+            for _ in range(taken):
+                queue.task_done()
+
+    async def _send(self, chat_id: int, text: str):
+        delay = 0.5
+        for attempt in range(self._max_tries):
+            await self._global.acquire()
+            try:
+                with span(None, "notify"):
+                    await TextMessage(text).send_message(self.bot, chat_id)
+                self.sent += 1
+                return
+            except Exception as exc:
+                if attempt == self._max_tries - 1:
+                    break
+                retry_after = getattr(exc, "retry_after", None)
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                _log.warning("Telegram send to %s failed (%s), retrying", chat_id, exc)
+                await asyncio.sleep(retry_after or delay)
+                delay *= 2
+        self.dropped += 1
+        _log.error("Telegram notify to %s dropped after %d tries", chat_id, self._max_tries)
+
+    async def close(self, timeout: float = 10.0):
+        """Deliver what is queued (up to ``timeout``), then stop the senders."""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(q.join() for q in self._queues.values())), timeout
+            )
+        except asyncio.TimeoutError:
+            _log.error("Telegram outbox closed with %d messages pending", self.pending())
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._queues.clear()
+        self._tasks.clear()
+        if self._bot is not None and hasattr(self._bot, "shutdown"):
+            await self._bot.shutdown()
+
+outbox = Outbox(settings.telegram_token.get_secret_value())
+
+def notify(chat_id: int, text: str) -> None:
+    """Queue a Telegram message; never blocks the caller."""
+    outbox.put(chat_id, text)
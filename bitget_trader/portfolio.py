@@ -0,0 +1,124 @@
+"""Mark-to-market view of the open positions of every trader.
+
+Position fields are copied into numpy arrays once per change of the
+position book; a snapshot then only gathers the current prices and
+computes every row and every per-trader total in a handful of array
+operations, however many traders and symbols there are.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from typing import Mapping
+
+import numpy as np
+
+from . import tickers
+from .config import settings
+from .positions import PositionBook
+
+_log = logging.getLogger(__name__)
+
+class Portfolio:
+    def __init__(self, book: PositionBook, demo: Mapping[str, bool], reload: bool = False):
+        self._book = book
+        self._demo = dict(demo)  # trader id -> demo_mode
+        self._reload = reload    # positions live in other processes; re-read them from the database
+        self._version = -1
+        self._task: asyncio.Task | None = None
+
+    def set_traders(self, demo: Mapping[str, bool]):
+        self._demo = dict(demo)
+        self._version = -1  # re-index on the next snapshot
+
+    def _index(self):
+        if self._version == self._book.version:
+            return
+        self._version = self._book.version
+        rows = [p for p in self._book.positions() if p.user_id in self._demo]
+        self._rows = [(p.user_id, p.symbol) for p in rows]
+        self._traders = sorted({uid for uid, _ in self._rows})
+        self._keys = sorted({(self._demo[uid], symbol) for uid, symbol in self._rows})
+        trader_of = {uid: i for i, uid in enumerate(self._traders)}
+        key_of = {key: i for i, key in enumerate(self._keys)}
+        n = len(rows)
+        self._trader = np.fromiter((trader_of[p.user_id] for p in rows), np.intp, n)
+        self._key = np.fromiter((key_of[(self._demo[p.user_id], p.symbol)] for p in rows), np.intp, n)
+        self._qty = np.fromiter((p.qty for p in rows), np.float64, n)
+        self._avg = np.fromiter((p.avg_cost_usdt for p in rows), np.float64, n)
+        self._basis = np.fromiter((p.total_buy_amount + p.total_buy_fees for p in rows), np.float64, n)
+
+    def symbols(self, demo: bool) -> set[str]:
+        """Symbols held on one environment, for the ticker cache to follow."""
+        self._index()
+        return {symbol for env, symbol in self._keys if env == demo}
+
+    def snapshot(self, positions: bool = True) -> dict:
+        """Totals per trader and overall; per-position rows too unless ``positions`` is False."""
+        self._index()
+        caches = {demo: tickers.cache_for(demo) for demo in {env for env, _ in self._keys}}
+        now = time.time()
+        key_price = np.fromiter((caches[env].prices.get(s, math.nan) for env, s in self._keys),
+                                np.float64, len(self._keys))
+        key_age = np.fromiter((now - caches[env].updated.get(s, math.nan) for env, s in self._keys),
+                              np.float64, len(self._keys))
+        price = key_price[self._key]
+        priced = ~np.isnan(price)
+        exposure = self._qty * price
+        pnl = exposure - self._basis
+        # unpriced rows count towards cost basis only
+        count = len(self._traders)
+        totals = {
+            "exposure": np.bincount(self._trader, np.where(priced, exposure, 0.0), count),
+            "cost_basis": np.bincount(self._trader, self._basis, count),
+            "unrealised_pnl": np.bincount(self._trader, np.where(priced, pnl, 0.0), count),
+        }
+        sums = {name: values.tolist() for name, values in totals.items()}
+        traders = {uid: {name: sums[name][i] for name in sums} for i, uid in enumerate(self._traders)}
+        columns = zip(self._rows, self._qty.tolist(), self._avg.tolist(), price.tolist(),
+                      exposure.tolist(), self._basis.tolist(), pnl.tolist()) if positions else ()
+        for (uid, symbol), qty, avg, px, value, basis, upnl in columns:
+            unpriced = math.isnan(px)
+            traders[uid].setdefault("positions", {})[symbol] = {
+                "qty": qty, "avg_cost": avg, "price": None if unpriced else px,
+                "exposure": None if unpriced else value, "cost_basis": basis,
+                "unrealised_pnl": None if unpriced else upnl,
+            }
+        ages = key_age[~np.isnan(key_age)]
+        return {
+            "as_of": now,
+            "total": {name: float(values.sum()) for name, values in totals.items()},
+            "traders": traders,
+            "unpriced": sorted({s for (_, s), p in zip(self._keys, key_price.tolist()) if math.isnan(p)}),
+            "oldest_price_age": float(ages.max()) if len(ages) else None,
+        }
+
+    async def sync(self):
+        """Point the ticker caches at the held symbols and fetch stale prices."""
+        if self._reload:
+            await self._book.load(list(self._demo))
+        for demo in set(self._demo.values()):
+            cache = tickers.cache_for(demo)
+            await cache.track(self.symbols(demo))
+            await cache.refresh()
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as exc:
+                _log.warning("Portfolio price sync failed: %s", exc)
+            await asyncio.sleep(settings.tickers.refresh_interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await tickers.close_all()
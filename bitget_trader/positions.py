@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Sequence
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.sqlite import insert as upsert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from . import db
+from .config import settings
+from .models import AppliedOrder, Position
+
+_log = logging.getLogger(__name__)
+
+_COLUMNS = [c.key for c in Position.__table__.columns if c.key != "id"]
+
+def add_fill(pos: Position, qty: float, cost: float, fee: float):
+    """Add a buy of ``qty`` for ``cost`` USDT to ``pos``, moving its average cost."""
+    old_cost = pos.avg_cost_usdt * pos.qty
+    pos.qty += qty
+    pos.avg_cost_usdt = (old_cost + cost) / pos.qty
+    pos.total_buy_fees += fee
+    pos.total_buy_amount += cost
+
+def reduce(pos: Position, qty: float, proceeds: float, fee: float):
+    """Book a sale of part of ``pos``; its proceeds count once :func:`realise` closes the rest."""
+    pos.qty -= qty
+    pos.total_sell_amount += proceeds
+    pos.total_sell_fees = (pos.total_sell_fees or 0.0) + float(fee)
+
+def realise(pos: Position, proceeds: float, fee: float, closed_at: datetime) -> float:
+    """Close ``pos`` with a sell that brought in ``proceeds`` USDT; returns the realised P/L."""
+    pos.total_sell_amount += proceeds
+    pos.total_sell_fees = (pos.total_sell_fees or 0.0) + float(fee)
+    pnl = pos.total_sell_amount - pos.total_buy_amount - pos.total_buy_fees - pos.total_sell_fees
+    pos.status = "CLOSED"
+    pos.realised_pnl = float(pnl)
+    pos.closed_at = closed_at
+    return pnl
+
+class PositionBook:
+    """In-memory index of open positions keyed by ``(trader id, symbol)``.
+
+    Loaded once from the ``positions`` table; trade logic reads and mutates
+    the ``Position`` objects here and calls :meth:`save`. With write-behind
+    a background task batches all saved rows into one transaction every
+    ``flush_interval`` seconds, otherwise every save commits before
+    returning. The table stays the source of truth: a crash loses at most
+    the last unflushed batch and :meth:`load` rebuilds the index from it.
+    A closed position is added to the ``pnl_daily`` rollup in the same
+    transaction that writes it; it is saved once after closing.
+
+    Orders are claimed by whoever applies their fills (a trader or the
+    reconciler), so no order is applied twice in one process, and
+    :meth:`mark_applied` records them in ``applied_orders`` together with
+    the positions of the same flush, so none is applied twice across one.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] | None = None,
+                 write_behind: bool | None = None, flush_interval: float | None = None):
+        self._session_factory = session_factory
+        self.write_behind = settings.positions.write_behind if write_behind is None else write_behind
+        self._interval = settings.positions.flush_interval if flush_interval is None else flush_interval
+        self._open: dict[tuple[str, str], Position] = {}
+        self._dirty: dict[int, Position] = {}
+        self._after: list[Callable[[], None]] = []  # run once the next flush commits
+        self._applied: list[dict] = []  # applied_orders rows for the next flush
+        self._claimed: set[tuple[str, str]] = set()  # (trader id, order id)
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.flushes = 0
+        self.rows_written = 0
+        self.version = 0  # bumped on every change, for readers that cache derived data
+
+    def _session(self) -> AsyncSession:
+        return (self._session_factory or db.async_session)()
+
+    async def load(self, user_ids: Sequence[str] | None = None):
+        """Index the open positions, of ``user_ids`` only if given."""
+        query = select(Position).where(Position.status == "OPEN")
+        if user_ids is not None:
+            query = query.where(Position.user_id.in_(user_ids))
+        async with self._session() as sess:
+            rows = await sess.scalars(query)
+            self._open = {(p.user_id, p.symbol): p for p in rows}
+        self.version += 1
+
+    def get(self, user_id: str, symbol: str) -> Position | None:
+        return self._open.get((user_id, symbol))
+
+    def positions(self, user_id: str | None = None) -> list[Position]:
+        return [p for p in self._open.values() if user_id is None or p.user_id == user_id]
+
+    def open(self, user_id: str, symbol: str, qty: float, price: float, cost: float, fee: float) -> Position:
+        pos = Position(
+            user_id=user_id,
+            symbol=symbol,
+            status="OPEN",
+            qty=float(qty),
+            avg_cost_usdt=float(price),
+            total_buy_fees=float(fee),
+            total_sell_fees=0.0,
+            total_buy_amount=float(cost),
+            total_sell_amount=0.0,
+            opened_at=datetime.now(timezone.utc),
+        )
+        self._open[(user_id, symbol)] = pos
+        self.version += 1
+        return pos
+
+    def close(self, pos: Position):
+        """Drop a closed position from the index (it is still written on save)."""
+        if self._open.get((pos.user_id, pos.symbol)) is pos:
+            del self._open[(pos.user_id, pos.symbol)]
+            self.version += 1
+
+    def claim(self, user_id: str, order_id: str) -> bool:
+        """Take ``order_id`` for applying; False if someone in this process already has."""
+        key = (user_id, order_id)
+        if key in self._claimed:
+            return False
+        self._claimed.add(key)
+        return True
+
+    def release(self, user_id: str, order_id: str):
+        """Give up a claim whose fills were not applied, e.g. an order that did not fill."""
+        self._claimed.discard((user_id, order_id))
+
+    def mark_applied(self, user_id: str, order_id: str, symbol: str, side: str):
+        """Record ``order_id`` as applied, in the flush that writes its position."""
+        self._applied.append({"user_id": user_id, "order_id": order_id, "symbol": symbol, "side": side,
+                              "applied_at": datetime.now(timezone.utc)})
+
+    async def applied(self, user_id: str, order_ids: Iterable[str]) -> set[str]:
+        """Which of ``order_ids`` have been applied, committed or about to be."""
+        order_ids = set(order_ids)
+        found = {a["order_id"] for a in self._applied if a["user_id"] == user_id and a["order_id"] in order_ids}
+        rest = list(order_ids - found)
+        if rest:
+            async with self._session() as sess:
+                rows = await sess.scalars(select(AppliedOrder.order_id).where(
+                    AppliedOrder.user_id == user_id, AppliedOrder.order_id.in_(rest)))
+                found.update(rows)
+        return found
+
+    async def save(self, pos: Position, then: Callable[[], None] | None = None,
+                   orders: Iterable[tuple[str, str]] = ()):
+        """Queue ``pos`` for writing; ``then`` is called once it is committed.
+
+        ``orders`` are the ``(order id, side)`` pairs whose fills the change applied.
+        """
+        for order_id, side in orders:
+            self.mark_applied(pos.user_id, order_id, pos.symbol, side)
+        self._dirty[id(pos)] = pos
+        self.version += 1
+        if then is not None:
+            self._after.append(then)
+        if self.write_behind:
+            self._wake.set()
+        else:
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._dirty and not self._applied:
+                return
+            batch, self._dirty = list(self._dirty.values()), {}
+            after, self._after = self._after, []
+            applied, self._applied = self._applied, []
+            # snapshot synchronously so later mutations land in the next batch
+            rows = [(pos, {c: getattr(pos, c) for c in _COLUMNS}) for pos in batch]
+            new = [(pos, values) for pos, values in rows if pos.id is None]
+            old = [{"id": pos.id, **values} for pos, values in rows if pos.id is not None]
+            inserted: list[Position] = []
+            try:
+                async with self._session() as sess:
+                    if new:
+                        ids = await sess.scalars(
+                            insert(Position).returning(Position.id, sort_by_parameter_order=True),
+                            [values for _, values in new],
+                        )
+                        for (pos, _), pk in zip(new, ids):
+                            pos.id = pk
+                            inserted.append(pos)
+                    if old:
+                        await sess.execute(update(Position), old)
+                    closed = [values for _, values in rows if values["status"] == "CLOSED"]
+                    if closed:
+                        # imported here: analytics pulls in numpy, which a trader only needs once a position closes
+                        from .analytics import rollup_rows, rollup_upsert
+                        closed = rollup_rows(closed)
+                        if closed:
+                            await sess.execute(rollup_upsert(), closed)
+                    if applied:
+                        await sess.execute(upsert(AppliedOrder).on_conflict_do_nothing(), applied)
+                    await sess.commit()
+            except Exception:
+                for pos in inserted:
+                    pos.id = None  # rolled back, insert again next time
+                for pos in batch:
+                    self._dirty.setdefault(id(pos), pos)
+                self._after[:0] = after
+                self._applied[:0] = applied
+                raise
+            self.flushes += 1
+            self.rows_written += len(rows)
+        for callback in after:
+            callback()
+
+    async def _writer(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            await asyncio.sleep(self._interval)
+            try:
+                await self.flush()
+            except Exception as exc:
+                _log.error("Position flush failed, will retry: %s", exc)
+                self._wake.set()
+
+    async def start(self, user_ids: Sequence[str] | None = None):
+        # bind the writer's primitives to the running loop
+        self._wake, self._flush_lock = asyncio.Event(), asyncio.Lock()
+        self._claimed.clear()  # claims live as long as the run; after a restart applied_orders decides
+        await self.load(user_ids)
+        if self.write_behind and self._task is None:
+            self._task = asyncio.create_task(self._writer())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+book = PositionBook()
@@ -1,82 +1,284 @@
 from __future__ import annotations
 
+import asyncio
+import hmac
+import importlib
 import logging
+import time
 from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
-import requests
+from pydantic import BaseModel, ValidationError
 
-from .signals import Signal
+from .signals import Alert, AlertBatch, Signal
 from .dispatcher import Dispatcher
+from .shards import ShardRouter
 from .trader import Trader
 from .db import init_db
+from .journal import Journal, open_journal
+from .portfolio import Portfolio
+from .reconcile import Reconciler
+from .reload import Reloader
+from .positions import book
 from .config import settings
-from .notifier import notify
+from .notifier import notify, outbox
+from . import dedup, markets, metrics
+from .exchange import pool, rate_limiter
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
-_dispatcher: Dispatcher | None = None
+_dispatcher: Dispatcher | ShardRouter | None = None
+_journal: Journal | None = None
+_portfolio: Portfolio | None = None
+_reconciler: Reconciler | None = None
+_reloader: Reloader | None = None
+
+def _dispatcher_stat(key: str):
+    def collect():
+        stats = _dispatcher.stats() if _dispatcher else {}
+        return [((uid,), s[key]) for uid, s in stats.items()]
+    return collect
+
+metrics.Gauge("bitget_queue_depth", "Signals waiting per trader.", ("trader",), _dispatcher_stat("depth"))
+metrics.Gauge("bitget_signals_processed_total", "Signals handled per trader.", ("trader",),
+              _dispatcher_stat("processed"), kind="counter")
+metrics.Gauge("bitget_signals_failed_total", "Signals whose handling raised, per trader.", ("trader",),
+              _dispatcher_stat("failed"), kind="counter")
+metrics.Gauge("bitget_signals_coalesced_total", "Queued signals merged away, per trader.", ("trader",),
+              _dispatcher_stat("coalesced"), kind="counter")
+metrics.Gauge(
+    "bitget_rate_limit_wait_seconds_total", "Cumulative rate-limit wait per bucket.", ("bucket",),
+    lambda: [((name,), s["wait_time"]) for name, s in rate_limiter.stats().items()], kind="counter",
+)
+metrics.Gauge(
+    "bitget_http_events_total", "Shared REST connection pool: requests, new connections, reuses, DNS, pings.",
+    ("event",), lambda: [((name,), n) for name, n in pool.stats().items() if name not in ("in_flight", "free")],
+    kind="counter",
+)
+metrics.Gauge("bitget_http_in_flight_requests", "Requests awaiting an answer on the shared pool.", (),
+              lambda: [((), pool.stats()["in_flight"])])
+metrics.Gauge("bitget_http_free_connections", "Connections the shared pool may still open or lend out.", (),
+              lambda: [((), pool.stats()["free"])])
 
 async def startDispatcher():
-    global _dispatcher, traders
-    traders = [Trader(cfg) for cfg in settings.traders]
-    _dispatcher = Dispatcher(traders)
+    global _dispatcher, _journal, traders
+    if settings.shards > 1:
+        traders = []  # they live in the shard workers, each with its own journal
+        _dispatcher = ShardRouter(settings.shards)
+    else:
+        _journal = open_journal(cfg.id for cfg in settings.traders)
+        if _journal is not None:
+            await _journal.open()
+        traders = [Trader(cfg, journal=_journal) for cfg in settings.traders]
+        _dispatcher = Dispatcher(traders, journal=_journal)
     await _dispatcher.start()
     
 async def loadMarkets():
-    for trader in traders:
-        await trader._exchange.load_markets()
+    # markets are shared per environment, so only the first trader downloads them
+    await asyncio.gather(*(trader.start() for trader in traders))
+    if settings.shards > 1:
+        # the workers have saved them by now; read them to validate symbols here
+        demos = {cfg.demo_mode for cfg in settings.traders}
+        await asyncio.gather(*(markets.cache_for(demo).read() for demo in demos))
     
+async def startReconciler():
+    global _reconciler
+    # before the journal replay, which then skips orders the reconciler has applied
+    if settings.reconcile.enabled and traders:
+        _reconciler = Reconciler(traders, book, _journal)
+        await _reconciler.start()
+
+async def startPortfolio():
+    global _portfolio
+    # in sharded mode this process's book is only a periodically reloaded copy
+    _portfolio = Portfolio(book, {cfg.id: cfg.demo_mode for cfg in settings.traders}, reload=settings.shards > 1)
+    await _portfolio.start()
+
+async def startReloader():
+    global _reloader
+    if settings.shards > 1:
+        return  # the shard workers own the traders; edits there need a restart
+    _reloader = Reloader(_dispatcher, traders, _journal, _reconciler, _portfolio)
+    if settings.reload.watch:
+        _reloader.start()
+
 async def closeTraders():
     for trader in traders:
         await trader.close()
         
-async def notifyAll(text: str):
-    for trader in traders:
-        await notify(trader.chat_id, text)
+def notifyAll(text: str):
+    for cfg in settings.traders:
+        notify(cfg.notify_chat, text)
+
+def _public_ip() -> str:
+    import requests
+    try:
+        return requests.get("http://checkip.amazonaws.com", timeout=5).text.strip()
+    except Exception:
+        return "UNKNOWN"
+
+async def announce():
+    public_ip = await asyncio.to_thread(_public_ip)
+    notifyAll(f"⚡ Server started and traders initialized on:\nhttp://{public_ip}/webhook")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print(">> Starting Server")
+    # import ccxt in the background while the database starts up
+    ccxt_import = asyncio.create_task(asyncio.to_thread(importlib.import_module, "ccxt.async_support"))
+    # and open connections to Bitget, so the market download does not pay for the handshakes
+    warming = asyncio.create_task(pool.start())
     await init_db()
+    await book.start()
+    await ccxt_import
     await startDispatcher()
+    await warming
     await loadMarkets()
-    try:
-        public_ip = requests.get("http://checkip.amazonaws.com").text.strip()
-    except Exception:
-        public_ip = "UNKNOWN"
-    await notifyAll(f"⚡ Server started and traders initialized on:\nhttp://{public_ip}/webhook")
+    await startReconciler()
+    await _dispatcher.replay(settings.journal.replay_max_age)
+    await startPortfolio()
+    await startReloader()
+    announcer = asyncio.create_task(announce())
     print(">> Server is ready")
     try:
         yield
     except Exception as e:
-        await notifyAll("❗ Server failed: \n" + str(e))
+        notifyAll("❗ Server failed: \n" + str(e))
         raise
     finally:
         print(">> Shutting down Server")
+        if _reloader is not None:
+            await _reloader.close()
+        await _portfolio.stop()
+        if _reconciler is not None:
+            await _reconciler.close()
+        await _dispatcher.stop()
+        await book.stop()  # its last flush also journals the positions it persisted
+        if _journal is not None:
+            await _journal.close()
+        await markets.close_all()
         await closeTraders()
-        await notifyAll("😓 Server stopped")
+        await pool.close()
+        announcer.cancel()
+        notifyAll("😓 Server stopped")
+        await outbox.close()
 
 app = FastAPI(title="Bitget Trader", lifespan=lifespan)
 
 
+_SECRET = settings.tradingview_secret.get_secret_value().encode()
+
+def _decode(model: type[BaseModel], raw: bytes):
+    """Parse and validate the raw body in one pass, then check the secret."""
+    try:
+        body = model.model_validate_json(raw)
+    except ValidationError as exc:
+        errors = exc.errors(include_url=False, include_input=False, include_context=False)
+        if any(e["type"] == "json_invalid" for e in errors):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+    if not hmac.compare_digest(body.auth.encode(), _SECRET):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bad auth")
+    return body
+
+def _check_listed(alerts: list[Alert]):
+    """Refuse unknown symbols and buys below the minimum notional; skipped until markets are loaded."""
+    if not markets.loaded():
+        return
+    for alert in alerts:
+        info = markets.lookup(alert.symbol)
+        if info is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                detail=f"{alert.symbol} is not traded on Bitget spot")
+        if alert.type == "buy" and alert.amount < info.min_cost:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                detail=f"{alert.symbol} buys need at least {info.min_cost:g} {info.quote}")
+
+def _first_seen(alert: Alert) -> str | None:
+    """Remember ``alert``; returns its dedup key, or None for a duplicate."""
+    key, previous = dedup.alert_key(alert, settings.dedup.window)
+    return key if dedup.seen.add(key, previous) else None
+
+def _signal(alert: Alert, key: str, received: float, parsing: float, parsed: float) -> Signal:
+    sig = alert.signal(key)
+    sig.received_at = received
+    metrics.record(sig, "receive", parsing - received)
+    metrics.record(sig, "parse", parsed - parsing)
+    return sig
+
+def _forget_unqueued(sigs: list[Signal]):
+    """Drop the dedup keys of signals no lane took, so a retry of them gets through."""
+    for sig in sigs:
+        if not sig.queued:
+            dedup.seen.discard(sig.key)
+
 @app.post("/webhook")
 async def webhook(req: Request):
+    received = time.perf_counter()
+    raw = await req.body()
+    parsing = time.perf_counter()
+    alert = _decode(Alert, raw)
+    _check_listed([alert])
+    key = _first_seen(alert)
+    if key is None:
+        print(f">> Duplicate signal ignored: {alert.type} {alert.symbol}")
+        return {"status": "duplicate"}
+    sig = _signal(alert, key, received, parsing, time.perf_counter())
+    print(f">> Received signal: {sig}")
     try:
-        data = await req.json()
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
+        await _dispatcher.enqueue(sig)
+    except BaseException as exc:
+        _forget_unqueued([sig])
+        if not sig.queued or not isinstance(exc, Exception):
+            raise
+        print(f">> Signal queued for some traders only: {exc}")
+        return {"status": "partial"}
+    return {"status": "ok"}
 
-    if data.get("auth") != settings.tradingview_secret.get_secret_value():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bad auth")
+@app.post("/webhook/batch")
+async def webhook_batch(req: Request):
+    """Several alerts in one request; all are queued or, if any is invalid, none.
 
-    try:
-        sig = Signal.from_json(data)
-        print(f">> Received signal: {sig}")
-    except ValueError as exc:
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+    If queueing fails part-way the answer is ``partial``: the signals that
+    were taken stay remembered, so resending the whole batch queues only
+    the rest.
+    """
+    received = time.perf_counter()
+    raw = await req.body()
+    parsing = time.perf_counter()
+    batch = _decode(AlertBatch, raw)
+    parsed = time.perf_counter()
+    _check_listed(batch.signals)
+    sigs = [_signal(alert, key, received, parsing, parsed)
+            for alert in batch.signals if (key := _first_seen(alert)) is not None]
+    duplicates = len(batch.signals) - len(sigs)
+    if sigs:
+        print(f">> Received {len(sigs)} signals: {', '.join(f'{s.type} {s.symbol}' for s in sigs)}")
+        try:
+            await _dispatcher.enqueue_many(sigs)
+        except BaseException as exc:
+            _forget_unqueued(sigs)
+            queued = sum(sig.queued for sig in sigs)
+            if not queued or not isinstance(exc, Exception):
+                raise
+            print(f">> Queued {queued} of {len(sigs)} signals: {exc}")
+            return {"status": "partial", "count": queued, "failed": len(sigs) - queued, "duplicates": duplicates}
+    return {"status": "ok", "count": len(sigs), "duplicates": duplicates}
 
-    await _dispatcher.enqueue(sig)
-    return {"status": "ok"}
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/portfolio")
+async def portfolio(req: Request, positions: bool = True):
+    """Unrealised P/L, exposure and cost basis per trader and symbol, at cached prices.
+
+    ``?positions=false`` leaves out the per-symbol rows.
+    """
+    token = req.headers.get("authorization", "").removeprefix("Bearer ").encode()
+    if not hmac.compare_digest(token, _SECRET):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Forbidden")
+    return _portfolio.snapshot(positions)
 
 @app.get("/ping")
 async def ping():
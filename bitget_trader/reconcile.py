@@ -0,0 +1,258 @@
+"""Bring ``positions`` back in line with the fills on the exchange.
+
+A crash between an order and the commit of its position leaves the table
+behind the account. At startup, and every ``interval`` seconds after, the
+reconciler reads each trader's fills of every symbol that may have
+missing fills (open positions, unfinished journal signals, recent
+orders): one request stream per symbol, all in parallel under the rate
+limiter, each starting at that symbol's cursor in ``fill_cursors``.
+Fills are grouped by order, and every order not yet in
+``applied_orders`` is applied like the trader would: a buy opens or adds
+to the position, a sell closes it. The cursors of the symbols read then
+move up to the start of the grace period, so a run reads only what
+happened since the last one, however long the account history. Symbols
+not read keep their cursor, so their fills are still read once they are
+looked at again. A trader's first run only records where it started:
+fills from before it are in the positions already (they predate the
+reconciler), so none is read, and a symbol without a cursor is read from
+that start, at most ``lookback`` seconds back.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from . import db
+from .config import _ReconcileCfg, settings
+from .journal import Journal
+from .metrics import RECONCILED
+from .models import FillCursor
+from .notifier import notify
+from .positions import PositionBook, add_fill, book as _default_book, realise, reduce
+from .symbols import SymbolInfo
+
+_log = logging.getLogger(__name__)
+
+PAGE = 100  # Bitget returns at most 100 fills per request
+_START = "*"  # FillCursor.symbol of the row recording a trader's first run
+
+@dataclass(slots=True)
+class _Order:
+    id: str
+    symbol: str  # Bitget id, e.g. BTCUSDT
+    side: str
+    amount: float = 0.0
+    cost: float = 0.0
+    fee: float = 0.0
+    first: int = 0      # ms, of the first fill
+    timestamp: int = 0  # ms, of the last fill
+
+@dataclass(slots=True)
+class Report:
+    """What one run did for one trader."""
+    user_id: str
+    since_ms: int
+    until_ms: int
+    symbols: int = 0
+    requests: int = 0
+    trades: int = 0
+    orders: int = 0
+    applied: list[tuple[str, str, str]] = field(default_factory=list)  # (order id, symbol, side)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (f"{self.user_id}: {self.trades} fills of {self.orders} orders in {self.symbols} symbols "
+                f"({self.requests} requests, {self.seconds * 1000:.0f} ms), {len(self.applied)} applied")
+
+class Reconciler:
+    """Reconciles the positions of ``traders`` (objects with ``id``, ``chat_id``, ``exchange``, ``released``)."""
+
+    def __init__(self, traders: Sequence, book: PositionBook | None = None, journal: Journal | None = None,
+                 cfg: _ReconcileCfg | None = None,
+                 session_factory: async_sessionmaker[AsyncSession] | None = None,
+                 clock: Callable[[], float] = time.time):
+        self._traders = list(traders)
+        self._book = book or _default_book
+        self._journal = journal
+        self._cfg = cfg
+        self._session_factory = session_factory
+        self._clock = clock
+        self._task: asyncio.Task | None = None
+        self.last: list[Report] = []
+
+    def set_traders(self, traders: Sequence):
+        self._traders = list(traders)
+
+    @property
+    def cfg(self) -> _ReconcileCfg:
+        return self._cfg or settings.reconcile
+
+    def _session(self) -> AsyncSession:
+        return (self._session_factory or db.async_session)()
+
+    async def _cursors(self, user_id: str) -> dict[str, int]:
+        async with self._session() as sess:
+            rows = await sess.execute(select(FillCursor.symbol, FillCursor.since_ms)
+                                      .where(FillCursor.user_id == user_id))
+            return dict(rows.all())
+
+    async def _save_cursors(self, user_id: str, cursors: dict[str, int]):
+        if not cursors:
+            return
+        now = datetime.now(timezone.utc)
+        stmt = insert(FillCursor)
+        stmt = stmt.on_conflict_do_update(index_elements=[FillCursor.user_id, FillCursor.symbol],
+                                          set_={"since_ms": stmt.excluded.since_ms,
+                                                "updated_at": stmt.excluded.updated_at})
+        async with self._session() as sess:
+            await sess.execute(stmt, [{"user_id": user_id, "symbol": symbol, "since_ms": since_ms, "updated_at": now}
+                                      for symbol, since_ms in cursors.items()])
+            await sess.commit()
+
+    def _symbols(self, trader) -> set[str]:
+        """Symbols of ``trader`` whose fills may be missing from its positions."""
+        symbols = {p.symbol for p in self._book.positions(trader.id)}
+        if self._journal is not None:
+            symbols.update(s.symbol for s in self._journal.pending() if s.users == [trader.id])
+        symbols.update(trader.released)
+        return symbols
+
+    async def _fetch(self, exchange, symbol: str, since: int, until: int, report: Report) -> list[dict]:
+        unified = exchange.symbols.info(symbol).symbol
+        trades: dict[str, dict] = {}
+        while True:
+            page = await exchange.fetch_my_trades(unified, since, PAGE)
+            report.requests += 1
+            for t in page:
+                if t["timestamp"] < until:
+                    trades[t["id"]] = t
+            if len(page) < PAGE or page[-1]["timestamp"] >= until:
+                return list(trades.values())
+            # fills sharing the last timestamp come again on the next page; the dict drops repeats
+            since = max(page[-1]["timestamp"], since + 1)
+
+    def _apply(self, user_id: str, order: _Order, info: SymbolInfo):
+        """Apply ``order`` to the book as the trader would have; returns the position to save.
+
+        A sell leaving more than dust, e.g. one child of a sliced sell, only
+        reduces the position.
+        """
+        pos = self._book.get(user_id, order.symbol)
+        when = datetime.fromtimestamp(order.timestamp / 1000, timezone.utc)
+        if order.side == "buy":
+            if pos is not None:
+                add_fill(pos, order.amount, order.cost, order.fee)
+            else:
+                pos = self._book.open(user_id, order.symbol, order.amount, order.cost / order.amount,
+                                      order.cost, order.fee)
+                pos.opened_at = when
+        elif pos is not None and not info.is_dust(pos.qty - order.amount):
+            reduce(pos, order.amount, order.cost, order.fee)
+        elif pos is not None:
+            realise(pos, order.cost, order.fee, when)
+            self._book.close(pos)
+        self._book.mark_applied(user_id, order.id, order.symbol, order.side)
+        return pos
+
+    async def reconcile(self, trader, grace: float) -> Report:
+        started = time.perf_counter()
+        now = int(self._clock() * 1000)
+        until = now - int(grace * 1000)
+        saved = await self._cursors(trader.id)
+        if _START not in saved:
+            saved[_START] = until
+            await self._save_cursors(trader.id, {_START: until})
+        first = max(saved.pop(_START), now - int(self.cfg.lookback * 1000))  # for symbols never read before
+        since = {s: saved.get(s, first) for s in self._symbols(trader)}
+        since = {s: ms for s, ms in since.items() if ms < until}
+        report = Report(trader.id, min(since.values(), default=until), until)
+        if not since:
+            return report
+        exchange = trader.exchange
+        report.symbols = len(since)
+        fetched = await asyncio.gather(*(self._fetch(exchange, s, ms, until, report) for s, ms in since.items()))
+
+        orders: dict[str, _Order] = {}
+        for trades in fetched:
+            for t in trades:
+                order = orders.get(t["order"])
+                if order is None:
+                    symbol = exchange.symbols.id_of(t["symbol"])
+                    order = orders[t["order"]] = _Order(t["order"], symbol, t["side"], first=t["timestamp"])
+                order.amount += float(t["amount"])
+                order.cost += float(t["cost"])
+                order.fee += float((t.get("fee") or {}).get("cost") or 0.0)
+                order.first = min(order.first, t["timestamp"])
+                order.timestamp = max(order.timestamp, t["timestamp"])
+                report.trades += 1
+        report.orders = len(orders)
+
+        done = await self._book.applied(trader.id, orders)
+        changed = {}
+        cursors = dict.fromkeys(since, until)  # only the symbols read here move
+        # claim and apply without awaiting in between, so a trader never sees half of it
+        for order in sorted(orders.values(), key=lambda o: o.timestamp):
+            if order.id in done:
+                continue
+            if not self._book.claim(trader.id, order.id):
+                # a trader is still on it; read it again next time in case it gives up
+                cursors[order.symbol] = min(cursors[order.symbol], order.first)
+                continue
+            pos = self._apply(trader.id, order, exchange.symbols.info(order.symbol))
+            if pos is not None:
+                changed[id(pos)] = pos
+            report.applied.append((order.id, order.symbol, order.side))
+            RECONCILED.inc(trader.id, order.side)
+        for pos in changed.values():
+            await self._book.save(pos)
+        await self._book.flush()
+        await self._save_cursors(trader.id, cursors)
+        for symbol, at in list(trader.released.items()):
+            if at * 1000 < until:
+                del trader.released[symbol]
+        report.seconds = time.perf_counter() - started
+        return report
+
+    async def run(self, grace: float | None = None) -> list[Report]:
+        """Reconcile every trader once; fills younger than ``grace`` seconds are left alone."""
+        grace = self.cfg.grace if grace is None else grace
+        results = await asyncio.gather(*(self.reconcile(t, grace) for t in self._traders), return_exceptions=True)
+        reports = []
+        for trader, result in zip(self._traders, results):
+            if isinstance(result, BaseException):
+                _log.warning("Reconciling %s failed: %s", trader.id, result)
+                continue
+            reports.append(result)
+            if result.applied:
+                _log.warning("Reconciled %s", result.summary())
+                orders = ", ".join(f"{side.upper()} {symbol} ({oid})" for oid, symbol, side in result.applied)
+                notify(trader.chat_id, f"🔁 Positions reconciled with Bitget fills • {orders}")
+            else:
+                _log.info("Reconciled %s", result.summary())
+        self.last = reports
+        return reports
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.cfg.interval)
+            await self.run()
+
+    async def start(self):
+        """Reconcile once, counting every fill up to now, then every ``interval`` seconds."""
+        await self.run(grace=0.0)
+        if self.cfg.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,208 @@
+"""Apply edits of ``config.yaml`` to the running process.
+
+:class:`Reloader` checks the file every ``reload.interval`` seconds. A
+changed file is loaded and validated in full, and the traders it adds or
+re-keys are started, before anything running is touched. A file that
+does not parse or validate, or a trader that cannot start, rejects the
+whole change, and the process keeps the settings it had. A valid file is
+diffed against the running settings, and only what changed is touched:
+
+- an added trader gets its own queue and workers,
+- a removed trader stops receiving signals, finishes the ones it has and
+  is closed,
+- a trader whose keys, environment or order stream changed is replaced
+  by a new instance; the old one finishes its orders in flight first,
+  and the new one handles no signal until it has,
+- other trader fields, ``timeouts``, the rate budgets and ``execution``
+  are updated in place.
+
+Other sections are only read at startup; a change to them is reported
+and takes effect at the next restart.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+
+from . import config
+from .config import Settings, settings
+from .dispatcher import Dispatcher
+from .exchange import rate_limiter
+from .journal import Journal
+from .trader import Trader
+
+_log = logging.getLogger(__name__)
+
+HOT = ("traders", "timeouts", "rate_limit_rps", "rate_limits", "execution")
+# a change to any of these needs a new exchange client
+_CLIENT_FIELDS = ("api_key", "api_secret", "passphrase", "demo_mode", "order_stream")
+
+@dataclass(slots=True)
+class Change:
+    """What one reload did."""
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    replaced: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)   # traders changed in place
+    sections: list[str] = field(default_factory=list)  # other sections applied
+    restart: list[str] = field(default_factory=list)   # sections left for the next restart
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        parts = [f"{name} {', '.join(ids)}" for name, ids in (
+            ("added", self.added), ("removed", self.removed), ("replaced", self.replaced),
+            ("updated", self.updated), ("applied", self.sections), ("needs a restart:", self.restart)) if ids]
+        return f"{'; '.join(parts) or 'no changes'} ({self.seconds * 1000:.0f} ms)"
+
+class Reloader:
+    """Applies new settings to ``dispatcher`` and ``traders`` (a list kept up to date in place)."""
+
+    def __init__(self, dispatcher: Dispatcher, traders: list[Trader], journal: Journal | None = None,
+                 reconciler=None, portfolio=None, path: Path | None = None):
+        self._dispatcher = dispatcher
+        self._traders = traders
+        self._journal = journal
+        self._reconciler = reconciler
+        self._portfolio = portfolio
+        self.path = Path(path or config._DEFAULT_CFG)
+        self._seen = self._stamp()
+        self._task: asyncio.Task | None = None
+        self._retiring: set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self.rejected = 0
+        self.last: Change | None = None
+
+    def _stamp(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def reload(self) -> Change | None:
+        """Load the file and apply it; None if it was rejected."""
+        try:
+            new = await asyncio.to_thread(Settings.load, self.path)
+            return await self.apply(new)
+        except (OSError, yaml.YAMLError, ValueError) as exc:  # pydantic's ValidationError is a ValueError
+            self.rejected += 1
+            _log.error("Rejected %s, keeping the running settings: %s", self.path, exc)
+            return None
+
+    async def apply(self, new: Settings) -> Change:
+        """Bring the process in line with ``new``; raises ``ValueError``, changing nothing, if it cannot."""
+        async with self._lock:
+            started = time.perf_counter()
+            ids = [cfg.id for cfg in new.traders]
+            if len(set(ids)) != len(ids):
+                raise ValueError(f"duplicate trader ids in {ids}")
+            old = {cfg.id: cfg for cfg in settings.traders}
+            fresh = {cfg.id: cfg for cfg in new.traders}
+            change = Change(
+                added=[uid for uid in fresh if uid not in old],
+                removed=[uid for uid in old if uid not in fresh],
+                sections=[name for name in HOT[1:] if getattr(new, name) != getattr(settings, name)],
+                restart=[name for name in Settings.model_fields
+                         if name not in HOT and getattr(new, name) != getattr(settings, name)],
+            )
+            for uid in fresh.keys() & old.keys():
+                if fresh[uid] == old[uid]:
+                    continue
+                if any(getattr(fresh[uid], f) != getattr(old[uid], f) for f in _CLIENT_FIELDS):
+                    change.replaced.append(uid)
+                else:
+                    change.updated.append(uid)
+
+            starting: list[Trader] = []
+            failed: list[tuple[str, Exception]] = []
+            for uid in change.added + change.replaced:
+                try:
+                    starting.append(Trader(fresh[uid], journal=self._journal))
+                except Exception as exc:
+                    failed.append((uid, exc))
+            if not failed:
+                for trader in starting:
+                    trader.configure(fresh[trader.id], new.timeouts, new.execution)
+                results = await asyncio.gather(*(t.start() for t in starting), return_exceptions=True)
+                failed = [(t.id, r) for t, r in zip(starting, results) if isinstance(r, Exception)]
+            if failed:
+                await asyncio.gather(*(t.close() for t in starting), return_exceptions=True)
+                raise ValueError("; ".join(f"trader {uid} failed to start: {exc}" for uid, exc in failed))
+
+            # from here on nothing awaits until the new state is complete
+            current = {t.id: t for t in self._traders}
+            for trader in starting:
+                if trader.id in current:
+                    trader.succeed(current[trader.id])
+                    self._retire(self._dispatcher.replace(trader))
+                else:
+                    self._dispatcher.add(trader)
+                current[trader.id] = trader
+            for uid in change.removed:
+                self._retire(current.pop(uid), uid)
+            for uid, trader in current.items():
+                trader.configure(fresh[uid], new.timeouts, new.execution)
+            if self._journal is not None:
+                self._journal.traders = frozenset(fresh)
+            for name in HOT:
+                setattr(settings, name, getattr(new, name))
+            if {"rate_limit_rps", "rate_limits"} & set(change.sections):
+                rate_limiter.configure(new.rate_limits.model_dump(exclude={"burst"}), new.rate_limit_rps,
+                                       new.rate_limits.burst)
+            self._traders[:] = [current[uid] for uid in fresh]
+            if self._reconciler is not None:
+                self._reconciler.set_traders(self._traders)
+            if self._portfolio is not None:
+                self._portfolio.set_traders({cfg.id: cfg.demo_mode for cfg in new.traders})
+            change.seconds = time.perf_counter() - started
+            self.last = change
+            return change
+
+    def _retire(self, trader: Trader, uid: str | None = None):
+        """Close ``trader`` once it is done; with ``uid``, its lane is retired first."""
+        async def retire():
+            try:
+                if uid is not None:
+                    await self._dispatcher.retire(uid)
+                await trader.drain()
+            finally:
+                await trader.close()
+                _log.info("Trader instance of %s retired", trader.id)
+
+        task = asyncio.create_task(retire())
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    async def settled(self):
+        """Wait until every retired trader has been closed."""
+        await asyncio.gather(*list(self._retiring), return_exceptions=True)
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            stamp = self._stamp()
+            if stamp is None or stamp == self._seen:
+                continue
+            self._seen = stamp
+            change = await self.reload()
+            if change is not None:
+                _log.warning("Applied %s: %s", self.path, change.summary())
+
+    def start(self, interval: float | None = None):
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch(interval or settings.reload.interval))
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for task in list(self._retiring):
+            task.cancel()
+        await self.settled()
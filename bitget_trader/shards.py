@@ -0,0 +1,304 @@
+"""Sharded mode: one webhook front process, traders spread over worker processes.
+
+A hash of the trader ``id`` picks the worker, so every account
+and its exchange client, rate budgets, balance ledger and positions live in
+exactly one process. The front talks to each worker over a Unix socket
+with newline-delimited JSON frames and gets an acknowledgement once the
+worker has queued the signals. Workers share the SQLite database, and
+their rows never overlap, because each trader's rows are written only by
+the process that owns that trader.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, Sequence
+
+from .config import settings
+from .signals import Signal
+
+_log = logging.getLogger(__name__)
+
+# entry point of a worker process, (index, count, socket path) -> None;
+# swapped for a patched one by the benchmarks
+worker_target: Callable[[int, int, str], None] | None = None
+
+def shard_of(trader_id: str, count: int) -> int:
+    # stable across processes, unlike hash(); crc32 clusters short similar ids
+    digest = hashlib.blake2b(trader_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+def _encode(sig: Signal) -> dict:
+    return {"type": sig.type, "symbol": sig.symbol, "amount": sig.amount,
+            "users": list(sig.users) if sig.users else None, "key": sig.key, "received_at": sig.received_at,
+            "execution": sig.execution}
+
+def _decode(data: dict) -> Signal:
+    # perf_counter() is CLOCK_MONOTONIC, the same clock in every process
+    return Signal(data["type"], data["symbol"], data["amount"], data["users"],
+                  key=data["key"], received_at=data["received_at"], execution=data["execution"])
+
+# ---- worker side ---------------------------------------------------------
+
+async def serve(index: int, count: int, path: str):
+    """Run the traders of shard ``index`` until the front closes its connection."""
+    from . import markets
+    from .dispatcher import Dispatcher
+    from .exchange import pool, rate_limiter
+    from .journal import open_journal
+    from .notifier import outbox
+    from .positions import book
+    from .reconcile import Reconciler
+    from .trader import Trader
+
+    configs = [cfg for cfg in settings.traders if shard_of(cfg.id, count) == index]
+    # private budgets are per key and keys never span shards; the public one is per IP
+    rate_limiter.configure(settings.rate_limits.model_dump(exclude={"burst"}),
+                           settings.rate_limit_rps / count, settings.rate_limits.burst)
+    await book.start([cfg.id for cfg in configs])
+    journal = open_journal((cfg.id for cfg in configs), f"shard-{index}")
+    if journal is not None:
+        await journal.open()
+    traders = [Trader(cfg, journal=journal) for cfg in configs]
+    dispatcher = Dispatcher(traders, journal=journal)
+    await dispatcher.start()
+    await pool.start()
+    await asyncio.gather(*(trader.start() for trader in traders))
+    reconciler = Reconciler(traders, book, journal) if settings.reconcile.enabled and traders else None
+    if reconciler is not None:
+        await reconciler.start()
+    await dispatcher.replay(settings.journal.replay_max_age)
+
+    closed = asyncio.Event()
+    tasks: set[asyncio.Task] = set()
+
+    async def answer(msg: dict, writer: asyncio.StreamWriter):
+        try:
+            if msg["op"] == "signals":
+                await dispatcher.enqueue_many([_decode(s) for s in msg["signals"]])
+                reply = {"id": msg["id"], "ok": True}
+            else:
+                reply = {"id": msg["id"], "stats": dispatcher.stats()}
+        except Exception as exc:
+            _log.exception("Shard %d could not answer %s", index, msg["op"])
+            reply = {"id": msg["id"], "error": str(exc)}
+        writer.write(json.dumps(reply).encode() + b"\n")
+
+    async def connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                # one task per frame so a full lane does not hold up the others;
+                # tasks reach the lane locks in arrival order
+                task = asyncio.create_task(answer(json.loads(line), writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            closed.set()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(connection, path)
+    _log.info("Shard %d/%d serving %s", index, count, ", ".join(c.id for c in configs) or "no traders")
+    try:
+        await closed.wait()
+        # the front is gone: finish the frames still being queued, then every signal they queued
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await dispatcher.join()
+    finally:
+        server.close()
+        if reconciler is not None:
+            await reconciler.close()
+        await dispatcher.stop()
+        await book.stop()
+        if journal is not None:
+            await journal.close()
+        await markets.close_all()
+        for trader in traders:
+            await trader.close()
+        await pool.close()
+        await outbox.close()
+
+def run_worker(index: int, count: int, path: str):
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s %(levelname)s shard{index} %(name)s: %(message)s")
+    asyncio.run(serve(index, count, path))
+
+# ---- front side ----------------------------------------------------------
+
+class _Shard:
+    def __init__(self, index: int, path: str):
+        self.index = index
+        self.path = path
+        self.process: multiprocessing.process.BaseProcess | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.ready = asyncio.Event()
+        self.pending: dict[int, asyncio.Future] = {}
+        self.stats: dict[str, dict] = {}
+        self.restarts = 0
+
+class ShardRouter:
+    """Front half of sharded mode; stands in for the ``Dispatcher`` in the receiver.
+
+    Starts one worker process per shard, routes each signal to the shards
+    owning its traders and waits for their acknowledgement. A supervisor
+    per shard notices a worker exiting, fails the calls it had not yet
+    acknowledged and starts a replacement, which reloads its positions
+    from the database.
+    """
+
+    def __init__(self, count: int | None = None, start_timeout: float = 60.0):
+        self.count = count or settings.shards
+        self._timeout = start_timeout
+        self._dir = tempfile.mkdtemp(prefix="bitget-shards-")
+        self._shards = [_Shard(i, str(Path(self._dir) / f"shard-{i}.sock")) for i in range(self.count)]
+        self._owner = {cfg.id: shard_of(cfg.id, self.count) for cfg in settings.traders}
+        self._ctx = multiprocessing.get_context("spawn")
+        self._tasks: list[asyncio.Task] = []
+        self._poller: asyncio.Task | None = None
+        self._ids = 0
+        self._stopping = False
+
+    async def _call(self, shard: _Shard, msg: dict) -> dict:
+        await shard.ready.wait()
+        self._ids += 1
+        msg["id"] = self._ids
+        future = asyncio.get_running_loop().create_future()
+        shard.pending[self._ids] = future
+        shard.writer.write(json.dumps(msg).encode() + b"\n")
+        reply = await future
+        if "error" in reply:
+            raise RuntimeError(f"shard {shard.index}: {reply['error']}")
+        return reply
+
+    async def enqueue(self, sig: Signal):
+        await self.enqueue_many([sig])
+
+    async def enqueue_many(self, sigs: Sequence[Signal]):
+        """Send each shard its share of ``sigs`` as one frame and wait for every ack.
+
+        Shards fail on their own, so when one does the others may still
+        have queued their share: a signal stays ``queued`` if any shard it
+        was sent to took it.
+        """
+        shares: dict[int, list[Signal]] = {}
+        owners: list[set[int]] = []
+        for sig in sigs:
+            owners.append({self._owner[uid] for uid in (sig.users or self._owner) if uid in self._owner})
+            for index in owners[-1]:
+                shares.setdefault(index, []).append(sig)
+        results = await asyncio.gather(*(self._send(self._shards[i], share) for i, share in shares.items()),
+                                       return_exceptions=True)
+        failed = {i for i, result in zip(shares, results) if isinstance(result, BaseException)}
+        if failed:
+            for sig, mine in zip(sigs, owners):
+                sig.queued = sig.queued and not mine <= failed
+            raise next(result for result in results if isinstance(result, BaseException))
+
+    async def _send(self, shard: _Shard, share: list[Signal]):
+        await shard.ready.wait()
+        for sig in share:
+            sig.queued = True  # once the frame is out the worker queues it, whether or not we await the ack
+        await self._call(shard, {"op": "signals", "signals": [_encode(sig) for sig in share]})
+
+    async def replay(self, max_age: float | None = None) -> int:
+        return 0  # each worker replays its own journal on startup
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Per-trader dispatcher stats as last reported by the workers."""
+        merged: dict[str, dict[str, float]] = {}
+        for shard in self._shards:
+            merged.update(shard.stats)
+        return merged
+
+    async def _read(self, shard: _Shard, reader: asyncio.StreamReader):
+        try:
+            while line := await reader.readline():
+                msg = json.loads(line)
+                future = shard.pending.pop(msg["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(msg)
+        finally:
+            shard.ready.clear()
+            error = ConnectionError(f"shard {shard.index} went away before acknowledging")
+            for future in shard.pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            shard.pending.clear()
+
+    async def _connect(self, shard: _Shard) -> asyncio.Task | None:
+        while shard.process.is_alive():
+            try:
+                reader, shard.writer = await asyncio.open_unix_connection(shard.path)
+            except OSError:
+                await asyncio.sleep(0.05)
+                continue
+            shard.ready.set()
+            return asyncio.create_task(self._read(shard, reader))
+        return None
+
+    async def _exited(self, process) -> None:
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        loop.add_reader(process.sentinel, lambda: done.done() or done.set_result(None))
+        try:
+            await done
+        finally:
+            loop.remove_reader(process.sentinel)
+
+    async def _supervise(self, shard: _Shard):
+        target = worker_target or run_worker
+        while True:
+            shard.process = self._ctx.Process(target=target, args=(shard.index, self.count, shard.path),
+                                              name=f"bitget-shard-{shard.index}", daemon=True)
+            shard.process.start()
+            reading = await self._connect(shard)
+            await self._exited(shard.process)
+            shard.process.join()
+            if reading is not None:
+                await asyncio.gather(reading, return_exceptions=True)
+            if self._stopping:
+                return
+            shard.restarts += 1
+            _log.error("Shard %d exited with code %s, restarting", shard.index, shard.process.exitcode)
+            await asyncio.sleep(min(shard.restarts, 5))
+
+    async def _poll_stats(self):
+        while True:
+            await asyncio.sleep(1.0)
+            for shard in self._shards:
+                if shard.ready.is_set():
+                    try:
+                        reply = await asyncio.wait_for(self._call(shard, {"op": "stats"}), self._timeout)
+                        shard.stats = reply["stats"]
+                    except ConnectionError:
+                        pass  # restarting; the supervisor reports it
+                    except Exception:
+                        _log.warning("Could not get the stats of shard %d", shard.index, exc_info=True)
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._supervise(shard)) for shard in self._shards]
+        await asyncio.wait_for(asyncio.gather(*(s.ready.wait() for s in self._shards)), self._timeout)
+        self._poller = asyncio.create_task(self._poll_stats())
+
+    async def stop(self, timeout: float = 30.0):
+        """Close the sockets; workers then drain, flush their positions and exit."""
+        self._stopping = True
+        if self._poller is not None:
+            self._poller.cancel()
+        for shard in self._shards:
+            if shard.writer is not None:
+                shard.writer.close()
+        _, running = await asyncio.wait(self._tasks, timeout=timeout)
+        if running:
+            for shard in self._shards:
+                if shard.process.is_alive():
+                    _log.error("Shard %d did not stop in %.0fs, killing it", shard.index, timeout)
+                    shard.process.kill()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        shutil.rmtree(self._dir, ignore_errors=True)
@@ -1,7 +1,55 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Literal, Sequence
+import re
+from dataclasses import dataclass, field
+from typing import Annotated, Literal, Sequence
+
+from pydantic import AfterValidator, BaseModel, BeforeValidator, Field, model_validator
+
+from .symbols import normalise
+
+# TradingView tickers of Bitget spot USDT pairs, e.g. BTCUSDT or 1INCHUSDT,
+# optionally with the exchange prefix ({{exchange}}:{{ticker}}) as in BITGET:BTCUSDT
+SYMBOL = re.compile(r"[A-Z0-9]{1,20}USDT")
+
+def _symbol(value: str) -> str:
+    value = normalise(value)
+    if not SYMBOL.fullmatch(value):
+        raise ValueError(f"not a USDT spot symbol: {value!r}")
+    return value
+
+class Alert(BaseModel):
+    """A webhook body; validated straight from the raw bytes with ``model_validate_json``."""
+
+    auth: str = ""
+    id: Annotated[str, Field(max_length=64)] | None = None  # sender's id, repeated on retries
+    type: Literal["buy", "sell"]
+    symbol: Annotated[str, AfterValidator(_symbol)]
+    amount: Annotated[float, Field(gt=0)] | None = None  # USDT, buys only
+    users: list[Annotated[str, BeforeValidator(str)]] | None = None
+    execution: Literal["market", "twap", "iceberg"] | None = None  # overrides the trader's mode
+
+    @model_validator(mode="after")
+    def _amount_for_buys(self) -> Alert:
+        if self.type == "buy" and self.amount is None:
+            raise ValueError("amount required for buy")
+        return self
+
+    def signal(self, key: str = "") -> Signal:
+        return Signal(
+            type=self.type,
+            symbol=self.symbol,
+            amount=self.amount if self.type == "buy" else None,
+            users=self.users or None,
+            key=key,
+            execution=self.execution or "",
+        )
+
+class AlertBatch(BaseModel):
+    """Several alerts under one secret, for ``/webhook/batch``."""
+
+    auth: str = ""
+    signals: Annotated[list[Alert], Field(min_length=1)]
 
 @dataclass(slots=True)
 class Signal:
@@ -9,18 +57,14 @@ class Signal:
     symbol: str
     amount: float | None  # USDT for buy; None for sell
     users: Sequence[str] | None  # optional list of trader ids
+    key: str = ""  # dedup key from the receiver; seeds the order clientOids
+    replay: str = ""  # "resume" or "reconcile" when replayed from the journal
+    received_at: float = 0.0  # perf_counter() when the webhook arrived
+    spans: dict[str, float] = field(default_factory=dict)  # stage -> seconds
+    execution: str = ""  # "market", "twap" or "iceberg"; empty for the trader's own setting
+    queued: bool = False  # taken by a trader's lane; its dedup key then stays
 
     @classmethod
     def from_json(cls, data: dict[str, object]) -> "Signal":
-        if data.get("type") not in {"buy", "sell"}:
-            raise ValueError("invalid type")
-        if "symbol" not in data:
-            raise ValueError("symbol required")
-        if data["type"] == "buy" and "amount" not in data:
-            raise ValueError("amount required for buy")
-        return cls(
-            type=data["type"],
-            symbol=str(data["symbol"]).upper(),
-            amount=float(data.get("amount", 0)) if data["type"] == "buy" else None,
-            users=list(map(str, data.get("users", []))) or None,
-        )
\ No newline at end of file
+        """Build a signal from an already decoded body; raises ``ValueError``."""
+        return Alert.model_validate(data).signal()
@@ -0,0 +1,131 @@
+"""Trading rules of every spot symbol, indexed by TradingView ticker.
+
+Built from the loaded ccxt markets (Bitget reports precision as step
+sizes) and kept in step with them by :meth:`SymbolRegistry.update`, so
+order paths look a symbol up once instead of rewriting strings and
+asking ccxt to round every quantity.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable
+
+_log = logging.getLogger(__name__)
+
+def _decimals(step: float) -> int:
+    return max(0, -Decimal(repr(step)).normalize().as_tuple().exponent) if step else 0
+
+def _fields(m: dict) -> tuple:
+    precision, limits = m.get("precision") or {}, m.get("limits") or {}
+    return (m["symbol"], m["base"], m["quote"], precision.get("amount"), precision.get("price"),
+            (limits.get("amount") or {}).get("min"), (limits.get("cost") or {}).get("min"))
+
+def normalise(ticker: str) -> str:
+    """A TradingView ticker, with or without its exchange: ``BITGET:btcusdt`` -> ``BTCUSDT``."""
+    return ticker.rpartition(":")[2].upper()
+
+@dataclass(frozen=True, slots=True)
+class SymbolInfo:
+    id: str            # Bitget id and TradingView ticker, e.g. BTCUSDT
+    symbol: str        # ccxt unified symbol, e.g. BTC/USDT
+    base: str
+    quote: str
+    amount_step: float = 0.0  # 0: no rounding
+    price_step: float = 0.0
+    min_amount: float = 0.0
+    min_cost: float = 0.0     # minimum notional, in the quote currency
+    amount_decimals: int = 0
+
+    @classmethod
+    def from_market(cls, m: dict) -> SymbolInfo:
+        precision, limits = m.get("precision") or {}, m.get("limits") or {}
+        step = float(precision.get("amount") or 0.0)
+        return cls(
+            id=m["id"], symbol=m["symbol"], base=m["base"], quote=m["quote"],
+            amount_step=step,
+            price_step=float(precision.get("price") or 0.0),
+            min_amount=float((limits.get("amount") or {}).get("min") or 0.0),
+            min_cost=float((limits.get("cost") or {}).get("min") or 0.0),
+            amount_decimals=_decimals(step),
+        )
+
+    @classmethod
+    def plain(cls, symbol_id: str) -> SymbolInfo:
+        """Rules for a ``...USDT`` symbol with no market loaded: no rounding, no minimums."""
+        base = symbol_id[:-4]
+        return cls(id=symbol_id, symbol=f"{base}/USDT", base=base, quote="USDT")
+
+    def round_amount(self, qty: float) -> float:
+        """``qty`` truncated to the amount step, as Bitget would."""
+        if not self.amount_step:
+            return float(qty)
+        steps = math.floor(qty / self.amount_step + 1e-9)  # 0.3 / 0.1 is 2.9999999999999996
+        return round(steps * self.amount_step, self.amount_decimals)
+
+    def is_dust(self, qty: float) -> bool:
+        """Whether ``qty`` is too small to sell: below the amount step or the minimum order size."""
+        return qty < max(self.amount_step, self.min_amount) or qty <= 1e-12
+
+class SymbolRegistry:
+    """Active spot symbols of one environment, by id and by unified symbol."""
+
+    def __init__(self):
+        self._by_id: dict[str, SymbolInfo] = {}
+        self._ids: dict[str, str] = {}  # unified symbol -> id
+        self._seen: dict[str, tuple] = {}  # id -> the market fields its entry was built from
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, symbol_id: str) -> bool:
+        return symbol_id in self._by_id
+
+    def get(self, symbol_id: str) -> SymbolInfo | None:
+        return self._by_id.get(symbol_id)
+
+    def info(self, symbol_id: str) -> SymbolInfo:
+        """The rules of ``symbol_id``, or :meth:`SymbolInfo.plain` ones if it is not loaded."""
+        found = self._by_id.get(symbol_id)
+        return found if found is not None else SymbolInfo.plain(symbol_id)
+
+    def id_of(self, symbol: str) -> str:
+        """``BTC/USDT`` -> ``BTCUSDT``."""
+        return self._ids.get(symbol) or symbol.replace("/", "")
+
+    def update(self, markets: Iterable[dict]) -> tuple[int, int, int]:
+        """Follow a new market list, rebuilding only changed entries.
+
+        Returns how many symbols were added, changed and removed.
+        """
+        added = changed = 0
+        live = set()
+        for m in markets:
+            if not m.get("spot") or m.get("active") is False:
+                continue
+            key = m["id"]
+            live.add(key)
+            fields = _fields(m)
+            previous = self._seen.get(key)
+            if previous == fields:
+                continue
+            info = SymbolInfo.from_market(m)
+            if previous is None:
+                added += 1
+            else:
+                changed += 1
+                self._ids.pop(previous[0], None)
+            self._by_id[key], self._ids[info.symbol], self._seen[key] = info, key, fields
+        removed = [key for key in self._by_id if key not in live]
+        for key in removed:
+            info = self._by_id.pop(key)
+            del self._seen[key]
+            self._ids.pop(info.symbol, None)
+        if added or changed or removed:
+            self.version += 1
+            if self.version > 1:
+                _log.info("Symbols updated: %d added, %d changed, %d removed", added, changed, len(removed))
+        return added, changed, len(removed)
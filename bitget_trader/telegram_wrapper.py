@@ -1,7 +1,6 @@
 """Your MessageStrategy classes unchanged."""
 from abc import ABC, abstractmethod
 from typing import List
-import telegram
 import asyncio
 
 class MessageStrategy(ABC):
@@ -25,16 +24,20 @@ class ImageMessage(MessageStrategy):
         await bot.send_photo(chat_id=chat_id, photo=self.photo_url, caption=self.caption)
 
 class MessageContext:
-    def __init__(self, strategy: MessageStrategy, bot_token: str):
+    def __init__(self, strategy: MessageStrategy, bot_token: str, bot=None):
         self._strategy = strategy
         self._bot_token = bot_token
+        self._bot = bot
 
     async def execute_send(self, chat_id):
-        bot = telegram.Bot(self._bot_token)
+        import telegram  # deferred, slow to import and only needed once we send
+        bot = self._bot or telegram.Bot(self._bot_token)
         await self._strategy.send_message(bot, chat_id)
 
 async def send_notifications_to_multiple_chats(strategy: MessageStrategy, bot_token: str, chat_ids: List[int]):
-    tasks = [MessageContext(strategy, bot_token).execute_send(chat_id) for chat_id in chat_ids]
+    import telegram
+    bot = telegram.Bot(bot_token)  # one HTTP client for all chats
+    tasks = [MessageContext(strategy, bot_token, bot).execute_send(chat_id) for chat_id in chat_ids]
     await asyncio.gather(*tasks)
 
 # Synchronous helper that is safe inside an existing event-loop
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Iterable
+
+from .config import settings
+from .ws import TickerStream
+
+if TYPE_CHECKING:
+    from .exchange import Exchange
+
+_log = logging.getLogger(__name__)
+
+class TickerCache:
+    """Last prices of the symbols held on one Bitget environment.
+
+    Prices arrive from the public ticker WebSocket when ``stream`` is on;
+    whatever is older than ``max_age`` seconds is fetched with one bulk
+    ``fetch_tickers`` call by :meth:`refresh`, so the cache keeps working
+    while the socket is down. Nobody waits on Bitget to read a price.
+    """
+
+    def __init__(self, demo: bool, max_age: float, stream: bool = True, url: str | None = None):
+        self.demo = demo
+        self.max_age = max_age
+        self.prices: dict[str, float] = {}   # exchange id (BTCUSDT) -> last price
+        self.updated: dict[str, float] = {}  # exchange id -> time.time() of that price
+        self.symbols: frozenset[str] = frozenset()
+        self._stream = TickerStream(self._on_ticker, demo, url) if stream else None
+        self._exchange: Exchange | None = None
+        self.rest_fetches = 0
+
+    def _on_ticker(self, symbol: str, price: float, ts: float):
+        self.prices[symbol] = price
+        self.updated[symbol] = time.time()
+
+    async def track(self, symbols: Iterable[str]):
+        """Follow exactly ``symbols``; prices of the others are dropped."""
+        symbols = frozenset(symbols)
+        if symbols == self.symbols:
+            return
+        for gone in self.symbols - symbols:
+            self.prices.pop(gone, None)
+            self.updated.pop(gone, None)
+        self.symbols = symbols
+        if self._stream is not None:
+            await self._stream.start()
+            await self._stream.track(symbols)
+
+    async def _client(self) -> Exchange:
+        if self._exchange is None:
+            from .exchange import Exchange
+            exchange = Exchange("", "", "", self.demo)  # public endpoints only
+            await exchange.load_markets()
+            self._exchange = exchange
+        return self._exchange
+
+    async def refresh(self, now: float | None = None):
+        """Fetch the prices that are missing or older than ``max_age``."""
+        now = time.time() if now is None else now
+        stale = [s for s in self.symbols if now - self.updated.get(s, 0.0) > self.max_age]
+        if not stale:
+            return
+        exchange = await self._client()
+        symbols = exchange.symbols
+        prices = await exchange.fetch_tickers([symbols.info(s).symbol for s in stale])
+        self.rest_fetches += 1
+        fetched = time.time()
+        for symbol, price in prices.items():
+            symbol = symbols.id_of(symbol)
+            if symbol in self.symbols:
+                self.prices[symbol] = price
+                self.updated[symbol] = fetched
+
+    async def close(self):
+        if self._stream is not None:
+            await self._stream.close()
+        if self._exchange is not None:
+            await self._exchange.close()
+            self._exchange = None
+
+_caches: dict[bool, TickerCache] = {}
+
+def cache_for(demo: bool) -> TickerCache:
+    cache = _caches.get(demo)
+    if cache is None:
+        cache = _caches[demo] = TickerCache(demo, settings.tickers.max_age, settings.tickers.stream)
+    return cache
+
+async def close_all():
+    for cache in _caches.values():
+        await cache.close()
+    _caches.clear()
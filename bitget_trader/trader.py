@@ -1,151 +1,493 @@
 from __future__ import annotations
 
 import asyncio
+import time
 import uuid 
 import logging
 from datetime import datetime, timezone
-from typing import DefaultDict
 from collections import defaultdict
-from sqlalchemy import select
+from contextlib import asynccontextmanager, suppress
+from typing import DefaultDict
 
 from .signals import Signal
-from .exchange import Exchange
-from .models import Position
-from .db import async_session
-from .config import settings
-from .notifier import notify
+from .symbols import SymbolInfo
+from .exchange import Exchange, InsufficientBalance
+from .execution import Plan, child_oid, merge, plan_buy, plan_sell
+from .ledger import BalanceLedger
+from .journal import Journal
+from .positions import PositionBook, add_fill, book as _default_book, realise, reduce
+from .config import _BalanceCfg, settings
+from .notifier import Outbox, notify
+from .metrics import record, span
 
 _log = logging.getLogger(__name__)
 
+_OID_NAMESPACE = uuid.UUID("8d0c7c52-2b1e-4c47-9a55-3f4b1f0e6a10")
+_FILLED = {"closed", "filled"}  # ccxt may map to "closed"
+_ENDED = _FILLED | {"canceled", "expired", "rejected"}
+
+def _usdt_fee(order: dict) -> float:
+    fee = order.get("fee") or {}
+    return float(fee.get("cost") or 0) if fee.get("currency") == "USDT" else 0.0
+
+class _SymbolGate:
+    """Admission to one symbol: its buys run side by side, a sell runs alone.
+
+    A buy only adds to the position, in a few statements with no await
+    between reading and writing it, so buys need not wait for each other's
+    fills. A sell closes the position, so it waits for the buys in flight,
+    and buys arriving meanwhile wait behind it.
+    """
+
+    __slots__ = ("_cond", "_buys", "_selling", "_sells_waiting")
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._buys = 0
+        self._selling = False
+        self._sells_waiting = 0
+
+    @asynccontextmanager
+    async def hold(self, side: str):
+        sell = side == "sell"
+        async with self._cond:
+            if sell:
+                self._sells_waiting += 1
+                try:
+                    await self._cond.wait_for(lambda: not self._buys and not self._selling)
+                finally:
+                    self._sells_waiting -= 1
+                    self._cond.notify_all()
+                self._selling = True
+            else:
+                await self._cond.wait_for(lambda: not self._selling and not self._sells_waiting)
+                self._buys += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                if sell:
+                    self._selling = False
+                else:
+                    self._buys -= 1
+                self._cond.notify_all()
+
 class Trader:
-    def __init__(self, cfg):
+    def __init__(self, cfg, book: PositionBook | None = None, journal: Journal | None = None,
+                 exchange: Exchange | None = None, balance: _BalanceCfg | None = None, outbox: Outbox | None = None):
         self.id: str = cfg.id
-        self._exchange = Exchange(
+        self._book = book or _default_book
+        self._journal = journal
+        # any object with Exchange's interface, e.g. the backtest's simulated venue
+        self._exchange = exchange or Exchange(
             cfg.api_key.get_secret_value(),
             cfg.api_secret.get_secret_value(),
             cfg.passphrase.get_secret_value(),
             cfg.demo_mode,
+            stream=cfg.order_stream,
         )
-        self._locks: DefaultDict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
-        self._timeout_buy = settings.timeouts.buy
-        self._timeout_sell = settings.timeouts.sell
+        balance = balance or settings.balance
+        self._balance = BalanceLedger(self._exchange, balance.max_age, balance.reconcile_every)
+        # anything with Outbox.put; the backtest counts messages instead of sending them
+        self._notify = outbox.put if outbox is not None else notify
+        if self._exchange.orders is not None:
+            self._exchange.orders.on_account = self._balance.on_account
+        self._gates: DefaultDict[str, _SymbolGate] = defaultdict(_SymbolGate)
+        # symbol -> when we last gave up on an order of it; the reconciler looks there for stray fills
+        self.released: dict[str, float] = {}
+        self._busy = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._handover: asyncio.Future | None = None  # set while the instance this one replaces finishes
+        self.configure(cfg)
+
+    def configure(self, cfg, timeouts=None, execution=None):
+        """Take up the settings that need no new exchange client: chat, timeouts, execution."""
+        timeouts = timeouts or settings.timeouts
+        self._timeout_buy = timeouts.buy
+        self._timeout_sell = timeouts.sell
+        self._execution = cfg.execution or execution or settings.execution
         self.chat_id: int = cfg.notify_chat
 
+    @property
+    def exchange(self) -> Exchange:
+        return self._exchange
+
+    async def start(self):
+        await asyncio.gather(self._exchange.load_markets(), self._balance.start())
+        await self._exchange.start_stream()
+
     async def handle(self, sig: Signal):
-        lock = self._locks[sig.symbol]
-        async with lock:
+        """Act on ``sig``; the order is the first request sent once local checks pass."""
+        self._busy += 1
+        self._idle.clear()
+        try:
+            if self._handover is not None:
+                await asyncio.shield(self._handover)
+            await self._handle(sig)
+        finally:
+            self._busy -= 1
+            if not self._busy:
+                self._idle.set()
+
+    async def drain(self):
+        """Wait until no signal is being handled."""
+        await self._idle.wait()
+
+    def succeed(self, old: Trader):
+        """Replace ``old``: signals wait until it has handled those it took.
+
+        Until then its per-symbol gates and balance ledger are the ones
+        that count, so a sell here cannot overtake a buy still running
+        there, and the balance is fetched again once its orders settled.
+        """
+        async def handover():
+            await old.drain()
+            try:
+                await self._balance.refresh()
+            except Exception as exc:
+                _log.warning("Balance refresh after taking over %s failed: %s", self.id, exc)
+            self._handover = None
+
+        self._handover = asyncio.ensure_future(handover())
+
+    async def _handle(self, sig: Signal):
+        info = self._exchange.symbols.info(sig.symbol)
+        started = time.perf_counter()
+        async with self._gates[sig.symbol].hold(sig.type):
+            record(sig, "lock_wait", time.perf_counter() - started)
+            plan = self._plan(sig, info)
+            existing = None
+            if sig.replay and not plan.sliced:  # the children of a sliced order are looked up one by one
+                existing = await self._exchange.find_order(self._client_oid(sig), info.symbol)
+                if existing is None and sig.replay == "reconcile":
+                    _log.warning("Not replaying stale signal %s for %s: no order was placed", sig.key, self.id)
+                    self._note(sig, "expired")
+                    return
+                if existing is not None and not await self._resume(existing["id"]):
+                    _log.info("Order %s of signal %s is already applied for %s", existing["id"], sig.key, self.id)
+                    self._note(sig, "done")
+                    return
             if sig.type == "buy":
-                balance = await self._exchange.get_available_usdt()
-                if sig.amount <= balance:
-                    _log.info(f"Handling buy signal: {sig}")
-                    await self._handle_buy(sig, balance)
-                else:
-                    await notify(self.chat_id, f"ℹ️ Insufficient USDT for {sig.symbol} buy • {sig.amount} USDT required")
+                if existing is None:
+                    with span(sig, "balance"):
+                        balance = await self._balance.available()
+                        if sig.amount > balance:  # the cached value may predate a deposit: ask before refusing
+                            balance = await self._balance.refresh()
+                    if sig.amount > balance:
+                        self._insufficient(sig)
+                        return
+                await self._handle_buy(sig, info, plan, existing)
             else:
-                await self._handle_sell(sig)
+                await self._handle_sell(sig, info, plan, existing)
+
+    def _plan(self, sig: Signal, info: SymbolInfo) -> Plan:
+        """How the order for ``sig`` goes out: whole, or as the children of a TWAP or iceberg."""
+        cfg = self._execution
+        mode = sig.execution or cfg.mode
+        if sig.type == "buy":
+            return plan_buy(sig.amount, info, cfg, mode)
+        pos = self._book.get(self.id, sig.symbol)
+        if pos is None:
+            return Plan(mode, (0.0,))
+        return plan_sell(info.round_amount(pos.qty), info, cfg, mode, pos.avg_cost_usdt)
+
+    def _note(self, sig: Signal, event: str, order_id: str | None = None):
+        if self._journal is not None and sig.key:
+            self._journal.note(sig.key, self.id, event, order_id)
+
+    def _insufficient(self, sig: Signal):
+        self._notify(self.chat_id, f"ℹ️ Insufficient USDT for {sig.symbol} buy • {sig.amount} USDT required")
+        self._note(sig, "done")
+
+    async def _resume(self, order_id: str) -> bool:
+        """Claim the order a replayed signal had placed, unless its fills are already applied."""
+        if await self._book.applied(self.id, [order_id]):
+            return False
+        return self._book.claim(self.id, order_id)
+
+    def _release(self, order_id: str, symbol: str):
+        """Leave whatever ``order_id`` filled to the reconciler."""
+        self._book.release(self.id, order_id)
+        self.released[symbol] = time.time()
+
+    def _submitted(self, sig: Signal, order: dict, message: str | None):
+        """Bookkeeping that waits until the order is out: claim, journal, timing, notification.
 
-    async def _handle_buy(self, sig: Signal, balance: float):
-        client_oid = str(uuid.uuid4())
-        await notify(self.chat_id, f"🔔 BUY sent • {sig.symbol} • {sig.amount} USDT")
-        order = await self._exchange.create_market_buy(sig.symbol.replace("USDT", "/USDT"), sig.amount, client_oid)
-        filled = await self._await_fill(order["id"], sig.symbol)
+        Only the first child of a sliced order comes with a ``message``; it
+        alone is timed and announced.
+        """
+        self._book.claim(self.id, order["id"])  # new order id, nobody else can have it yet
+        self._note(sig, "submitted", order["id"])
+        if message is None:
+            return
+        if sig.received_at:
+            record(sig, "to_order", time.perf_counter() - sig.received_at)
+        self._notify(self.chat_id, message)
+
+    def _client_oid(self, sig: Signal) -> str:
+        """Same signal, trader and side give the same clientOid, so Bitget refuses a replay."""
+        if not sig.key:
+            return str(uuid.uuid4())
+        return str(uuid.uuid5(_OID_NAMESPACE, f"{sig.key}|{self.id}|{sig.type}"))
+
+    async def _place(self, sig: Signal, info: SymbolInfo, size: float, client_oid: str,
+                     existing: dict | None = None, sent: str | None = None) -> tuple[dict, dict | None]:
+        """Submit an order of ``size``, or take over ``existing``, and wait for its fill.
+
+        Returns the order, in its final state if it reached one, and its
+        fill, None if it did not fill in time, in which case the order is
+        released. A buy holds ``size`` USDT in the ledger until then. A
+        resumed order is already reflected in the balance fetched at
+        startup, so it neither reserves nor spends.
+        """
+        buy = sig.type == "buy"
+        reserve = size if buy and existing is None else 0.0
+        order = existing
+        self._balance.reserve(reserve)
+        try:
+            if existing is None:
+                with span(sig, "submit"):
+                    if buy:
+                        order = await self._exchange.create_market_buy(info.symbol, size, client_oid)
+                    else:
+                        order = await self._exchange.create_market_sell(info.symbol, size, client_oid)
+                self._submitted(sig, order, sent)
+                _log.info(f"{sig.type.capitalize()} order {order['id']} sent for signal: {sig}")
+            with span(sig, "fill"):
+                final = await self._await_fill(order["id"], info.symbol)
+        except Exception:
+            self._balance.settle(reserve)
+            if order is not None:
+                self._release(order["id"], sig.symbol)
+            raise
+        filled = final if final is not None and final["status"] in _FILLED else None
         if not filled:
-            await notify(self.chat_id, f"❌ BUY failed • {sig.symbol}")
-            await self._exchange.cancel_order(order["id"], sig.symbol.replace("USDT", "/USDT"))
-            await notify(self.chat_id, f"Successfully cancelled order {order['id']} for {sig.symbol}")
+            self._balance.settle(reserve)
+            self._release(order["id"], sig.symbol)
+            return final or order, None
+        if existing is not None:
+            self._balance.settle()
+        elif buy:
+            self._balance.settle(reserve, spent=float(filled["cost"]) + _usdt_fee(filled))
+        else:
+            self._balance.settle(received=float(filled["cost"]) - _usdt_fee(filled))
+        return order, filled
+
+    async def _fill_one(self, sig: Signal, info: SymbolInfo, size: float, existing: dict | None,
+                        sent: str) -> tuple[dict, list[str]] | None:
+        """Fill ``sig`` with one order; returns the fill and its order id, None once a failure is reported."""
+        try:
+            order, filled = await self._place(sig, info, size, self._client_oid(sig), existing, sent)
+        except InsufficientBalance:
+            # checked against a stale balance; Bitget has the final say
+            self._balance.refresh_soon()
+            self._insufficient(sig)
+            return None
+        except Exception:
+            self._note(sig, "failed")
+            raise
+        if filled is None:
+            self._note(sig, "failed")
+            self._notify(self.chat_id, f"❌ {sig.type.upper()} failed • {sig.symbol}")
+            if sig.type == "buy" and await self._cancel(order, info.symbol):
+                self._notify(self.chat_id, f"Successfully cancelled order {order['id']} for {sig.symbol}")
+            return None
+        return filled, [order["id"]]
+
+    async def _fill_slices(self, sig: Signal, info: SymbolInfo, plan: Plan,
+                           sent: str) -> tuple[dict, list[str]] | None:
+        """Fill ``sig`` with the children of ``plan``, sent on its schedule, each awaiting its own fill.
+
+        Returns the fills merged into one and the ids of the children that
+        filled, None once a failure is reported. A replay first looks every
+        child up by its clientOid: one already applied (by the reconciler)
+        is skipped, one placed is resumed, and a missing one is placed only
+        while the signal is young enough to trade. Once a child fails to go
+        out, those not sent yet are dropped.
+        """
+        client_oid = self._client_oid(sig)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        halt = asyncio.Event()
+        announce = [sent]
+
+        async def child(n: int, size: float):
+            oid = child_oid(client_oid, n)
+            existing = None
+            if sig.replay:
+                existing = await self._exchange.find_order(oid, info.symbol)
+                if existing is None and sig.replay == "reconcile":
+                    return None
+                if existing is not None and not await self._resume(existing["id"]):
+                    return None
+            if existing is None:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(halt.wait(), start + n * plan.interval - loop.time())
+                if halt.is_set():
+                    return None
+            message = announce.pop() if existing is None and announce else None
+            try:
+                order, filled = await self._place(sig, info, size, oid, existing, message)
+            except Exception:
+                halt.set()
+                raise
+            if filled is None and sig.type == "buy":
+                await self._cancel(order, info.symbol)
+            return order, filled
+
+        results = await asyncio.gather(*(child(n, size) for n, size in enumerate(plan.sizes)),
+                                       return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        for exc in errors:
+            _log.warning("A %s slice of %s failed for %s: %s", sig.type, sig.symbol, self.id, exc)
+        fills = [r for r in results if isinstance(r, tuple) and r[1] is not None]
+        if fills:
+            return merge([filled for _, filled in fills]), [order["id"] for order, _ in fills]
+        if any(isinstance(exc, InsufficientBalance) for exc in errors):
+            self._balance.refresh_soon()
+            self._insufficient(sig)
+            return None
+        if errors:
+            self._note(sig, "failed")
+            raise errors[0]
+        if all(r is None for r in results):
+            _log.info("Nothing left to do for replayed signal %s of %s", sig.key, self.id)
+            self._note(sig, "done")
+            return None
+        self._note(sig, "failed")
+        self._notify(self.chat_id, f"❌ {sig.type.upper()} failed • {sig.symbol}")
+        return None
+
+    async def _cancel(self, order: dict, symbol: str) -> bool:
+        """Cancel a buy that did not fill in time; False if it had already ended."""
+        if order.get("status") in _ENDED:  # e.g. canceled by Bitget, as the order stream reported
+            return False
+        return await self._exchange.cancel_order(order["id"], symbol)
+
+    def _fill(self, sig: Signal, info: SymbolInfo, plan: Plan, existing: dict | None, sent: str):
+        if not plan.sliced:
+            return self._fill_one(sig, info, plan.sizes[0], existing, sent)
+        return self._fill_slices(sig, info, plan, f"{sent} • {plan.mode.upper()} in {len(plan.sizes)} slices")
+
+    async def _handle_buy(self, sig: Signal, info: SymbolInfo, plan: Plan, existing: dict | None = None):
+        """Buy for ``sig``, or finish ``existing``, the order a replayed signal had already placed."""
+        done = await self._fill(sig, info, plan, existing, f"🔔 BUY sent • {sig.symbol} • {sig.amount} USDT")
+        if done is None:
             return
+        filled, orders = done
         base_qty = float(filled["filled"])
         fee = float(filled["fee"]["cost"])
         price = float(filled["average"])
         cost = float(filled["cost"])
-        new_balance = balance - sig.amount
+        self._note(sig, "filled")
+        new_balance = self._balance.free
         fee_pct = fee / sig.amount * 100 if sig.amount else 0
-        await notify(
+        slices = f"\n• Filled in {len(orders)} of {len(plan.sizes)} slices" if plan.sliced else ""
+        self._notify(
             self.chat_id,
             (
             f"✅ BUY filled • +{base_qty:.8g} {sig.symbol[:-4]} @ ${price:,.2f}\n"
             f"• Order Cost: ${cost:,.2f} (targeted ${sig.amount:,.2f})\n"
             f"• Fee: ${fee:.5g} ({fee_pct:.2f}%)\n"
-            f"• Remaining Balance: ${new_balance:,.2f}"
+            f"• Remaining Balance: ${new_balance:,.2f}{slices}"
             )
         )
-        async with async_session() as sess:
-            pos = await sess.scalar(
-                select(Position).where(Position.user_id == self.id, Position.symbol == sig.symbol, Position.status == "OPEN")
+        applied = [(order_id, "buy") for order_id in orders]
+        pos = self._book.get(self.id, sig.symbol)
+        if pos:
+            add_fill(pos, base_qty, cost, fee)
+            new_qty = pos.qty
+            with span(sig, "db"):
+                await self._book.save(pos, then=lambda: self._note(sig, "persisted"), orders=applied)
+            self._notify(
+                self.chat_id,
+                f"📈 Added {base_qty:.8g} → total {new_qty:.8g} • new VWAP ${pos.avg_cost_usdt:,.2f}",
             )
-            if pos:
-                old_qty = pos.qty
-                old_cost = pos.avg_cost_usdt * old_qty
-                new_qty = old_qty + base_qty
-                pos.qty = new_qty
-                pos.avg_cost_usdt = (old_cost + cost) / new_qty
-                pos.total_buy_fees += fee
-                pos.total_buy_amount += cost
-                await sess.commit()
-                await notify(
-                    self.chat_id,
-                    f"📈 Added {base_qty:.8g} → total {new_qty:.8g} • new VWAP ${pos.avg_cost_usdt:,.2f}",
-                )
-            else:
-                pos = Position(
-                    user_id=self.id,
-                    symbol=sig.symbol,
-                    qty=float(base_qty),
-                    avg_cost_usdt=float(price),
-                    total_buy_fees=float(fee),
-                    total_buy_amount=float(cost)
-                )
-                sess.add(pos)
-                await sess.commit()
-
-    async def _handle_sell(self, sig: Signal):
-        async with async_session() as sess:
-            pos = await sess.scalar(
-                select(Position).where(Position.user_id == self.id, Position.symbol == sig.symbol, Position.status == "OPEN")
-            )
-            if not pos:
-                await notify(self.chat_id, f"ℹ️ No open position for {sig.symbol}")
-                return
-            client_oid = str(uuid.uuid4())
-            await notify(self.chat_id, f"🔔 SELL sent • {sig.symbol} • {pos.qty:.8g} {sig.symbol[:-4]}")
-            order = await self._exchange.create_market_sell(sig.symbol, pos.qty, client_oid)
-            filled = await self._await_fill(order["id"], sig.symbol)
-            if not filled:
-                await notify(self.chat_id, f"❌ SELL failed • {sig.symbol}")
-                return
-            fee = float(filled["fee"]["cost"])
-            proceeds = float(filled["cost"])
-            pos.total_sell_amount += proceeds
-            pnl = pos.total_sell_amount - pos.total_buy_amount - pos.total_buy_fees - fee
-            pnl_pct = pnl / pos.total_buy_amount * 100.0 if pos.total_buy_amount else 0.0
-            pos.status = "CLOSED"
-            pos.total_sell_fees = float(fee)
-            pos.realised_pnl = float(pnl)
-            pos.closed_at = datetime.now(timezone.utc)
-            await sess.commit()
-            # Retrieve the current USDT balance after the sell order
-            current_balance = await self._exchange.get_available_usdt()
-            # Calculate average sell price (assuming pos.qty is not zero)
-            avg_sell_price = pos.total_sell_amount / pos.qty if pos.qty else 0
-            message = (
-                f"✅ SELL filled • Sold {pos.qty:.8g} {sig.symbol[:-4]} at avg sell ${avg_sell_price:,.2f}\n"
-                f"• Total BUY Cost: ${pos.total_buy_amount:,.2f} (avg buy ${pos.avg_cost_usdt:,.2f})\n"
-                f"• Total SELL Proceeds: ${pos.total_sell_amount:,.2f}\n"
-                f"• Realised P/L: {pnl:+.2f} USDT ({pnl_pct:+.2f}%)\n"
-                f"• Fees: Buy Fee ${pos.total_buy_fees:,.5g} + Sell Fee {fee:.5g}\n"
-                f"• Current USDT Balance: ${current_balance:,.2f}"
+        else:
+            pos = self._book.open(self.id, sig.symbol, base_qty, price, cost, fee)
+            with span(sig, "db"):
+                await self._book.save(pos, then=lambda: self._note(sig, "persisted"), orders=applied)
+
+    async def _handle_sell(self, sig: Signal, info: SymbolInfo, plan: Plan, existing: dict | None = None):
+        pos = self._book.get(self.id, sig.symbol)
+        if not pos:
+            self._notify(self.chat_id, f"ℹ️ No open position for {sig.symbol}")
+            self._note(sig, "done")
+            return
+        qty = info.round_amount(pos.qty)
+        if existing is None and (qty <= 0 or qty < info.min_amount):
+            self._notify(self.chat_id, f"ℹ️ {pos.qty:.8g} {info.base} is below the minimum {sig.symbol} order size")
+            self._note(sig, "done")
+            return
+        done = await self._fill(sig, info, plan, existing,
+                                f"🔔 SELL sent • {sig.symbol} • {pos.qty:.8g} {sig.symbol[:-4]}")
+        if done is None:
+            return
+        filled, orders = done
+        fee = float(filled["fee"]["cost"])
+        proceeds = float(filled["cost"])
+        sold = float(filled["filled"])
+        self._note(sig, "filled")
+        applied = [(order_id, "sell") for order_id in orders]
+        if plan.sliced and not info.is_dust(pos.qty - sold):
+            # some children did not fill: the rest stays open for the next sell
+            reduce(pos, sold, proceeds, fee)
+            with span(sig, "db"):
+                await self._book.save(pos, then=lambda: self._note(sig, "persisted"), orders=applied)
+            self._notify(
+                self.chat_id,
+                f"⚠️ SELL partly filled • Sold {sold:.8g} {sig.symbol[:-4]} for ${proceeds:,.2f} "
+                f"in {len(orders)} of {len(plan.sizes)} slices\n"
+                f"• {pos.qty:.8g} {sig.symbol[:-4]} still open",
             )
-            await notify(self.chat_id, message)
+            return
+        pnl = realise(pos, proceeds, fee, datetime.now(timezone.utc))
+        pnl_pct = pnl / pos.total_buy_amount * 100.0 if pos.total_buy_amount else 0.0
+        self._book.close(pos)
+        with span(sig, "db"):
+            await self._book.save(pos, then=lambda: self._note(sig, "persisted"), orders=applied)
+        current_balance = self._balance.free
+        # Calculate average sell price (assuming pos.qty is not zero)
+        avg_sell_price = pos.total_sell_amount / pos.qty if pos.qty else 0
+        message = (
+            f"✅ SELL filled • Sold {pos.qty:.8g} {sig.symbol[:-4]} at avg sell ${avg_sell_price:,.2f}\n"
+            f"• Total BUY Cost: ${pos.total_buy_amount:,.2f} (avg buy ${pos.avg_cost_usdt:,.2f})\n"
+            f"• Total SELL Proceeds: ${pos.total_sell_amount:,.2f}\n"
+            f"• Realised P/L: {pnl:+.2f} USDT ({pnl_pct:+.2f}%)\n"
+            f"• Fees: Buy Fee ${pos.total_buy_fees:,.5g} + Sell Fee {fee:.5g}\n"
+            f"• Current USDT Balance: ${current_balance:,.2f}"
+        )
+        self._notify(self.chat_id, message)
 
     async def _await_fill(self, order_id: str, symbol: str):
-        time_left = self._timeout_buy  # same timeout for buy/sell
-        while time_left > 0:
-            order = await self._exchange.fetch_order(order_id, symbol.replace("USDT", "/USDT"))
-            if order["status"] in {"closed", "filled"}:  # ccxt may map to "closed"
-                return order
-            await asyncio.sleep(1)
-            time_left -= 1
-        return None
+        """Wait for a terminal order state; returns the order in it, None if still open at the timeout.
+
+        With an order stream the fill push resolves the wait and REST is only
+        polled as a backing-off fallback; otherwise poll once a second.
+        """
+        stream = self._exchange.orders
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout_buy  # same timeout for buy/sell
+        delay = 1.0
+        try:
+            while (time_left := deadline - loop.time()) > 0:
+                if stream is not None:
+                    order = await stream.wait(order_id, min(delay, time_left))
+                    if order is not None:
+                        return order
+                order = await self._exchange.fetch_order(order_id, symbol)
+                if order["status"] in _ENDED:
+                    return order
+                if stream is not None:
+                    delay = min(delay * 2, 8.0)
+                else:
+                    await asyncio.sleep(min(delay, max(deadline - loop.time(), 0)))
+            return None
+        finally:
+            if stream is not None:
+                stream.forget(order_id)
 
     async def close(self):
+        await self._balance.close()
         await self._exchange.close()
\ No newline at end of file
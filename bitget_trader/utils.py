@@ -1,23 +1,127 @@
 from functools import wraps
 import asyncio
-from typing import Any, Callable, Coroutine, TypeVar
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Coroutine, TypeVar
+
+from .metrics import RATE_WAITS, RETRIES
 
 T = TypeVar("T")
 
+Clock = Callable[[], float]
+Sleep = Callable[[float], Awaitable[Any]]
+
+class TokenBucket:
+    """Continuously refilling token bucket.
+
+    Callers reserve ``weight`` tokens up front and sleep off any deficit, so
+    concurrent waiters are served in arrival order without holding a lock
+    and nobody pays for time after their request has gone out.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None,
+                 clock: Clock = time.monotonic, sleep: Sleep = asyncio.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._stamp = clock()
+        self.calls = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def resize(self, rate: float, capacity: float | None = None) -> None:
+        self._refill()
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = min(self._tokens, self.capacity)
+
+    async def acquire(self, weight: float = 1.0) -> float:
+        """Take ``weight`` tokens, sleeping if the bucket is short. Returns the wait."""
+        self._refill()
+        self._tokens -= weight
+        self.calls += 1
+        if self._tokens >= 0:
+            return 0.0
+        delay = -self._tokens / self.rate
+        self.waits += 1
+        self.wait_time += delay
+        self.max_wait = max(self.max_wait, delay)
+        await self._sleep(delay)
+        return delay
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "calls": self.calls,
+            "waits": self.waits,
+            "wait_time": self.wait_time,
+            "max_wait": self.max_wait,
+        }
+
 class RateLimiter:
-    """Simple token bucket rate‑limiter for CCXT calls (shared)."""
+    """Weighted token buckets keyed per API key and endpoint group.
+
+    Bitget limits private endpoints per UID and per endpoint, so every
+    ``(key, endpoint)`` pair gets its own budget. The ``public`` endpoint is
+    limited per IP and is shared by all keys.
+    """
+
+    PUBLIC = "public"
+
+    def __init__(self, budgets: dict[str, float], public_rps: float, burst: float = 1.0,
+                 clock: Clock = time.monotonic, sleep: Sleep = asyncio.sleep):
+        self._budgets = dict(budgets)
+        self._public_rps = public_rps
+        self._burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+
+    def _rate(self, endpoint: str) -> float:
+        if endpoint == self.PUBLIC:
+            return self._public_rps
+        return self._budgets.get(endpoint, self._public_rps)
+
+    def bucket(self, key: str, endpoint: str) -> TokenBucket:
+        if endpoint == self.PUBLIC:
+            key = ""
+        bucket = self._buckets.get((key, endpoint))
+        if bucket is None:
+            rate = self._rate(endpoint)
+            bucket = TokenBucket(rate, rate * self._burst, self._clock, self._sleep)
+            self._buckets[(key, endpoint)] = bucket
+        return bucket
 
-    def __init__(self, rps: int):
-        self._sem = asyncio.Semaphore(rps)
+    @asynccontextmanager
+    async def limit(self, key: str, endpoint: str, weight: float = 1.0):
+        waited = await self.bucket(key, endpoint).acquire(weight)
+        if waited:
+            RATE_WAITS.observe(waited, endpoint)
+        yield
 
-    async def __aenter__(self):
-        await self._sem.acquire()
+    def configure(self, budgets: dict[str, float], public_rps: float, burst: float | None = None) -> None:
+        """Resize every existing bucket in place to new budgets."""
+        self._budgets = dict(budgets)
+        self._public_rps = public_rps
+        if burst is not None:
+            self._burst = burst
+        for (_, endpoint), bucket in self._buckets.items():
+            rate = self._rate(endpoint)
+            bucket.resize(rate, rate * self._burst)
 
-    async def __aexit__(self, *_):
-        await asyncio.sleep(1)
-        self._sem.release()
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Per-bucket wait statistics, keyed ``"<key>:<endpoint>"``."""
+        return {f"{key or '*'}:{endpoint}": b.stats() for (key, endpoint), b in self._buckets.items()}
 
-def retry(max_tries: int = 3, initial_delay: float = 0.5):
+def retry(max_tries: int = 3, initial_delay: float = 0.5, fatal: tuple[type[Exception], ...] = ()):
+    """Retry with exponential backoff; ``fatal`` exceptions are raised at once."""
     def decorator(fn: Callable[..., Coroutine[Any, Any, T]]):
         @wraps(fn)
         async def wrapper(*args, **kwargs) -> T:
@@ -25,10 +129,13 @@ def retry(max_tries: int = 3, initial_delay: float = 0.5):
             for attempt in range(max_tries):
                 try:
                     return await fn(*args, **kwargs)
+                except fatal:
+                    raise
                 except Exception:
                     if attempt == max_tries - 1:
                         raise
+                    RETRIES.inc(fn.__name__)
                     await asyncio.sleep(delay)
                     delay *= 2
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
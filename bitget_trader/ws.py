@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import websockets
+from websockets.asyncio.client import connect
+
+_log = logging.getLogger(__name__)
+
+PRIVATE_URL = "wss://ws.bitget.com/v2/ws/private"
+DEMO_PRIVATE_URL = "wss://wspap.bitget.com/v2/ws/private"
+PUBLIC_URL = "wss://ws.bitget.com/v2/ws/public"
+DEMO_PUBLIC_URL = "wss://wspap.bitget.com/v2/ws/public"
+
+_STATUS = {"filled": "closed", "cancelled": "canceled", "live": "open", "partially_filled": "open"}
+
+def parse_order(data: dict) -> dict:
+    """Map a v2 spot ``orders`` channel entry onto the ccxt order fields we use."""
+    filled = float(data.get("accBaseVolume") or 0)
+    average = float(data.get("priceAvg") or 0)
+    fees = data.get("feeDetail") or []
+    fee = sum(abs(float(f.get("fee") or 0)) for f in fees)
+    return {
+        "id": str(data["orderId"]),
+        "clientOrderId": data.get("clientOid"),
+        "symbol": data.get("instId"),
+        "side": data.get("side"),
+        "status": _STATUS.get(data.get("status"), data.get("status")),
+        "filled": filled,
+        "average": average,
+        "cost": filled * average,
+        "fee": {"cost": fee, "currency": fees[0].get("feeCoin") if fees else None},
+        "info": data,
+    }
+
+class OrderStream:
+    """Private WebSocket subscription to Bitget spot order updates.
+
+    Resolves a future per order id once the order reaches a terminal state.
+    Updates that arrive before anyone waits (the push can beat the REST
+    response of ``create_order``) are kept in a small bounded backlog.
+    If ``on_account`` is set the ``account`` channel is subscribed as well
+    and every balance entry is passed to it.
+    """
+
+    PING_INTERVAL = 25
+    BACKLOG = 256
+
+    def __init__(self, api_key: str, secret: str, passphrase: str, demo: bool = False, url: str | None = None):
+        self._api_key = api_key
+        self._secret = secret
+        self._passphrase = passphrase
+        self._url = url or (DEMO_PRIVATE_URL if demo else PRIVATE_URL)
+        self._waiters: dict[str, asyncio.Future] = {}
+        self._done: OrderedDict[str, dict] = OrderedDict()
+        self._task: asyncio.Task | None = None
+        self.on_account: Callable[[dict], None] | None = None
+        self.connected = asyncio.Event()
+        self.reconnects = 0
+
+    def _login_args(self) -> dict:
+        ts = str(int(time.time()))
+        digest = hmac.new(self._secret.encode(), f"{ts}GET/user/verify".encode(), hashlib.sha256).digest()
+        return {
+            "apiKey": self._api_key,
+            "passphrase": self._passphrase,
+            "timestamp": ts,
+            "sign": base64.b64encode(digest).decode(),
+        }
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            try:
+                async with connect(self._url, ping_interval=None) as ws:
+                    await self._session(ws)
+                    delay = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                _log.warning("Order stream disconnected: %s", exc)
+            self.connected.clear()
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def _session(self, ws):
+        await ws.send(json.dumps({"op": "login", "args": [self._login_args()]}))
+        reply = json.loads(await ws.recv())
+        if reply.get("event") != "login" or str(reply.get("code", 0)) != "0":
+            raise RuntimeError(f"login rejected: {reply}")
+        args = [{"instType": "SPOT", "channel": "orders", "instId": "default"}]
+        if self.on_account is not None:
+            args.append({"instType": "SPOT", "channel": "account", "coin": "default"})
+        await ws.send(json.dumps({"op": "subscribe", "args": args}))
+        self.connected.set()
+        pinger = asyncio.create_task(self._ping(ws))
+        try:
+            async for raw in ws:
+                if raw == "pong":
+                    continue
+                self._on_message(json.loads(raw))
+        finally:
+            pinger.cancel()
+
+    async def _ping(self, ws):
+        while True:
+            await asyncio.sleep(self.PING_INTERVAL)
+            await ws.send("ping")
+
+    def _on_message(self, msg: dict):
+        if msg.get("event") == "error":
+            _log.error("Order stream error: %s", msg)
+            return
+        channel = msg.get("arg", {}).get("channel")
+        if channel == "account" and self.on_account is not None:
+            for data in msg.get("data") or []:
+                self.on_account(data)
+            return
+        if channel != "orders":
+            return
+        for data in msg.get("data") or []:
+            order = parse_order(data)
+            if order["status"] not in {"closed", "canceled"}:
+                continue
+            fut = self._waiters.pop(order["id"], None)
+            if fut is not None and not fut.done():
+                fut.set_result(order)
+            else:
+                self._done[order["id"]] = order
+                if len(self._done) > self.BACKLOG:
+                    self._done.popitem(last=False)
+
+    async def wait(self, order_id: str, timeout: float) -> dict | None:
+        """Wait up to ``timeout`` seconds for a terminal update of ``order_id``."""
+        order_id = str(order_id)
+        if order_id in self._done:
+            return self._done.pop(order_id)
+        fut = self._waiters.get(order_id)
+        if fut is None:
+            fut = self._waiters[order_id] = asyncio.get_running_loop().create_future()
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def forget(self, order_id: str):
+        fut = self._waiters.pop(str(order_id), None)
+        if fut is not None:
+            fut.cancel()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, websockets.WebSocketException):
+                pass
+            self._task = None
+        for fut in self._waiters.values():
+            fut.cancel()
+        self._waiters.clear()
+
+def _ticker_args(symbols) -> list[dict]:
+    return [{"instType": "SPOT", "channel": "ticker", "instId": s} for s in sorted(symbols)]
+
+class TickerStream:
+    """Public WebSocket subscription to the spot ``ticker`` channel.
+
+    Follows the symbol set given to :meth:`track`, subscribing and
+    unsubscribing on the open connection, and calls ``on_ticker(symbol,
+    last price, exchange timestamp in seconds)`` for every push.
+    """
+
+    PING_INTERVAL = 25
+    CHUNK = 50  # channels per subscribe request
+
+    def __init__(self, on_ticker: Callable[[str, float, float], None], demo: bool = False, url: str | None = None):
+        self._url = url or (DEMO_PUBLIC_URL if demo else PUBLIC_URL)
+        self._on_ticker = on_ticker
+        self._wanted: set[str] = set()
+        self._subscribed: set[str] = set()
+        self._ws = None
+        self._task: asyncio.Task | None = None
+        self.connected = asyncio.Event()
+        self.reconnects = 0
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def track(self, symbols: set[str]):
+        """Make ``symbols`` (exchange ids, e.g. ``BTCUSDT``) the subscribed set."""
+        self._wanted = set(symbols)
+        if self._ws is not None:
+            try:
+                await self._sync(self._ws)
+            except websockets.WebSocketException:
+                pass  # resubscribed on reconnect
+
+    async def _send(self, ws, op: str, symbols: set[str]):
+        args = _ticker_args(symbols)
+        for i in range(0, len(args), self.CHUNK):
+            await ws.send(json.dumps({"op": op, "args": args[i:i + self.CHUNK]}))
+
+    async def _sync(self, ws):
+        wanted = set(self._wanted)
+        added, removed = wanted - self._subscribed, self._subscribed - wanted
+        self._subscribed = wanted
+        if removed:
+            await self._send(ws, "unsubscribe", removed)
+        if added:
+            await self._send(ws, "subscribe", added)
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            try:
+                async with connect(self._url, ping_interval=None) as ws:
+                    self._subscribed = set()
+                    await self._sync(ws)
+                    self._ws = ws
+                    self.connected.set()
+                    delay = 1.0
+                    pinger = asyncio.create_task(self._ping(ws))
+                    try:
+                        async for raw in ws:
+                            if raw != "pong":
+                                self._on_message(json.loads(raw))
+                    finally:
+                        pinger.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                _log.warning("Ticker stream disconnected: %s", exc)
+            self._ws = None
+            self.connected.clear()
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def _ping(self, ws):
+        while True:
+            await asyncio.sleep(self.PING_INTERVAL)
+            await ws.send("ping")
+
+    def _on_message(self, msg: dict):
+        if msg.get("event") == "error":
+            _log.error("Ticker stream error: %s", msg)
+            return
+        if msg.get("arg", {}).get("channel") != "ticker":
+            return
+        for data in msg.get("data") or []:
+            try:
+                self._on_ticker(data["instId"], float(data["lastPr"]), int(data["ts"]) / 1000)
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, websockets.WebSocketException):
+                pass
+            self._task = None
@@ -0,0 +1,97 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bitget_trader import analytics
+from bitget_trader.db import init_db, make_engine
+from bitget_trader.positions import PositionBook
+
+# (trader, symbol, closed on, realised P/L); 2024-01-01 is a Monday
+TRADES = [
+    ("a", "BTCUSDT", "2024-01-01", 5.0),
+    ("a", "BTCUSDT", "2024-01-01", -2.0),
+    ("a", "ETHUSDT", "2024-01-07", 1.0),
+    ("b", "BTCUSDT", "2024-01-08", 3.0),
+    ("a", "BTCUSDT", "2024-02-01", -1.0),
+]
+
+def _trade(book: PositionBook, uid: str, symbol: str, day: str, pnl: float):
+    pos = book.open(uid, symbol, 1.0, 100.0, 100.0, 0.1)
+    pos.total_sell_amount = 100.0 + pnl + 0.2
+    pos.total_sell_fees = 0.1
+    pos.realised_pnl = pnl
+    pos.status = "CLOSED"
+    pos.closed_at = datetime.fromisoformat(day).replace(hour=12, tzinfo=timezone.utc)
+    book.close(pos)
+    return pos
+
+def _database(tmp_path):
+    async def run():
+        engine = make_engine(tmp_path / "test.sqlite3")
+        await init_db(engine)
+        book = PositionBook(async_sessionmaker(engine, expire_on_commit=False), write_behind=False)
+        await book.start()
+        for trade in TRADES:
+            await book.save(_trade(book, *trade))
+        await book.save(book.open("a", "SOLUSDT", 1.0, 10.0, 10.0, 0.01))  # still open
+        await book.stop()
+        await engine.dispose()
+
+    asyncio.run(run())
+    return tmp_path / "test.sqlite3"
+
+def _rollup(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT day, user_id, symbol, trades, wins, round(realised_pnl, 6), round(fees, 6),"
+                            " best, worst FROM pnl_daily ORDER BY day, user_id, symbol").fetchall()
+
+def test_rollup_follows_closed_positions_and_matches_rebuild(tmp_path):
+    path = _database(tmp_path)
+    incremental = _rollup(path)
+    assert incremental == [
+        ("2024-01-01", "a", "BTCUSDT", 2, 1, 3.0, 0.4, 5.0, -2.0),
+        ("2024-01-07", "a", "ETHUSDT", 1, 1, 1.0, 0.2, 1.0, 1.0),
+        ("2024-01-08", "b", "BTCUSDT", 1, 1, 3.0, 0.2, 3.0, 3.0),
+        ("2024-02-01", "a", "BTCUSDT", 1, 0, -1.0, 0.2, -1.0, -1.0),
+    ]
+    assert analytics.rebuild(path, chunk_rows=2) == 4
+    assert _rollup(path) == incremental
+
+def test_periods_from_positions_and_rollup_agree(tmp_path):
+    path = _database(tmp_path)
+    weekly = analytics.aggregate(analytics.read_facts(path, chunk_rows=2), "week", ("user_id",))
+    assert np.datetime_as_string(weekly["week"]).tolist() == ["2024-01-01", "2024-01-08", "2024-01-29"]
+    assert weekly["user_id"].tolist() == ["a", "b", "a"]
+    assert weekly["trades"].tolist() == [3, 1, 1]
+    assert weekly["realised_pnl"].tolist() == [4.0, 3.0, -1.0]
+    assert weekly["win_rate"].tolist() == pytest.approx([2 / 3, 1.0, 0.0])
+    assert weekly["fee_drag"].tolist() == pytest.approx([0.002, 0.002, 0.002])
+
+    monthly = analytics.aggregate(analytics.read_rollup(path, chunk_rows=1), "month", ())
+    assert np.datetime_as_string(monthly["month"]).tolist() == ["2024-01-01", "2024-02-01"]
+    assert monthly["trades"].tolist() == [4, 1]
+    assert monthly["realised_pnl"].tolist() == [7.0, -1.0]
+
+    symbols = analytics.aggregate(analytics.read_rollup(path), None, ("symbol",))
+    assert symbols["symbol"].tolist() == ["BTCUSDT", "ETHUSDT"]
+    assert symbols["best"].tolist() == [5.0, 1.0] and symbols["worst"].tolist() == [-2.0, 1.0]
+
+def test_export_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = _database(tmp_path)
+    assert analytics.export(path, tmp_path / "out.parquet", chunk_rows=2) == 5
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert table.column("realised_pnl").to_pylist() == [t[3] for t in TRADES]
+    assert str(table.column("closed_at")[0]) == "2024-01-01 12:00:00"
+    assert analytics.export(path, tmp_path / "all.arrow", "arrow", closed=False) == 6
+
+def test_cli_report(tmp_path, capsys):
+    path = _database(tmp_path)
+    analytics.main(["--db", str(path), "report", "--period", "month", "--by", "symbol"])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["month", "symbol", "trades", "win_rate", "realised_pnl", "fees", "fee_drag"]
+    assert lines[1].split()[:3] == ["2024-01-01", "BTCUSDT", "3"]
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+
+from bitget_trader import backtest
+from bitget_trader.config import settings
+
+T0 = 1_700_000_000  # bars start here, one a minute
+
+def _data(tmp_path, signals, closes=(100.0, 110.0, 120.0)):
+    candles = tmp_path / "candles"
+    candles.mkdir()
+    rows = [f"{(T0 + 60 * i) * 1000},{c},{c},{c},{c},1000" for i, c in enumerate(closes)]
+    (candles / "BTCUSDT.csv").write_text("timestamp,open,high,low,close,volume\n" + "\n".join(rows) + "\n")
+    path = tmp_path / "signals.jsonl"
+    path.write_text("".join(json.dumps(s) + "\n" for s in signals))
+    return str(path), str(candles)
+
+def test_virtual_clock_skips_idle_time():
+    async def nap():
+        loop = asyncio.get_running_loop()
+        before = loop.time()
+        await asyncio.sleep(3600)
+        await asyncio.wait_for(asyncio.sleep(7200), 10_000)
+        return loop.time() - before
+
+    loop = backtest.VirtualClockLoop(T0)
+    started = time.perf_counter()
+    try:
+        assert loop.run_until_complete(nap()) == pytest.approx(10_800)
+    finally:
+        loop.close()
+    assert time.perf_counter() - started < 1
+
+def test_buys_average_and_sell_realises_pnl(tmp_path):
+    signals, candles = _data(tmp_path, [
+        {"ts": T0 + 10, "type": "buy", "symbol": "BTCUSDT", "amount": 100, "users": ["a"]},
+        {"ts": T0 + 70, "type": "buy", "symbol": "BTCUSDT", "amount": 110, "users": ["a"]},
+        {"ts": "2023-11-14T22:15:30", "type": "sell", "symbol": "BTCUSDT", "users": ["a"]},  # T0 + 130
+    ])
+    report = backtest.run(backtest.BacktestJob(signals, candles, slippage_bps=0, fee_rate=0.001))
+    a = report["traders"]["a"]
+    assert report["signals"] == 3 and a["fills"] == 3 and a["trades"] == 1 and a["wins"] == 1
+    # bought 1 @ 100 and 1 @ 110, sold 2 @ 120; 0.1% fee on every fill
+    assert a["realised_pnl"] == pytest.approx(240 - 210 - 0.21 - 0.24)
+    assert a["fees"] == pytest.approx(0.45)
+    assert a["final_usdt"] == pytest.approx(10_000 + 240 - 210 - 0.45)
+    assert a["open_positions"] == 0 and a["max_drawdown_pct"] < 0.01
+    assert settings.balance.reconcile_every == 60.0  # restored
+
+def test_slippage_and_vwap(tmp_path):
+    signals, candles = _data(tmp_path, [
+        {"ts": T0 + 10, "type": "buy", "symbol": "BTCUSDT", "amount": 100},
+        {"ts": T0 + 70, "type": "buy", "symbol": "BTCUSDT", "amount": 110},
+    ])
+    report = backtest.run(backtest.BacktestJob(signals, candles, traders=["a"], slippage_bps=10, fee_rate=0))
+    a = report["traders"]["a"]
+    assert a["open_positions"] == 1 and a["trades"] == 0
+    # 10 bp paid on both buys; the position is marked at the close of the bar the run ended in
+    assert a["final_usdt"] == pytest.approx(9_790)
+    assert a["final_equity"] == pytest.approx(9_790 + 110 * (100 / 100.1 + 110 / 110.11))
+
+def test_order_past_the_data_times_out_in_virtual_time(tmp_path):
+    signals, candles = _data(tmp_path, [
+        {"ts": T0 + 3600, "type": "buy", "symbol": "BTCUSDT", "amount": 100, "users": ["a"]},
+    ])
+    started = time.perf_counter()
+    report = backtest.run(backtest.BacktestJob(signals, candles))
+    assert time.perf_counter() - started < 2
+    assert report["virtual_seconds"] >= settings.timeouts.buy
+    a = report["traders"]["a"]
+    assert a["fills"] == 0 and a["unfilled"] == 1 and a["final_usdt"] == 10_000
+
+def test_grid_runs_in_worker_processes(tmp_path):
+    signals, candles = _data(tmp_path, [
+        {"ts": T0 + 10, "type": "buy", "symbol": "BTCUSDT", "amount": 100, "users": ["a", "b"]},
+        {"ts": T0 + 130, "type": "sell", "symbol": "BTCUSDT", "users": ["a", "b"]},
+    ])
+    jobs = backtest.jobs_for(backtest.BacktestJob(signals, candles), {"fee_rate": [0.0, 0.01]},
+                             per_trader=["a", "b"])
+    assert [job.name for job in jobs] == ["fee_rate=0.0 a", "fee_rate=0.0 b", "fee_rate=0.01 a", "fee_rate=0.01 b"]
+    reports = backtest.run_many(jobs, processes=2)
+    assert [list(r["traders"]) for r in reports] == [["a"], ["b"], ["a"], ["b"]]
+    pnl = [r["totals"]["realised_pnl"] for r in reports]
+    assert pnl[0] == pnl[1] and pnl[2] == pnl[3] and pnl[0] > pnl[2] > 0
+
+def test_sim_book_keeps_applied_orders_in_a_set():
+    async def run():
+        book = backtest.SimBook(lambda: T0)
+        await book.start()
+        pos = book.open("a", "BTCUSDT", 1.0, 100.0, 100.0, 0.1)
+        for n in range(3):
+            await book.save(pos, orders=[(f"o{n}", "buy")])
+        return book._applied, await book.applied("a", ["o0", "o2", "o9"]), await book.applied("b", ["o0"])
+
+    pending, applied, other = asyncio.run(run())
+    assert pending == [] and applied == {"o0", "o2"} and other == set()
+
+def test_buys_inside_the_latency_window_share_one_balance():
+    async def run():
+        loop = asyncio.get_running_loop()
+        candles = {"BTCUSDT": backtest.Candles(np.array([[T0 * 1000, 100, 100, 100, 100, 1000]], float))}
+        venue = backtest.SimExchange(candles, loop.time, balance=150.0, fee_rate=0.0, slippage_bps=0, latency=1.0)
+        await venue.create_market_buy("BTC/USDT", 100.0, "b1")
+        with pytest.raises(backtest.InsufficientBalance):
+            await venue.create_market_buy("BTC/USDT", 100.0, "b2")  # the first has not filled yet
+        await asyncio.sleep(1.5)
+        return await venue.get_available_usdt()
+
+    loop = backtest.VirtualClockLoop(T0)
+    try:
+        assert loop.run_until_complete(run()) == pytest.approx(50.0)
+    finally:
+        loop.close()
@@ -1,12 +1,156 @@
 import asyncio
-from httpx import AsyncClient
 
-async def test_webhook():
-    async with AsyncClient(base_url="http://127.0.0.1:8000") as ac:
-        r = await ac.post("/webhook", json={"auth":"tv_secret", "type": "buy", "symbol": "BTCUSDT", "amount": 100})
-        print(r)
-        # assert r.status_code == 200
-        # assert r.json()["ok"] is True
+from benchmarks.harness import alert, running_app
+from benchmarks.mock_bitget import MockBitget, StubBot
+from bitget_trader import receiver
+from bitget_trader.config import settings
+from bitget_trader.exchange import Exchange
+from bitget_trader.positions import book
+
+def _recording(venue: MockBitget) -> list[str]:
+    calls, call = [], venue._call
+
+    async def record(name: str):
+        calls.append(name)
+        await call(name)
+
+    venue._call = record
+    return calls
+
+async def _message(bot: StubBot, text: str, timeout: float = 5.0) -> str:
+    async def wait():
+        while not any(text in m for _, m in bot.messages):
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(wait(), timeout)
+    return next(m for _, m in bot.messages if text in m)
+
+def test_webhook():
+    async def run():
+        venue, bot = MockBitget(latency=0, fill_delay=0), StubBot()
+        async with running_app(venue, traders=2, bot=bot) as client:
+            r = await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))
+            await venue.wait_filled(2, timeout=10)
+            positions = {p.user_id: p.qty for p in book.positions()}
+        return r, venue, positions, bot
+
+    r, venue, positions, bot = asyncio.run(run())
+    assert r.status_code == 200
+    assert r.json() == {"status": "ok"}
+    assert sorted(o.key for o in venue.log) == ["key0", "key1"]
+    assert all(o.side == "buy" and o.cost == 100 for o in venue.log)
+    assert positions == {"t0": 1.0, "t1": 1.0}
+    assert any("BUY filled" in text for _, text in bot.messages)
+
+def test_webhook_rejects_bad_auth():
+    async def run():
+        async with running_app(MockBitget(latency=0), traders=1) as client:
+            return await client.post("/webhook", json={**alert("buy", "BTCUSDT", 100), "auth": "wrong"})
+
+    assert asyncio.run(run()).status_code == 403
+
+def test_stale_balance_does_not_delay_the_order():
+    saved = settings.balance
+    settings.balance = saved.model_copy(update={"max_age": 0.0})
+
+    async def run():
+        venue = MockBitget(latency=0.01, fill_delay=0)
+        calls = _recording(venue)
+        try:
+            async with running_app(venue, traders=1) as client:
+                calls.clear()
+                await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))
+                await venue.wait_filled(1, timeout=10)
+                await asyncio.sleep(0.05)
+        finally:
+            settings.balance = saved
+        return calls
+
+    calls = asyncio.run(run())
+    assert calls[0] == "create_order"  # the balance is refreshed behind it
+    assert "fetch_balance" in calls
+
+def test_stale_low_balance_is_fetched_before_refusing_a_buy():
+    saved = settings.balance
+    settings.balance = saved.model_copy(update={"max_age": 0.0})
+
+    async def run():
+        venue, bot = MockBitget(latency=0, fill_delay=0, balance=50.0), StubBot()
+        try:
+            async with running_app(venue, traders=1, bot=bot) as client:
+                venue.balances["key0"] = 1000.0  # deposited since the ledger last looked
+                await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))
+                await venue.wait_filled(1, timeout=10)
+        finally:
+            settings.balance = saved
+        return venue, bot
+
+    venue, bot = asyncio.run(run())
+    assert [o.cost for o in venue.log] == [100]
+    assert not any("Insufficient" in text for _, text in bot.messages)
+
+def test_buy_the_exchange_cannot_cover_is_reported_not_retried():
+    async def run():
+        venue, bot = MockBitget(latency=0, fill_delay=0), StubBot()
+        async with running_app(venue, traders=1, bot=bot) as client:
+            venue.balances["key0"] = 50.0  # spent elsewhere since the ledger last looked
+            venue.calls.clear()
+            r = await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))
+            await _message(bot, "Insufficient USDT")
+            await asyncio.sleep(0.05)
+        return r, venue
+
+    r, venue = asyncio.run(run())
+    assert r.status_code == 200
+    assert venue.log == []
+    assert venue.calls["create_order"] == 1 and venue.calls["fetch_balance"] == 1
+
+def _timeout(seconds: int):
+    saved = settings.timeouts
+    settings.timeouts = saved.model_copy(update={"buy": seconds})
+    return saved
+
+def test_buy_canceled_by_bitget_is_not_canceled_again():
+    saved = _timeout(2)
+
+    async def run():
+        venue, bot = MockBitget(latency=0, fill_delay=60), StubBot()
+        try:
+            async with running_app(venue, traders=1, bot=bot) as client:
+                await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))
+                while not venue.log:
+                    await asyncio.sleep(0.01)
+                venue.log[0].canceled = True  # e.g. no liquidity for a market order
+                await _message(bot, "BUY failed")
+                await asyncio.sleep(0.05)
+                stats = receiver._dispatcher.stats()["t0"]
+        finally:
+            settings.timeouts = saved
+        return venue, bot, stats
+
+    venue, bot, stats = asyncio.run(run())
+    assert venue.calls.get("cancel_order", 0) == 0
+    assert stats["processed"] == 1 and stats["failed"] == 0
+    assert not any("Successfully cancelled" in text for _, text in bot.messages)
+
+def test_buy_that_does_not_fill_in_time_is_canceled_once():
+    saved = _timeout(1)
+
+    async def run():
+        venue, bot = MockBitget(latency=0, fill_delay=60), StubBot()
+        try:
+            async with running_app(venue, traders=1, bot=bot) as client:
+                await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))
+                await _message(bot, "Successfully cancelled")
+                exchange = Exchange("key0", "secret", "pass", False)
+                again = await exchange.cancel_order("1", "BTC/USDT")  # gone by now: nothing to cancel
+                await exchange.close()
+        finally:
+            settings.timeouts = saved
+        return venue, again
+
+    venue, again = asyncio.run(run())
+    assert venue.log[0].canceled and venue.calls["cancel_order"] == 2
+    assert again is False
 
 if __name__ == "__main__":
-    asyncio.run(test_webhook())
\ No newline at end of file
+    test_webhook()
@@ -0,0 +1,58 @@
+import asyncio
+
+from benchmarks.mock_bitget import FakeRestServer, self_signed
+from bitget_trader.config import _HttpCfg
+from bitget_trader.connections import ConnectionPool
+
+def _bitget(pool: ConnectionPool, url: str):
+    import ccxt.async_support as ccxt
+    client = ccxt.bitget({})
+    client.urls["api"] = dict.fromkeys(client.urls["api"], url)
+    assert pool.attach(client)
+    return client
+
+def test_ccxt_clients_share_warm_tls_connections(tmp_path):
+    server_ctx, client_ctx = self_signed(tmp_path)
+
+    async def run():
+        async with FakeRestServer(server_ctx) as server:
+            pool = ConnectionPool(_HttpCfg(ping_urls=[server.url + "/api/v2/public/time"], warm_connections=2,
+                                           keep_warm=0), ssl_context=client_ctx)
+            await pool.start()
+            assert pool.connections == server.connections == 2 and pool.pings == 2
+            clients = [_bitget(pool, server.url) for _ in range(4)]
+            for _ in range(3):
+                await asyncio.gather(*(c.fetch_time() for c in clients[:2]))
+                await asyncio.gather(*(c.fetch_time() for c in clients[2:]))
+            assert server.requests == 14
+            assert pool.connections == server.connections == 2 and pool.reused == 12
+            assert pool.dns_lookups == 1 and pool.stats()["in_flight"] == 0 and pool.stats()["free"] == 100
+            await asyncio.gather(*(c.close() for c in clients))
+            assert not pool.session().closed  # clients leave the shared session open
+            await pool.close()
+
+    asyncio.run(run())
+
+def test_keep_warm_outlives_the_idle_timeout(tmp_path):
+    server_ctx, client_ctx = self_signed(tmp_path)
+
+    async def after_quiet_period(url: str, keep_warm: float) -> dict:
+        pool = ConnectionPool(_HttpCfg(ping_urls=[url], warm_connections=1, keepalive=0.3, keep_warm=keep_warm),
+                              ssl_context=client_ctx)
+        await pool.start()
+        await asyncio.sleep(0.8)
+        async with pool.session().get(url) as response:
+            await response.read()
+        stats = pool.stats()
+        await pool.close()
+        return stats
+
+    async def run():
+        async with FakeRestServer(server_ctx) as server:
+            url = server.url + "/api/v2/public/time"
+            cold = await after_quiet_period(url, keep_warm=0)
+            warm = await after_quiet_period(url, keep_warm=0.1)
+        assert cold["connections"] == 2 and cold["pings"] == 1
+        assert warm["connections"] == 1 and warm["pings"] >= 4
+
+    asyncio.run(run())
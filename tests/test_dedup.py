@@ -0,0 +1,93 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+from benchmarks.harness import alert, running_app
+from benchmarks.mock_bitget import MockBitget
+from bitget_trader import dedup
+from bitget_trader.dedup import DedupCache, alert_key
+from bitget_trader.signals import Alert, Signal
+from bitget_trader.trader import Trader
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_keys_expire_after_ttl():
+    clock = Clock()
+    cache = DedupCache(ttl=60, max_entries=10, clock=clock)
+    assert cache.add("a")
+    clock.now = 59
+    assert not cache.add("a") and cache.hits == 1
+    clock.now = 61
+    assert "a" not in cache
+    assert cache.add("a")
+    assert len(cache) == 1
+
+def test_memory_is_bounded_at_high_rates():
+    clock = Clock()
+    cache = DedupCache(ttl=3600, max_entries=1000, clock=clock)
+    for i in range(200_000):
+        clock.now = i / 1000  # 1000 alerts/s, none old enough to expire
+        cache.add(f"id:{i}")
+    assert len(cache) == 1000
+    assert cache.evicted == 199_000
+    assert sys.getsizeof(cache._expiry) < 200_000
+    assert "id:199999" in cache and "id:0" not in cache
+
+def test_alert_keys():
+    buy = Alert(type="buy", symbol="BTCUSDT", amount=10)
+    assert alert_key(Alert(id="x1", type="sell", symbol="BTCUSDT"), 10, now=25.0) == ("id:x1:2", "id:x1:1")
+    key, _ = alert_key(buy, 10, now=1000.0)
+    assert alert_key(buy, 10, now=1009.9)[0] == key
+    # a copy landing just after the slot boundary still matches through the previous slot
+    assert alert_key(buy, 10, now=1010.1)[1] == key
+    assert alert_key(Alert(type="buy", symbol="BTCUSDT", amount=11), 10, now=1000.0)[0] != key
+
+def test_client_oid_is_derived_from_the_signal():
+    def oid(trader_id, type, key):
+        return Trader._client_oid(SimpleNamespace(id=trader_id), Signal(type, "BTCUSDT", None, None, key=key))
+
+    assert oid("john", "buy", "id:x1") == oid("john", "buy", "id:x1")
+    assert oid("john", "buy", "id:x1") != oid("john", "sell", "id:x1")
+    assert oid("john", "buy", "id:x1") != oid("bob", "buy", "id:x1")
+    assert oid("john", "buy", "") != oid("john", "buy", "")  # unkeyed signals get random ids
+
+def test_retried_alert_is_traded_once():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=2) as client:
+            replies = [await client.post("/webhook", json=alert("buy", "BTCUSDT", 100)) for _ in range(3)]
+            replies.append(await client.post("/webhook", json=alert("buy", "ETHUSDT", 50, id="a1")))
+            replies.append(await client.post("/webhook", json=alert("buy", "ETHUSDT", 50, id="a1")))
+            await venue.wait_filled(4, timeout=10)
+            await asyncio.sleep(0.05)
+        return [r.json()["status"] for r in replies], venue
+
+    statuses, venue = asyncio.run(run())
+    assert statuses == ["ok", "duplicate", "duplicate", "ok", "duplicate"]
+    assert len(venue.log) == 4
+    assert len({o.client_oid for o in venue.log}) == 4
+
+def test_reused_id_is_a_new_alert_once_its_window_is_past(monkeypatch):
+    clock = Clock()
+    clock.now = 1000.0
+    monkeypatch.setattr(dedup, "time", SimpleNamespace(time=clock, monotonic=clock))
+
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=1) as client:
+            dedup.seen = DedupCache(600, 100, clock=clock)
+            statuses = []
+            for later in (0, 0, 30, 700):  # a retry, then the strategy's next "Long" within and after the TTL
+                clock.now += later
+                statuses.append((await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="Long"))).json())
+            await venue.wait_filled(3, timeout=10)
+        return [s["status"] for s in statuses], venue
+
+    statuses, venue = asyncio.run(run())
+    assert statuses == ["ok", "duplicate", "ok", "ok"]
+    assert len({o.client_oid for o in venue.log}) == 3
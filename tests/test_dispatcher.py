@@ -0,0 +1,166 @@
+import asyncio
+
+from bitget_trader.dispatcher import Dispatcher
+from bitget_trader.signals import Signal
+from bitget_trader.trader import _SymbolGate
+
+
+class FakeTrader:
+    def __init__(self, id, delay=0.0):
+        self.id = id
+        self.delay = delay
+        self.handled = []
+        self.gate = asyncio.Event()
+
+    async def handle(self, sig):
+        await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        if sig.symbol == "BADUSDT":
+            raise RuntimeError("boom")
+        self.handled.append((sig.type, sig.symbol))
+
+
+def buy(symbol):
+    return Signal("buy", symbol, 10.0, None)
+
+
+def sell(symbol):
+    return Signal("sell", symbol, None, None)
+
+
+def test_sells_first_and_coalesced():
+    async def run():
+        trader = FakeTrader("a")
+        disp = Dispatcher([trader], workers=1, queue_size=10)
+        await disp.start()
+        for sig in (buy("BTCUSDT"), buy("ETHUSDT"), sell("ETHUSDT"), sell("ETHUSDT"), sell("SOLUSDT"), buy("XRPUSDT")):
+            await disp.enqueue(sig)
+        trader.gate.set()
+        while disp.stats()["a"]["depth"] or disp.processed["a"] < 4:
+            await asyncio.sleep(0.01)
+        await disp.stop()
+        return trader.handled, disp.stats()["a"]
+
+    handled, stats = asyncio.run(run())
+    assert handled == [("sell", "ETHUSDT"), ("sell", "SOLUSDT"), ("buy", "BTCUSDT"), ("buy", "XRPUSDT")]
+    assert stats["coalesced"] == 2 and stats["failed"] == 0
+
+
+def test_bounded_queue_applies_backpressure():
+    async def run():
+        trader = FakeTrader("a")
+        disp = Dispatcher([trader], workers=1, queue_size=2)
+        await disp.start()
+        for sym in ("AUSDT", "BUSDT", "CUSDT"):
+            await disp.enqueue(buy(sym))
+        blocked = asyncio.create_task(disp.enqueue(buy("DUSDT")))
+        await asyncio.sleep(0.05)
+        was_blocked = not blocked.done()
+        trader.gate.set()
+        await asyncio.wait_for(blocked, 1)
+        await disp.stop()
+        return was_blocked
+
+    assert asyncio.run(run())
+
+
+def test_failures_are_counted_and_workers_survive():
+    async def run():
+        trader = FakeTrader("a")
+        trader.gate.set()
+        disp = Dispatcher([trader], workers=2, queue_size=10)
+        await disp.start()
+        await disp.enqueue(buy("BADUSDT"))
+        await disp.enqueue(buy("BTCUSDT"))
+        while disp.processed["a"] < 2:
+            await asyncio.sleep(0.01)
+        await disp.stop()
+        return trader.handled, disp.stats()["a"]
+
+    handled, stats = asyncio.run(run())
+    assert handled == [("buy", "BTCUSDT")]
+    assert stats["failed"] == 1 and stats["processed"] == 2
+
+
+def test_batch_is_queued_in_one_go():
+    async def run():
+        a, b = FakeTrader("a"), FakeTrader("b")
+        disp = Dispatcher([a, b], workers=1, queue_size=3)
+        await disp.start()
+        await disp.enqueue(buy("AUSDT"))  # taken by the worker, which waits on the gate
+        await asyncio.sleep(0.01)
+        batch = [buy("BUSDT"), buy("CUSDT"), sell("CUSDT"), Signal("buy", "DUSDT", 10.0, ["b"])]
+        await disp.enqueue_many(batch)
+        depth = {uid: s["depth"] for uid, s in disp.stats().items()}
+        a.gate.set()
+        b.gate.set()
+        while disp.processed["a"] < 3 or disp.processed["b"] < 4:
+            await asyncio.sleep(0.01)
+        await disp.stop()
+        return depth, a.handled, b.handled, disp.stats()
+
+    depth, handled_a, handled_b, stats = asyncio.run(run())
+    assert depth == {"a": 2, "b": 3}
+    assert handled_a == [("buy", "AUSDT"), ("sell", "CUSDT"), ("buy", "BUSDT")]
+    assert handled_b == [("buy", "AUSDT"), ("sell", "CUSDT"), ("buy", "BUSDT"), ("buy", "DUSDT")]
+    assert stats["a"]["coalesced"] == stats["b"]["coalesced"] == 1
+
+
+def test_buys_of_a_symbol_overlap_but_a_sell_runs_alone():
+    class Tracking:
+        id = "a"
+
+        def __init__(self):
+            self.running, self.seen = [], []
+            self.gate = _SymbolGate()  # as Trader holds it
+
+        async def handle(self, sig):
+            async with self.gate.hold(sig.type):
+                self.running.append(sig.type)
+                self.seen.append(tuple(self.running))
+                await asyncio.sleep(0.02)
+                self.running.remove(sig.type)
+
+    async def run():
+        trader = Tracking()
+        disp = Dispatcher([trader], workers=4, queue_size=10)
+        await disp.start()
+        await disp.enqueue(buy("BTCUSDT"))
+        await disp.enqueue(buy("BTCUSDT"))
+        await asyncio.sleep(0.005)
+        await disp.enqueue(sell("BTCUSDT"))
+        await disp.enqueue(buy("BTCUSDT"))
+        await disp.join()
+        await disp.stop()
+        return trader.seen
+
+    assert asyncio.run(run()) == [("buy",), ("buy", "buy"), ("sell",), ("buy",)]
+
+
+def test_batch_cancelled_part_way_queues_nothing():
+    def to(uid, symbol):
+        return Signal("buy", symbol, 10.0, [uid])
+
+    async def run():
+        a, b = FakeTrader("a"), FakeTrader("b")
+        disp = Dispatcher([a, b], workers=1, queue_size=2)
+        await disp.start()
+        await disp.enqueue(to("b", "AUSDT"))  # taken by b's worker, which waits on the gate
+        await asyncio.sleep(0.01)
+        await disp.enqueue_many([to("b", "BUSDT"), to("b", "CUSDT")])  # b's lane is now full
+        batch = [buy("DUSDT"), buy("EUSDT")]
+        task = asyncio.create_task(disp.enqueue_many(batch))
+        await asyncio.sleep(0.05)  # a's room is held while the batch waits for b
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        depth = {uid: s["depth"] for uid, s in disp.stats().items()}
+        await asyncio.wait_for(disp.enqueue_many([to("a", "FUSDT"), to("a", "GUSDT")]), 1)  # and released again
+        a.gate.set()
+        b.gate.set()
+        await disp.join()
+        await disp.stop()
+        return depth, [sig.queued for sig in batch], a.handled
+
+    depth, queued, handled_a = asyncio.run(run())
+    assert depth == {"a": 0, "b": 2} and queued == [False, False]
+    assert handled_a == [("buy", "FUSDT"), ("buy", "GUSDT")]
@@ -0,0 +1,137 @@
+import asyncio
+import tempfile
+import uuid
+
+import pytest
+
+from benchmarks.harness import alert, running_app
+from benchmarks.mock_bitget import MockBitget, StubBot, make_market
+from bitget_trader.config import _ExecutionCfg, _Timeouts, settings
+from bitget_trader.dedup import alert_key
+from bitget_trader.execution import child_oid, plan_buy, plan_sell
+from bitget_trader.positions import book
+from bitget_trader.signals import Alert
+from bitget_trader.symbols import SymbolInfo
+from bitget_trader.trader import _OID_NAMESPACE
+
+class Crash(BaseException):
+    """The process dying at an injected point: nothing after it runs."""
+
+def _twap(interval: float = 0.05, **extra) -> _ExecutionCfg:
+    return _ExecutionCfg(mode="twap", slices=4, interval=interval, **extra)
+
+def _oids(key: str, side: str, count: int) -> list[str]:
+    parent = str(uuid.uuid5(_OID_NAMESPACE, f"{key}|t0|{side}"))
+    return [child_oid(parent, n) for n in range(count)]
+
+def test_children_respect_the_minimums_and_add_up():
+    info = SymbolInfo.from_market(make_market("BTC", amount_step=0.01, min_cost=5.0))
+    cfg = _twap()
+    assert plan_buy(1000, info, cfg, "twap").sizes == (250.0,) * 4
+    assert plan_buy(12, info, cfg, "twap").sizes == (6.0, 6.0)  # four would be below 5 USDT each
+    assert plan_buy(1000, info, cfg, "market").sizes == (1000,)
+    assert sum(plan_buy(1000, info, _ExecutionCfg(max_slice=300), "iceberg").sizes) == pytest.approx(1000)
+    assert len(plan_buy(1000, info, _ExecutionCfg(max_slice=300), "iceberg").sizes) == 4
+    assert plan_buy(100, info, _twap(min_total=500), "twap").sizes == (100,)
+    assert plan_sell(1.0, info, cfg, "twap", 100.0).sizes == (0.25,) * 4
+    # 0.13 at 100 USDT: children of 0.03 or 0.04 are worth less than 5 USDT
+    assert plan_sell(0.13, info, cfg, "twap", 100.0).sizes == (0.06, 0.07)
+    assert len(set(child_oid("parent", n) for n in range(4))) == 4
+    assert child_oid("parent", 1) == child_oid("parent", 1)
+
+def test_twap_buy_goes_out_in_slices_and_fills_closer_to_the_mid():
+    saved = settings.execution
+    settings.execution = _twap()
+
+    async def run(execution: str):
+        venue, bot = MockBitget(latency=0, fill_delay=0, depth=1.0, refill=20.0), StubBot()
+        async with running_app(venue, traders=1, bot=bot) as client:
+            keys = {alert_key(Alert(id="tw", type="buy", symbol="BTCUSDT", amount=1000), settings.dedup.window)[0]}
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 1000, id="tw", execution=execution))
+            keys.add(alert_key(Alert(id="tw", type="buy", symbol="BTCUSDT", amount=1000), settings.dedup.window)[0])
+            await venue.wait_filled(4 if execution == "twap" else 1, timeout=10)
+            await asyncio.sleep(0.05)
+            positions = [(p.symbol, p.qty) for p in book.positions()]
+        return venue, bot, positions, keys
+
+    try:
+        venue, bot, sliced, keys = asyncio.run(run("twap"))
+        _, _, whole, _ = asyncio.run(run("market"))
+    finally:
+        settings.execution = saved
+    assert [o.cost for o in venue.log] == [250.0] * 4
+    assert [o.client_oid for o in venue.log] in [_oids(key, "buy", 4) for key in keys]
+    assert venue.log[-1].created - venue.log[0].created >= 0.14
+    assert len(sliced) == 1 and sliced[0][1] == pytest.approx(sum(o.amount for o in venue.log))
+    assert sliced[0][1] > whole[0][1]  # the book refills between the slices
+    filled = [text for _, text in bot.messages if "BUY filled" in text]
+    assert len(filled) == 1 and "Filled in 4 of 4 slices" in filled[0]
+    assert sum("BUY sent" in text for _, text in bot.messages) == 1
+
+def test_sliced_sell_that_partly_fills_leaves_the_rest_open():
+    saved = settings.execution, settings.timeouts
+    settings.execution = _ExecutionCfg(slices=4, interval=0.01)  # market unless an alert asks
+    settings.timeouts = _Timeouts(buy=1, sell=1)
+
+    async def run():
+        venue, bot = MockBitget(latency=0, fill_delay=0), StubBot()
+        place = venue.place
+
+        def stuck_third_sell(key, symbol, side, amount, params):
+            order = place(key, symbol, side, amount, params)
+            if side == "sell" and sum(o.side == "sell" for o in venue.log) == 3:
+                order.fills_at = float("inf")
+            return order
+
+        venue.place = stuck_third_sell
+        async with running_app(venue, traders=1, bot=bot) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="b"))
+            await venue.wait_filled(1, timeout=10)
+            await client.post("/webhook", json=alert("sell", "BTCUSDT", id="s1", execution="twap"))
+            await venue.wait_filled(4, timeout=10)
+            await asyncio.sleep(1.2)  # the stuck child times out
+            left = [p.qty for p in book.positions()]
+            await client.post("/webhook", json=alert("sell", "BTCUSDT", id="s2"))
+            await venue.wait_filled(5, timeout=10)
+            await asyncio.sleep(0.05)
+            return venue, bot, left, book.positions()
+
+    try:
+        venue, bot, left, after = asyncio.run(run())
+    finally:
+        settings.execution, settings.timeouts = saved
+    assert [o.amount for o in venue.log if o.side == "sell"] == [0.25, 0.25, 0.25, 0.25, 0.25]
+    assert left == [pytest.approx(0.25)]
+    assert any("SELL partly filled" in text and "3 of 4 slices" in text for _, text in bot.messages)
+    assert after == []
+    # the proceeds of both sells count towards the P/L: 100 in, 100 out, fees of 0.1 on each side
+    assert any("SELL filled" in text and "-0.20 USDT" in text for _, text in bot.messages)
+
+def test_sliced_buy_replayed_after_a_crash_finds_its_children():
+    saved = settings.execution
+    settings.execution = _twap(interval=0.02)
+
+    async def run(data_dir):
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=1, data_dir=data_dir) as client:
+            real = book.save
+
+            async def crash(*args, **kwargs):
+                book.save = real
+                raise Crash("save")
+
+            book.save = crash  # dies once every child has filled, before the position is saved
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 400, id="x1"))
+            await venue.wait_filled(4, timeout=10)
+            await asyncio.sleep(0.05)
+        async with running_app(venue, traders=1, data_dir=data_dir):
+            await asyncio.sleep(0.2)  # the reconciler restored the children, the replay finds them
+            return venue, [(p.symbol, p.qty) for p in book.positions()]
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            venue, positions = asyncio.run(run(tmp))
+    finally:
+        settings.execution = saved
+    assert len(venue.log) == 4
+    assert positions == [("BTCUSDT", pytest.approx(4.0))]
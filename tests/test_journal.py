@@ -0,0 +1,107 @@
+import asyncio
+import tempfile
+
+from benchmarks.harness import alert, running_app
+from benchmarks.mock_bitget import MockBitget
+from bitget_trader.journal import Journal
+from bitget_trader.positions import book
+from bitget_trader.signals import Signal
+
+def sig(key: str, type: str = "buy", symbol: str = "BTCUSDT", users=None) -> Signal:
+    return Signal(type, symbol, 10.0 if type == "buy" else None, users, key=key)
+
+def test_concurrent_appends_share_fsyncs():
+    async def run(path):
+        journal = Journal(path, ["a"])
+        await journal.open()
+        await asyncio.gather(*(journal.received([sig(str(i))]) for i in range(200)))
+        await journal.close()
+        return journal
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = asyncio.run(run(tmp))
+    assert journal.records == 200
+    assert journal.commits < 20
+
+def test_recovers_unfinished_signals_and_skips_torn_lines():
+    async def write(path):
+        journal = Journal(path, ["a", "b"])
+        await journal.open()
+        await journal.received([sig("1"), sig("2", users=["b"]), sig("3", "sell")])
+        journal.note("1", "a", "persisted")
+        journal.note("1", "b", "submitted", "42")
+        journal.note("2", "b", "done")
+        journal.note("3", "a", "failed")
+        await journal.close()
+        with open(journal._file_of(journal._segment), "ab") as fh:
+            fh.write(b'{"k":"1","e":"persi')  # power cut mid-write
+
+    async def read(path):
+        journal = Journal(path, ["a", "b"])
+        await journal.open()
+        pending = journal.pending()
+        await journal.close()
+        return pending
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(write(tmp))
+        pending = asyncio.run(read(tmp))
+    assert [(s.key, s.users, s.replay) for s in pending] == [("1", ["b"], "resume"), ("3", ["b"], "resume")]
+
+def test_stale_untouched_signals_are_only_reconciled():
+    async def run(path):
+        journal = Journal(path, ["a", "b"])
+        await journal.open()
+        await journal.received([sig("1")])
+        journal.note("1", "a", "submitted", "7")
+        await journal.close()
+        journal = Journal(path, ["a", "b"])
+        await journal.open()
+        await journal.close()
+        return journal.pending(max_age=60, now=journal._live["1"].ts + 61)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pending = asyncio.run(run(tmp))
+    assert [(s.users, s.replay) for s in pending] == [(["a"], "resume"), (["b"], "reconcile")]
+
+def test_finished_segments_are_deleted():
+    async def run(path):
+        journal = Journal(path, ["a"], segment_bytes=1000)
+        await journal.open()
+        await journal.received([sig("open")])
+        for i in range(100):
+            await journal.received([sig(str(i))])
+            journal.note(str(i), "a", "done")
+        segments = journal._segments()
+        journal.note("open", "a", "done")
+        for i in range(100, 120):
+            await journal.received([sig(str(i))])
+            journal.note(str(i), "a", "done")
+        await journal.close()
+        return segments, journal._segments()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        while_open, after = asyncio.run(run(tmp))
+    assert while_open[0] == 1 and len(while_open) > 5  # kept for the unfinished first signal
+    assert 1 not in after and len(after) < 5
+
+def test_order_placed_before_a_crash_is_resumed_not_repeated():
+    async def run(data_dir):
+        venue = MockBitget(latency=0, fill_delay=0.5)
+        async with running_app(venue, traders=2, data_dir=data_dir) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="x1"))
+            while len(venue.log) < 2:
+                await asyncio.sleep(0.01)
+            # leaves while both traders are still waiting for the fill
+        assert book.positions() == []
+        async with running_app(venue, traders=2, data_dir=data_dir):
+            await venue.wait_filled(2, timeout=10)
+            while len(book.positions()) < 2:
+                await asyncio.sleep(0.01)
+            return venue, {p.user_id: p.qty for p in book.positions()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        venue, positions = asyncio.run(run(tmp))
+    assert len(venue.log) == 2
+    assert venue.calls["fetch_order"] >= 2
+    assert positions == {"t0": 1.0, "t1": 1.0}
@@ -0,0 +1,85 @@
+import asyncio
+
+from bitget_trader.ledger import BalanceLedger
+
+
+class StubExchange:
+    def __init__(self, free):
+        self.free = free
+        self.calls = 0
+
+    async def get_available_usdt(self):
+        self.calls += 1
+        return self.free
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_buys_read_memory_until_stale():
+    ex, clock = StubExchange(1000.0), Clock()
+    ledger = BalanceLedger(ex, max_age=30, reconcile_every=0, clock=clock)
+
+    async def run():
+        await ledger.start()
+        for _ in range(10):
+            assert await ledger.available() >= 100
+            ledger.reserve(100)
+            ledger.settle(100, spent=99.5 + 0.1)
+        clock.now = 31
+        ex.free = 5.0
+        stale = await ledger.available()  # does not wait for the exchange
+        await asyncio.sleep(0)
+        return stale, await ledger.available()
+
+    stale, fresh = asyncio.run(run())
+    assert abs(stale - 4.0) < 1e-9 and fresh == 5.0
+    assert ex.calls == 2
+
+
+def test_refresh_during_an_order_is_fetched_again_after_it():
+    ex = StubExchange(1000.0)
+    ledger = BalanceLedger(ex, reconcile_every=0)
+
+    async def run():
+        await ledger.start()
+        ledger.reserve(100)
+        await ledger.refresh()  # may or may not include the order: ignored
+        assert ledger.free == 900
+        ex.free = 900.5
+        ledger.settle(100, spent=99.5)
+        await asyncio.sleep(0)
+        return ledger.free
+
+    assert asyncio.run(run()) == 900.5
+    assert ex.calls == 3
+
+
+def test_fills_and_failures_adjust_balance():
+    ledger = BalanceLedger(StubExchange(500.0), reconcile_every=0)
+    asyncio.run(ledger.start())
+    ledger.reserve(200)
+    assert ledger.free == 300
+    ledger.settle(200)  # order failed, reservation released
+    assert ledger.free == 500
+    ledger.reserve()
+    ledger.settle(received=120 - 0.12)
+    assert abs(ledger.free - 619.88) < 1e-9
+
+
+def test_reconcile_waits_for_inflight_orders():
+    ex = StubExchange(1000.0)
+    ledger = BalanceLedger(ex, reconcile_every=0)
+    asyncio.run(ledger.start())
+    ledger.reserve(100)
+    ex.free = 1000.0  # exchange has not seen the order yet
+    asyncio.run(ledger.refresh())
+    ledger.on_account({"coin": "USDT", "available": "1000"})
+    assert ledger.free == 900
+    ledger.settle(100, spent=100)
+    ledger.on_account({"coin": "USDT", "available": "899.9"})
+    assert ledger.free == 899.9
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_bitget import make_markets
+from bitget_trader.exchange import Exchange
+from bitget_trader.markets import MarketCache
+
+
+def _exchanges(count, downloads):
+    markets, currencies = make_markets(50)
+
+    async def fetch_market_data():
+        downloads.append(time.monotonic())
+        await asyncio.sleep(0.05)
+        return markets, currencies
+
+    exchanges = []
+    for i in range(count):
+        ex = Exchange(f"key{i}", "secret", "pass", False)
+        ex.fetch_market_data = fetch_market_data
+        exchanges.append(ex)
+    return exchanges
+
+
+def test_markets_downloaded_once_and_shared(tmp_path):
+    downloads = []
+
+    async def run():
+        cache = MarketCache(False, ttl=3600, path=tmp_path / "markets.json")
+        exchanges = _exchanges(15, downloads)
+        await asyncio.gather(*(cache.load(ex) for ex in exchanges))
+        await cache.close()
+        return exchanges
+
+    exchanges = asyncio.run(run())
+    assert len(downloads) == 1
+    assert all(ex.markets is exchanges[0].markets for ex in exchanges)
+    assert exchanges[3]._client.amount_to_precision("BTC/USDT", 0.123456789) == "0.123456"
+    assert len(json.loads((tmp_path / "markets.json").read_text())["markets"]) == 50
+
+
+def test_warm_start_serves_disk_cache_then_refreshes(tmp_path):
+    downloads = []
+    path = tmp_path / "markets.json"
+
+    async def run():
+        cold = MarketCache(False, ttl=3600, path=path)
+        await cold.load(_exchanges(1, downloads)[0])
+        await cold.close()
+
+        warm = MarketCache(False, ttl=3600, path=path)
+        ex = _exchanges(1, downloads)[0]
+        await warm.load(ex)
+        fresh_downloads = len(downloads)
+        await warm.close()
+
+        data = json.loads(path.read_text())
+        data["fetched_at"] -= 7200
+        path.write_text(json.dumps(data))
+        stale = MarketCache(False, ttl=3600, path=path)
+        ex = _exchanges(1, downloads)[0]
+        await stale.load(ex)
+        served_before_refresh = ex.markets is not None and len(downloads) == fresh_downloads
+        await asyncio.sleep(0.1)
+        await stale.close()
+        return fresh_downloads, served_before_refresh
+
+    fresh_downloads, served_before_refresh = asyncio.run(run())
+    assert fresh_downloads == 1
+    assert served_before_refresh
+    assert len(downloads) == 2
+
+
+def test_concurrent_writers_never_leave_a_broken_cache(tmp_path):
+    markets, currencies = make_markets(200)
+    path = tmp_path / "markets.json"
+
+    def write(n):  # as the shard workers do, each with its own cache of the same file
+        cache = MarketCache(False, ttl=3600, path=path)
+        cache.markets, cache.currencies, cache.fetched_at = markets, currencies, float(n)
+        for _ in range(20):
+            cache._write()
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(write, range(8)))
+    assert len(json.loads(path.read_text())["markets"]) == 200
+    assert [p.name for p in tmp_path.iterdir()] == ["markets.json"]
@@ -0,0 +1,54 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from bitget_trader import metrics
+from bitget_trader.receiver import app
+from bitget_trader.signals import Signal
+from bitget_trader.utils import retry
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = metrics.Histogram("test_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    metrics.REGISTRY.remove(hist)
+    for value in (0.05, 0.5, 0.7, 3.0):
+        hist.observe(value, "x")
+    lines = list(hist.render())
+    assert 'test_seconds_bucket{stage="x",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="x",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{stage="x",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{stage="x"} 4' in lines
+    assert hist.count("x") == 4
+
+
+def test_spans_are_carried_on_the_signal():
+    sig = Signal("buy", "BTCUSDT", 10.0, None)
+    before = metrics.STAGES.count("submit")
+    with metrics.span(sig, "submit"):
+        pass
+    assert "submit" in sig.spans
+    assert metrics.STAGES.count("submit") == before + 1
+
+
+def test_retries_are_counted():
+    calls = []
+
+    @retry(max_tries=3, initial_delay=0)
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("try again")
+        return "ok"
+
+    before = metrics.RETRIES.value("flaky")
+    assert asyncio.run(flaky()) == "ok"
+    assert metrics.RETRIES.value("flaky") == before + 2
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    metrics.record(None, "parse", 0.001)
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE bitget_stage_seconds histogram" in response.text
+    assert 'bitget_stage_seconds_count{stage="parse"}' in response.text
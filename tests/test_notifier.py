@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from benchmarks.mock_bitget import StubBot
+from bitget_trader.notifier import Outbox
+
+
+def test_put_does_not_wait_for_telegram():
+    async def run():
+        bot = StubBot(latency=0.5)
+        outbox = Outbox(bot=bot, window=0.0, chat_interval=0.0)
+        started = time.perf_counter()
+        for i in range(20):
+            outbox.put(1, f"msg {i}")
+        enqueue = time.perf_counter() - started
+        await outbox.close()
+        return enqueue, bot.messages
+
+    enqueue, sent = asyncio.run(run())
+    assert enqueue < 0.01
+    assert "\n\n".join(text for _, text in sent) == "\n\n".join(f"msg {i}" for i in range(20))
+
+
+def test_messages_within_window_are_merged_in_order():
+    async def run():
+        bot = StubBot()
+        outbox = Outbox(bot=bot, window=0.05, chat_interval=0.0)
+        outbox.put(1, "a")
+        outbox.put(2, "x")
+        outbox.put(1, "b")
+        await asyncio.sleep(0.1)
+        outbox.put(1, "c")
+        await outbox.close()
+        return bot.messages, outbox.merged
+
+    sent, merged = asyncio.run(run())
+    assert [t for c, t in sent if c == 1] == ["a\n\nb", "c"]
+    assert [t for c, t in sent if c == 2] == ["x"]
+    assert merged == 1
+
+
+def test_failed_sends_are_retried():
+    async def run():
+        bot = StubBot(fail_first=2)
+        outbox = Outbox(bot=bot, window=0.0, chat_interval=0.0)
+        outbox.put(1, "hello")
+        await outbox.close(timeout=5)
+        return bot.messages, outbox.dropped
+
+    sent, dropped = asyncio.run(run())
+    assert sent == [(1, "hello")] and dropped == 0
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from benchmarks.mock_bitget import FakeOrderServer, order_message
+from bitget_trader.ws import OrderStream
+
+
+def test_fill_push_resolves_wait():
+    async def run():
+        async with FakeOrderServer() as server:
+            stream = OrderStream("key", "secret", "pass", url=server.url)
+            await stream.start()
+            await asyncio.wait_for(server.subscribed.wait(), 2)
+
+            async def fill_later():
+                await asyncio.sleep(0.05)
+                await server.push(order_message("1", status="live"))
+                await server.push(order_message("1", qty=0.002, price=50000))
+
+            started = time.perf_counter()
+            asyncio.create_task(fill_later())
+            order = await stream.wait("1", 2)
+            elapsed = time.perf_counter() - started
+            await stream.close()
+            return order, elapsed
+
+    order, elapsed = asyncio.run(run())
+    assert order["status"] == "closed"
+    assert order["filled"] == 0.002 and order["cost"] == 100.0
+    assert order["fee"] == {"cost": 0.06, "currency": "USDT"}
+    assert elapsed < 0.5
+
+
+def test_push_before_wait_is_kept():
+    async def run():
+        async with FakeOrderServer() as server:
+            stream = OrderStream("key", "secret", "pass", url=server.url)
+            await stream.start()
+            await asyncio.wait_for(server.subscribed.wait(), 2)
+            await server.push(order_message("7", status="cancelled"))
+            await asyncio.sleep(0.05)
+            order = await stream.wait("7", 0.1)
+            missing = await stream.wait("8", 0.05)
+            await stream.close()
+            return order, missing
+
+    order, missing = asyncio.run(run())
+    assert order["status"] == "canceled"
+    assert missing is None
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from benchmarks.harness import alert, running_app
+from benchmarks.mock_bitget import FakeOrderServer, MockBitget, ticker_message
+from bitget_trader import tickers
+from bitget_trader.config import settings
+from bitget_trader.portfolio import Portfolio
+from bitget_trader.positions import PositionBook
+from bitget_trader.tickers import TickerCache
+
+@pytest.fixture
+def caches():
+    saved = dict(tickers._caches)
+    tickers._caches.clear()
+    tickers._caches.update({False: TickerCache(False, 10, stream=False), True: TickerCache(True, 10, stream=False)})
+    yield tickers._caches
+    tickers._caches.clear()
+    tickers._caches.update(saved)
+
+def test_snapshot_values_every_position_at_its_environment_price(caches):
+    book = PositionBook(write_behind=True)
+    book.open("a", "BTCUSDT", 2.0, 100.0, 200.0, 0.2)
+    book.open("a", "ETHUSDT", 10.0, 10.0, 100.0, 0.1)
+    book.open("b", "BTCUSDT", 1.0, 90.0, 90.0, 0.09)
+    caches[False].prices.update({"BTCUSDT": 110.0, "ETHUSDT": 12.0})
+    caches[True].prices.update({"BTCUSDT": 50.0})
+    portfolio = Portfolio(book, {"a": False, "b": True})
+
+    snap = portfolio.snapshot()
+    a, b = snap["traders"]["a"], snap["traders"]["b"]
+    assert a["positions"]["BTCUSDT"] == {"qty": 2.0, "avg_cost": 100.0, "price": 110.0, "exposure": 220.0,
+                                         "cost_basis": 200.2, "unrealised_pnl": pytest.approx(19.8)}
+    assert a["exposure"] == 340.0 and a["unrealised_pnl"] == pytest.approx(39.7)
+    assert b["positions"]["BTCUSDT"]["price"] == 50.0
+    assert snap["total"]["exposure"] == 390.0
+    assert snap["unpriced"] == []
+
+    book.open("b", "SOLUSDT", 3.0, 20.0, 60.0, 0.06)  # no price yet
+    snap = portfolio.snapshot()
+    sol = snap["traders"]["b"]["positions"]["SOLUSDT"]
+    assert sol["price"] is None and sol["unrealised_pnl"] is None
+    assert snap["traders"]["b"]["cost_basis"] == pytest.approx(150.15)
+    assert snap["total"]["exposure"] == 390.0
+    assert snap["unpriced"] == ["SOLUSDT"]
+    assert portfolio.symbols(True) == {"BTCUSDT", "SOLUSDT"}
+
+def test_ticker_stream_follows_tracked_symbols():
+    async def run():
+        async with FakeOrderServer() as server:
+            cache = TickerCache(False, 10, url=server.url)
+            await cache.track({"BTCUSDT", "ETHUSDT"})
+            await asyncio.wait_for(server.subscribed.wait(), 2)
+            await server.push(ticker_message("BTCUSDT", 61000.5))
+            while "BTCUSDT" not in cache.prices:
+                await asyncio.sleep(0.01)
+            subscribed = set(server.channels)
+            await cache.track({"ETHUSDT"})
+            while server.channels != {"ETHUSDT"}:
+                await asyncio.sleep(0.01)
+            await cache.close()
+            return cache, subscribed
+
+    cache, subscribed = asyncio.run(run())
+    assert subscribed == {"BTCUSDT", "ETHUSDT"}
+    assert cache.prices == {}  # BTCUSDT is no longer tracked
+    assert cache.rest_fetches == 0
+
+def test_portfolio_endpoint_marks_to_market():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=2) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))
+            await venue.wait_filled(2, timeout=10)
+            venue.price = 110.0
+            tickers.cache_for(False).updated.clear()  # stale, so the next sync fetches it
+            auth = {"Authorization": f"Bearer {settings.tradingview_secret.get_secret_value()}"}
+            for _ in range(100):
+                snap = (await client.get("/portfolio", headers=auth)).json()
+                if snap["total"]["exposure"] == 220.0:
+                    break
+                await asyncio.sleep(0.05)
+            denied = await client.get("/portfolio")
+        return snap, denied, venue
+
+    snap, denied, venue = asyncio.run(run())
+    assert denied.status_code == 403
+    assert snap["total"]["exposure"] == 220.0
+    assert snap["total"]["cost_basis"] == pytest.approx(200.2)
+    assert snap["traders"]["t0"]["positions"]["BTCUSDT"]["unrealised_pnl"] == pytest.approx(9.9)
+    assert venue.calls["fetch_tickers"] >= 1
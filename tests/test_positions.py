@@ -0,0 +1,75 @@
+import asyncio
+import subprocess
+import sys
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from bitget_trader.db import init_db, make_engine
+from bitget_trader.models import Position
+from bitget_trader.positions import PositionBook
+
+
+def _session(tmp_path):
+    engine = make_engine(tmp_path / "test.sqlite3")
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def test_write_behind_batches_and_recovers(tmp_path):
+    async def run():
+        engine, session = _session(tmp_path)
+        await init_db(engine)
+        book = PositionBook(session, write_behind=True, flush_interval=0.01)
+        await book.start()
+        for i in range(20):
+            pos = book.open("a", f"C{i}USDT", 1.0, 10.0, 10.0, 0.01)
+            await book.save(pos)
+        pos = book.get("a", "C0USDT")
+        pos.qty += 1
+        await book.save(pos)
+        closed = book.get("a", "C1USDT")
+        closed.status = "CLOSED"
+        book.close(closed)
+        await book.save(closed)
+        await book.stop()
+
+        recovered = PositionBook(session, write_behind=False)
+        await recovered.load()
+        async with session() as sess:
+            rows = await sess.scalar(select(func.count()).select_from(Position))
+        await engine.dispose()
+        return book, recovered, rows
+
+    book, recovered, rows = asyncio.run(run())
+    assert rows == 20
+    assert book.flushes < 5
+    assert len(recovered.positions("a")) == 19
+    assert recovered.get("a", "C0USDT").qty == 2.0
+    assert recovered.get("a", "C1USDT") is None
+
+
+def test_write_through_commits_on_save(tmp_path):
+    async def run():
+        engine, session = _session(tmp_path)
+        await init_db(engine)
+        book = PositionBook(session, write_behind=False)
+        await book.start()
+        pos = book.open("a", "BTCUSDT", 0.5, 100.0, 50.0, 0.05)
+        await book.save(pos)
+        async with session() as sess:
+            stored = await sess.get(Position, pos.id)
+            journal = (await sess.connection()).exec_driver_sql("PRAGMA journal_mode")
+            journal = (await journal).scalar()
+        await engine.dispose()
+        return stored, journal
+
+    stored, journal = asyncio.run(run())
+    assert stored.qty == 0.5 and stored.status == "OPEN"
+    assert journal == "wal"
+
+
+def test_trader_modules_do_not_load_numpy():
+    code = ("import sys, bitget_trader.positions, bitget_trader.trader, bitget_trader.shards;"
+            "print('numpy' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,88 @@
+import asyncio
+
+from bitget_trader.exchange import Exchange
+from bitget_trader.utils import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+        await asyncio.sleep(0)
+
+
+class StubClient:
+    async def fetch_balance(self):
+        return {"free": {"USDT": 1000.0}}
+
+    async def create_order(self, symbol, type, side, amount, params=None):
+        return {"id": params["clientOid"]}
+
+    async def fetch_order(self, order_id, symbol):
+        return {"id": order_id, "status": "closed"}
+
+
+def _exchange(key, limiter):
+    ex = Exchange(key, "secret", "pass", False, limiter=limiter)
+    ex._client = StubClient()
+    return ex
+
+
+def test_bucket_refills_continuously():
+    clock = FakeClock()
+    bucket = TokenBucket(10, 10, clock, clock.sleep)
+
+    async def run():
+        for _ in range(10):
+            assert await bucket.acquire() == 0.0
+        assert await bucket.acquire() == 0.1
+        clock.now += 0.5
+        assert await bucket.acquire(2) == 0.0
+
+    asyncio.run(run())
+    assert bucket.waits == 1
+
+
+def test_fifteen_traders_buy_without_queueing():
+    clock = FakeClock()
+    limiter = RateLimiter({"order": 20, "query": 20, "account": 20}, 15, clock=clock, sleep=clock.sleep)
+    exchanges = [_exchange(f"key{i}", limiter) for i in range(15)]
+
+    async def buy(ex):
+        await ex.get_available_usdt()
+        order = await ex.create_market_buy("BTC/USDT", 10, "oid")
+        await ex.fetch_order(order["id"], "BTC/USDT")
+
+    async def run():
+        await asyncio.gather(*(buy(ex) for ex in exchanges))
+
+    asyncio.run(run())
+    # each key has its own budget, so the burst costs no waiting at all
+    assert clock.now < 0.1
+    assert all(s["waits"] == 0 for s in limiter.stats().values())
+
+
+def test_same_key_burst_is_spread_by_weight():
+    clock = FakeClock()
+    limiter = RateLimiter({"order": 20}, 15, clock=clock, sleep=clock.sleep)
+    ex = _exchange("key", limiter)
+
+    async def run():
+        await asyncio.gather(*(ex.create_market_buy("BTC/USDT", 10, str(i)) for i in range(15)))
+
+    asyncio.run(run())
+    # 15 orders weigh 30 units against a 20 unit bucket refilling at 20/s
+    assert abs(clock.now - 0.5) < 1e-9
+    stats = limiter.stats()
+    assert len(stats) == 1 and next(iter(stats.values()))["waits"] == 5
+
+
+def test_public_bucket_is_shared():
+    limiter = RateLimiter({"order": 20}, 15)
+    assert limiter.bucket("a", RateLimiter.PUBLIC) is limiter.bucket("b", RateLimiter.PUBLIC)
+    assert limiter.bucket("a", "order") is not limiter.bucket("b", "order")
@@ -0,0 +1,194 @@
+import asyncio
+import contextlib
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from benchmarks.harness import alert, patched, running_app
+from benchmarks.mock_bitget import MockBitget
+from bitget_trader import db, receiver
+from bitget_trader.exchange import Exchange
+from bitget_trader.journal import Journal
+from bitget_trader.notifier import outbox
+from bitget_trader.positions import book
+from bitget_trader.reconcile import Reconciler
+
+class Crash(BaseException):
+    """The process dying at an injected point: nothing after it runs."""
+
+def _crash_once(obj, name: str):
+    real = getattr(obj, name)
+
+    async def crash(*args, **kwargs):
+        setattr(obj, name, real)
+        raise Crash(name)
+
+    setattr(obj, name, crash)
+
+class _Trader:
+    def __init__(self, exchange: Exchange):
+        self.id, self.chat_id, self.exchange, self.released = "t0", 1000, exchange, {}
+
+async def _filled(venue: MockBitget, side: str, symbol: str = "BTCUSDT", amount: float | None = None):
+    order = venue.place("key0", symbol, side, amount, {"cost": 100.0})
+    order.fills_at = order.created
+    await asyncio.sleep(0.005)  # into the next millisecond, before the run's horizon
+    return order
+
+def test_buy_lost_in_a_crash_is_restored_at_startup():
+    async def run(data_dir):
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=1, data_dir=data_dir) as client:
+            _crash_once(book, "save")  # dies after the fill, before the position is saved
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="x1"))
+            await venue.wait_filled(1, timeout=10)
+            await asyncio.sleep(0.05)
+        async with running_app(venue, traders=1, data_dir=data_dir):
+            applied = receiver._reconciler.last[0].applied
+            await asyncio.sleep(0.2)  # the journal replay finds the order already applied
+            return venue, applied, [(p.user_id, p.symbol, p.qty) for p in book.positions()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        venue, applied, positions = asyncio.run(run(tmp))
+    assert len(venue.log) == 1
+    assert applied == [("1", "BTCUSDT", "buy")]
+    assert positions == [("t0", "BTCUSDT", 1.0)]
+
+def test_replay_after_a_lost_journal_record_does_not_apply_twice():
+    async def run(data_dir):
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=1, data_dir=data_dir) as client:
+            note = Journal.note
+            Journal.note = lambda self, key, trader, event, order_id=None: (
+                None if event == "persisted" else note(self, key, trader, event, order_id))
+            try:
+                await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="x1"))
+                await venue.wait_filled(1, timeout=10)
+                await asyncio.sleep(0.1)  # the position is committed, its journal record is not
+            finally:
+                Journal.note = note
+        async with running_app(venue, traders=1, data_dir=data_dir):
+            await asyncio.sleep(0.2)
+            return [(p.symbol, p.qty) for p in book.positions()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert asyncio.run(run(tmp)) == [("BTCUSDT", 1.0)]
+
+def test_reads_only_new_fills_and_survives_a_crash_before_the_cursor():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with patched(venue, traders=1):
+            await db.init_db()
+            await book.start()
+            exchange = Exchange("key0", "secret", "pass", False)
+            await exchange.load_markets()
+            trader = _Trader(exchange)
+            trader.released["BTCUSDT"] = 0.0
+            reconciler = Reconciler([trader], book)
+            await reconciler.run(grace=0)  # the app started before any of the fills
+
+            await _filled(venue, "buy")
+            first = (await reconciler.run(grace=0))[0]
+            pos = book.get("t0", "BTCUSDT")
+            assert first.applied and pos.qty == 1.0
+
+            await _filled(venue, "buy")
+            _crash_once(reconciler, "_save_cursors")  # positions committed, cursor not moved
+            assert await reconciler.run(grace=0) == []
+            await book.start()  # a restart: claims are gone, the table decides
+            again = (await reconciler.run(grace=0))[0]
+
+            await _filled(venue, "sell", amount=2.0)
+            last = (await reconciler.run(grace=0))[0]
+            positions = book.positions()
+            await book.stop()
+            await outbox.close()
+            return first, again, last, pos.qty, positions
+
+    first, again, last, qty, positions = asyncio.run(run())
+    assert (first.trades, again.trades, last.trades) == (1, 1, 1)  # each run reads only what is new
+    assert again.applied == [] and qty == 2.0
+    assert [side for _, _, side in last.applied] == ["sell"] and positions == []
+
+def test_fills_of_orders_a_trader_still_holds_are_left_and_read_again():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with patched(venue, traders=1):
+            await db.init_db()
+            await book.start()
+            exchange = Exchange("key0", "secret", "pass", False)
+            await exchange.load_markets()
+            trader = _Trader(exchange)
+            trader.released["BTCUSDT"] = 0.0
+            reconciler = Reconciler([trader], book)
+            await reconciler.run(grace=0)
+            order = await _filled(venue, "buy")
+            book.claim("t0", order.id)  # a trader is waiting for this fill
+            held = (await reconciler.run(grace=0))[0]
+            book.release("t0", order.id)  # and gives up on it
+            trader.released["BTCUSDT"] = time.time()
+            picked = (await reconciler.run(grace=0))[0]
+            qty = book.get("t0", "BTCUSDT").qty
+            await book.stop()
+            await outbox.close()
+            return held, picked, qty
+
+    held, picked, qty = asyncio.run(run())
+    assert held.applied == [] and held.trades == 1
+    assert [oid for oid, _, _ in picked.applied] == ["1"] and qty == pytest.approx(1.0)
+
+def test_fills_of_a_symbol_not_read_yet_are_not_skipped():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with patched(venue, traders=1):
+            await db.init_db()
+            await book.start()
+            exchange = Exchange("key0", "secret", "pass", False)
+            await exchange.load_markets()
+            trader = _Trader(exchange)
+            trader.released["BTCUSDT"] = 0.0
+            reconciler = Reconciler([trader], book)
+            await reconciler.run(grace=0)
+            await _filled(venue, "buy")
+            await _filled(venue, "buy", "ETHUSDT")  # filled, then a crash: no position, no journal record
+            first = (await reconciler.run(grace=0))[0]
+            trader.released["ETHUSDT"] = time.time()  # a later ETH order brings the symbol up
+            later = (await reconciler.run(grace=0))[0]
+            positions = sorted((p.symbol, p.qty) for p in book.positions())
+            await book.stop()
+            await outbox.close()
+            return first, later, positions
+
+    first, later, positions = asyncio.run(run())
+    assert [symbol for _, symbol, _ in first.applied] == ["BTCUSDT"]
+    assert [symbol for _, symbol, _ in later.applied] == ["ETHUSDT"] and later.symbols == 2
+    assert positions == [("BTCUSDT", 1.0), ("ETHUSDT", 1.0)]
+
+@pytest.mark.parametrize("cursor_table", [False, True])
+def test_upgrade_does_not_apply_fills_the_positions_already_count(cursor_table):
+    async def run(data_dir):
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with patched(venue, traders=1, data_dir=data_dir):  # the database as an older version left it
+            await db.init_db()
+            await book.start()
+            await book.save(book.open("t0", "BTCUSDT", 1.0, 100.0, 100.0, 0.1))
+            await book.stop()
+        await _filled(venue, "buy")  # the fill of that position
+        with contextlib.closing(sqlite3.connect(Path(data_dir) / "bench.sqlite3")) as conn:
+            conn.execute("DROP TABLE applied_orders")
+            conn.execute("DROP TABLE fill_cursors")
+            if cursor_table:  # one cursor per trader
+                conn.execute("CREATE TABLE fill_cursors (user_id VARCHAR PRIMARY KEY, since_ms INTEGER, updated_at DATETIME)")
+                conn.execute("INSERT INTO fill_cursors VALUES ('t0', ?, NULL)", (int(time.time() * 1000),))
+            conn.commit()
+        async with running_app(venue, traders=1, data_dir=data_dir):
+            report = receiver._reconciler.last[0]
+            return report, [(p.symbol, p.qty, p.total_buy_amount) for p in book.positions()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report, positions = asyncio.run(run(tmp))
+    assert report.applied == []
+    assert positions == [("BTCUSDT", 1.0, 100.0)]
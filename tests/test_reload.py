@@ -0,0 +1,156 @@
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+from ccxt.base.errors import AuthenticationError
+from pydantic import SecretStr
+
+from benchmarks.harness import alert, running_app, trader_configs
+from benchmarks.mock_bitget import MockBitget
+from bitget_trader import exchange, receiver
+from bitget_trader.config import Settings, _RateLimits, _Timeouts, settings
+from bitget_trader.exchange import rate_limiter
+from bitget_trader.positions import book
+
+@pytest.fixture(autouse=True)
+def _restore_hot_settings():
+    saved = settings.timeouts, settings.rate_limit_rps, settings.rate_limits, settings.execution
+    yield
+    settings.timeouts, settings.rate_limit_rps, settings.rate_limits, settings.execution = saved
+    rate_limiter.configure(settings.rate_limits.model_dump(exclude={"burst"}), settings.rate_limit_rps,
+                           settings.rate_limits.burst)
+
+def _with(**update) -> Settings:
+    return settings.model_copy(update=update)
+
+def _dump(new: Settings) -> str:
+    """``new`` as a config.yaml, secrets included."""
+    data = new.model_dump(mode="json")
+    for cfg, raw in zip(new.traders, data["traders"]):
+        for name in ("api_key", "api_secret", "passphrase"):
+            raw[name] = getattr(cfg, name).get_secret_value()
+    for name in ("tradingview_secret", "telegram_token"):
+        data[name] = getattr(new, name).get_secret_value()
+    return yaml.safe_dump(data)
+
+def test_traders_come_and_go_without_disturbing_orders_in_flight():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0.3)
+        async with running_app(venue, traders=2) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="a"))
+            while len(venue.log) < 2:
+                await asyncio.sleep(0.01)
+            t0, t1 = receiver.traders
+            cfgs = trader_configs(3)
+            change = await receiver._reloader.apply(_with(traders=[cfgs[0], cfgs[2]]))
+            live = [t.id for t in receiver.traders]
+            await venue.wait_filled(2, timeout=5)
+            await receiver._reloader.settled()
+            held = {p.user_id for p in book.positions()}
+            await client.post("/webhook", json=alert("buy", "ETHUSDT", 100, id="b"))
+            await venue.wait_filled(4, timeout=5)
+            return venue, change, live, held, receiver.traders[0] is t0, receiver._dispatcher.stats()
+
+    venue, change, live, held, kept, stats = asyncio.run(run())
+    assert (change.added, change.removed, change.replaced) == (["t2"], ["t1"], [])
+    assert live == ["t0", "t2"] and kept
+    assert held == {"t0", "t1"}  # t1's order filled after it was removed, and was booked
+    assert sorted(o.key for o in venue.log[2:]) == ["key0", "key2"]
+    assert set(stats) == {"t0", "t2"}
+
+def test_new_keys_replace_the_client_once_its_orders_are_done():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0.3)
+        async with running_app(venue, traders=1) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="a"))
+            while not venue.log:
+                await asyncio.sleep(0.01)
+            old = receiver.traders[0]
+            cfg = trader_configs(1)[0].model_copy(update={"api_key": SecretStr("rotated")})
+            change = await receiver._reloader.apply(_with(traders=[cfg]))
+            await venue.wait_filled(1, timeout=5)
+            await receiver._reloader.settled()
+            held = [(p.user_id, p.symbol) for p in book.positions()]
+            await client.post("/webhook", json=alert("buy", "ETHUSDT", 100, id="b"))
+            await venue.wait_filled(2, timeout=5)
+            return venue, change, held, receiver.traders[0] is not old
+
+    venue, change, held, swapped = asyncio.run(run())
+    assert change.replaced == ["t0"] and swapped
+    assert held == [("t0", "BTCUSDT")]
+    assert [o.key for o in venue.log] == ["key0", "rotated"]
+
+def test_replacement_waits_for_the_buy_its_predecessor_has_in_flight():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0.3)
+        async with running_app(venue, traders=1) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="a"))
+            while not venue.log:
+                await asyncio.sleep(0.01)
+            cfg = trader_configs(1)[0].model_copy(update={"api_key": SecretStr("rotated")})
+            await receiver._reloader.apply(_with(traders=[cfg]))
+            await client.post("/webhook", json=alert("sell", "BTCUSDT", id="b"))  # goes to the new instance
+            await venue.wait_filled(2, timeout=5)
+            await receiver._reloader.settled()
+            return venue, book.positions()
+
+    venue, positions = asyncio.run(run())
+    buy, sell = venue.log
+    assert sell.side == "sell" and sell.created >= buy.fills_at
+    assert sell.amount == 1.0 and positions == []
+
+def test_timeouts_and_rate_limits_change_in_place():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=1) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="a"))
+            await venue.wait_filled(1, timeout=5)
+            trader = receiver.traders[0]
+            bucket = rate_limiter.bucket("key0", "order")
+            rate = bucket.rate
+            change = await receiver._reloader.apply(_with(
+                timeouts=_Timeouts(buy=3, sell=4), rate_limits=_RateLimits(order=5), shards=4))
+            return change, trader, receiver.traders[0], rate, bucket.rate, settings.shards
+
+    change, before, after, rate, resized, shards = asyncio.run(run())
+    assert after is before and (after._timeout_buy, after._timeout_sell) == (3, 4)
+    assert change.sections == ["timeouts", "rate_limits"] and change.restart == ["shards"]
+    assert shards == 0 and resized == pytest.approx(rate / 4)
+
+def test_a_bad_file_changes_nothing():
+    async def run(tmp: Path):
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=1):
+            reloader = receiver._reloader
+            reloader.path = tmp / "config.yaml"
+            before = list(receiver.traders), settings.traders, settings.timeouts
+            cfgs = trader_configs(2)
+            results = []
+            reloader.path.write_text("traders: [unclosed\n")
+            results.append(await reloader.reload())
+            broken = _dump(_with(timeouts=_Timeouts(buy=1))).replace("notify_chat: 1000", "notify_chat: x")
+            reloader.path.write_text(broken)
+            results.append(await reloader.reload())
+
+            factory = exchange.client_factory
+
+            def refusing(config):  # the exchange rejects the new trader's keys
+                client = factory(config)
+                if config["apiKey"] == "key1":
+                    async def fetch_balance():
+                        raise AuthenticationError("bitget apikey does not exist")
+                    client.fetch_balance = fetch_balance
+                return client
+
+            exchange.client_factory = refusing
+            reloader.path.write_text(_dump(_with(traders=cfgs, timeouts=_Timeouts(buy=1))))
+            results.append(await reloader.reload())
+            after = list(receiver.traders), settings.traders, settings.timeouts
+            return results, reloader.rejected, before, after
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results, rejected, before, after = asyncio.run(run(Path(tmp)))
+    assert results == [None, None, None] and rejected == 3
+    assert after == before
@@ -1,12 +1,76 @@
 import asyncio
-from httpx import AsyncClient
 
-async def test_webhook():
-    async with AsyncClient(base_url="http://127.0.0.1:8000") as ac:
-        r = await ac.post("/webhook", json={"auth":"tv_secret", "type": "sell", "symbol": "BTCUSDT"})
-        print(r)
-        # assert r.status_code == 200
-        # assert r.json()["ok"] is True
+import pytest
+
+from benchmarks.harness import alert, running_app
+from benchmarks.mock_bitget import MockBitget, StubBot
+from bitget_trader.positions import book
+
+def test_webhook():
+    async def run():
+        venue, bot = MockBitget(latency=0, fill_delay=0, price=100.0), StubBot()
+        async with running_app(venue, traders=1, bot=bot) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))
+            await venue.wait_filled(1, timeout=10)
+            venue.price = 110.0
+            r = await client.post("/webhook", json=alert("sell", "BTCUSDT"))
+            await venue.wait_filled(2, timeout=10)
+            await asyncio.sleep(0)
+            open_after = book.positions()
+        return r, venue, open_after, bot
+
+    r, venue, open_after, bot = asyncio.run(run())
+    assert r.status_code == 200
+    assert [o.side for o in venue.log] == ["buy", "sell"]
+    assert venue.log[1].amount == 1.0
+    assert open_after == []
+    assert any("SELL filled" in text and "+9.79 USDT" in text for _, text in bot.messages)
+
+def test_sell_is_rounded_to_the_amount_step():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0, price=300.0)
+        async with running_app(venue, traders=1) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))
+            await venue.wait_filled(1, timeout=10)
+            await client.post("/webhook", json=alert("sell", "BTCUSDT"))
+            await venue.wait_filled(2, timeout=10)
+        return venue
+
+    venue = asyncio.run(run())
+    assert venue.log[0].amount == pytest.approx(1 / 3)
+    assert venue.log[1].amount == 0.333333  # the mock's BTC/USDT steps by 1e-6
+
+def test_sell_without_position():
+    async def run():
+        venue, bot = MockBitget(latency=0), StubBot()
+        async with running_app(venue, traders=1, bot=bot) as client:
+            r = await client.post("/webhook", json=alert("sell", "ETHUSDT"))
+            await asyncio.sleep(0.05)
+        return r, venue, bot
+
+    r, venue, bot = asyncio.run(run())
+    assert r.status_code == 200
+    assert venue.log == []
+    assert any("No open position for ETHUSDT" in text for _, text in bot.messages)
+
+def test_sell_waits_for_buys_in_flight():
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0.1)
+        async with running_app(venue, traders=1) as client:
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="a"))
+            await client.post("/webhook", json=alert("buy", "BTCUSDT", 100, id="b"))
+            await asyncio.sleep(0.02)
+            await client.post("/webhook", json=alert("sell", "BTCUSDT"))
+            await venue.wait_filled(3, timeout=10)
+            await asyncio.sleep(0)
+            open_after = book.positions()
+        return venue, open_after
+
+    venue, open_after = asyncio.run(run())
+    first, second, sell = venue.log
+    assert second.created < first.fills_at  # the second buy did not wait for the first fill
+    assert sell.side == "sell" and sell.created >= max(first.fills_at, second.fills_at)
+    assert sell.amount == 2.0 and open_after == []
 
 if __name__ == "__main__":
-    asyncio.run(test_webhook())
\ No newline at end of file
+    test_webhook()
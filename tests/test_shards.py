@@ -0,0 +1,91 @@
+import asyncio
+import shutil
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.harness import alert, patched, running_app
+from benchmarks.mock_bitget import MockBitget
+from bitget_trader import db, receiver
+from bitget_trader.config import settings
+from bitget_trader.models import Position
+from bitget_trader.shards import ShardRouter, shard_of
+
+def test_shard_of_is_stable_and_spread():
+    assert shard_of("john", 4) == shard_of("john", 4)
+    assert [shard_of(f"t{i}", 2) for i in range(4)] == [1, 1, 0, 0]
+    assert {shard_of(f"t{i}", 3) for i in range(20)} == {0, 1, 2}
+
+async def _positions(status, count, timeout=20.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        async with db.async_session() as sess:
+            rows = list(await sess.scalars(select(Position).where(Position.status == status)))
+        if len(rows) >= count or loop.time() > deadline:
+            return rows
+        await asyncio.sleep(0.05)
+
+def test_sharded_trading_survives_a_worker_crash():
+    async def run():
+        async with running_app(MockBitget(latency=0, fill_delay=0), traders=4, shards=2) as client:
+            router = receiver._dispatcher
+            assert (await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))).status_code == 200
+            opened = await _positions("OPEN", 4)
+
+            crashed = router._shards[shard_of("t2", 2)]  # owns t2 and t3
+            crashed.process.kill()
+            while crashed.restarts == 0 or not crashed.ready.is_set():
+                await asyncio.sleep(0.05)
+
+            assert (await client.post("/webhook", json=alert("sell", "BTCUSDT"))).status_code == 200
+            closed = await _positions("CLOSED", 4)
+            return opened, closed, crashed.restarts
+
+    opened, closed, restarts = asyncio.run(run())
+    assert sorted(p.user_id for p in opened) == ["t0", "t1", "t2", "t3"]
+    assert sorted(p.user_id for p in closed) == ["t0", "t1", "t2", "t3"]
+    assert all(p.realised_pnl is not None for p in closed)
+    assert restarts == 1
+
+def test_stopping_lets_workers_finish_their_signals():
+    async def run():
+        async with patched(MockBitget(latency=0, fill_delay=0.5), traders=2):
+            settings.shards = 2
+            async with receiver.app.router.lifespan_context(receiver.app):
+                transport = httpx.ASGITransport(app=receiver.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    assert (await client.post("/webhook", json=alert("buy", "BTCUSDT", 100))).status_code == 200
+            # the app is down; the orders filled after its shards were told to stop
+            return await _positions("OPEN", 2, timeout=0)
+
+    assert sorted(p.user_id for p in asyncio.run(run())) == ["t0", "t1"]
+
+def test_stats_poller_outlives_a_failed_or_hung_reply():
+    async def run():
+        router = ShardRouter(count=1, start_timeout=0.2)
+        shard = router._shards[0]
+        shard.ready.set()
+        replies = [RuntimeError("shard 0: boom"), None, {"stats": {"t0": {"depth": 0}}}]
+
+        async def call(shard, msg):
+            reply = replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            if reply is None:  # never answered
+                await asyncio.Event().wait()
+            return reply
+
+        router._call = call
+        poller = asyncio.create_task(router._poll_stats())
+        try:
+            for _ in range(100):
+                if router.stats() or poller.done():
+                    break
+                await asyncio.sleep(0.1)
+        finally:
+            poller.cancel()
+            shutil.rmtree(router._dir)
+        return router.stats()
+
+    assert asyncio.run(run()) == {"t0": {"depth": 0}}
@@ -1,5 +1,5 @@
 import pytest
-from bitget_trader.signals import Signal
+from bitget_trader.signals import Alert, AlertBatch, Signal
 
 def test_buy():
     j = {"auth":"tv_secret", "type": "buy", "symbol": "BTCUSDT", "amount": 100}
@@ -13,4 +13,26 @@ def test_buy():
 ])
 def test_bad(bad):
     with pytest.raises(ValueError):
-        Signal.from_json(bad)
\ No newline at end of file
+        Signal.from_json(bad)
+
+def test_alert_from_raw_bytes():
+    alert = Alert.model_validate_json(b'{"auth":"s","type":"buy","symbol":"btcusdt","amount":"25","users":[1,"b"]}')
+    sig = alert.signal()
+    assert alert.auth == "s"
+    assert (sig.type, sig.symbol, sig.amount, sig.users) == ("buy", "BTCUSDT", 25.0, ["1", "b"])
+
+@pytest.mark.parametrize("raw", [
+    b'{"type":"buy","symbol":"BTCUSDT","amount":-5}',
+    b'{"type":"sell","symbol":"BTC/USDT"}',
+    b'{"type":"sell","symbol":"BTCEUR"}',
+    b'{"type":"sell"}',
+])
+def test_bad_alert(raw):
+    with pytest.raises(ValueError):
+        Alert.model_validate_json(raw)
+
+def test_batch_needs_signals():
+    batch = AlertBatch.model_validate_json(b'{"auth":"s","signals":[{"type":"sell","symbol":"ETHUSDT"}]}')
+    assert [a.signal().symbol for a in batch.signals] == ["ETHUSDT"]
+    with pytest.raises(ValueError):
+        AlertBatch.model_validate_json(b'{"auth":"s","signals":[]}')
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.mock_bitget import make_market
+from bitget_trader.signals import Alert
+from bitget_trader.symbols import SymbolInfo, SymbolRegistry
+
+def test_rules_and_rounding():
+    registry = SymbolRegistry()
+    assert registry.update([make_market("BTC", amount_step=1e-6, min_cost=5), make_market("PEPE", amount_step=100),
+                            make_market("ETH", amount_step=0.0001) | {"active": False}]) == (2, 0, 0)
+    btc = registry.get("BTCUSDT")
+    assert (btc.symbol, btc.base, btc.quote, btc.min_cost, btc.amount_decimals) == ("BTC/USDT", "BTC", "USDT", 5.0, 6)
+    assert btc.round_amount(0.123456789) == 0.123456
+    assert SymbolInfo.from_market(make_market("X", amount_step=0.1)).round_amount(0.3) == 0.3
+    assert registry.info("PEPEUSDT").round_amount(12_345.6) == 12_300
+    assert "ETHUSDT" not in registry  # inactive
+    assert registry.info("ETHUSDT") == SymbolInfo.plain("ETHUSDT")
+    assert registry.info("ETHUSDT").round_amount(0.123456789) == 0.123456789
+    assert registry.id_of("BTC/USDT") == "BTCUSDT"
+
+def test_update_only_rebuilds_what_changed():
+    registry = SymbolRegistry()
+    registry.update([make_market("BTC"), make_market("ETH"), make_market("SOL")])
+    btc, eth, version = registry.get("BTCUSDT"), registry.get("ETHUSDT"), registry.version
+    assert registry.update([make_market("BTC"), make_market("ETH", min_cost=10), make_market("XRP")]) == (1, 1, 1)
+    assert registry.get("BTCUSDT") is btc and registry.get("ETHUSDT") is not eth
+    assert registry.get("ETHUSDT").min_cost == 10 and registry.get("SOLUSDT") is None
+    assert registry.version == version + 1
+    assert registry.update([make_market("BTC"), make_market("ETH", min_cost=10), make_market("XRP")]) == (0, 0, 0)
+    assert registry.version == version + 1
+
+@pytest.mark.parametrize("ticker", ["BTCUSDT", "btcusdt", "BITGET:BTCUSDT"])
+def test_alert_tickers_are_normalised(ticker):
+    assert Alert.model_validate({"type": "sell", "symbol": ticker}).symbol == "BTCUSDT"
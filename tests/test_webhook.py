@@ -0,0 +1,80 @@
+import asyncio
+
+from benchmarks.harness import alert, running_app
+from benchmarks.mock_bitget import MockBitget
+from bitget_trader import receiver
+from bitget_trader.config import settings
+
+def _post(path, body=None, content=None):
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=2) as client:
+            r = await client.post(path, json=body, content=content)
+            if r.status_code == 200:
+                await venue.wait_filled(r.json().get("count", 1) * 2, timeout=10)
+        return r, venue
+
+    return asyncio.run(run())
+
+def _batch(*signals, auth=None):
+    secret = settings.tradingview_secret.get_secret_value()
+    return {"auth": secret if auth is None else auth, "signals": list(signals)}
+
+def test_batch_queues_every_signal():
+    r, venue = _post("/webhook/batch", _batch(
+        {"type": "buy", "symbol": "BTCUSDT", "amount": 10},
+        {"type": "buy", "symbol": "ETHUSDT", "amount": 20},
+    ))
+    assert r.status_code == 200 and r.json() == {"status": "ok", "count": 2, "duplicates": 0}
+    assert sorted((o.key, o.symbol) for o in venue.log) == [
+        ("key0", "BTC/USDT"), ("key0", "ETH/USDT"), ("key1", "BTC/USDT"), ("key1", "ETH/USDT"),
+    ]
+
+def test_batch_with_an_unlisted_symbol_queues_nothing():
+    r, venue = _post("/webhook/batch", _batch(
+        {"type": "buy", "symbol": "BTCUSDT", "amount": 10},
+        {"type": "buy", "symbol": "NOPEUSDT", "amount": 10},
+    ))
+    assert r.status_code == 422
+    assert venue.log == []
+
+def test_batch_that_fails_part_way_reports_what_was_queued():
+    batch = _batch(
+        {"type": "buy", "symbol": "BTCUSDT", "amount": 10, "id": "p1"},
+        {"type": "buy", "symbol": "ETHUSDT", "amount": 20, "id": "p2"},
+    )
+
+    async def run():
+        venue = MockBitget(latency=0, fill_delay=0)
+        async with running_app(venue, traders=2) as client:
+            dispatcher = receiver._dispatcher
+            enqueue_many = dispatcher.enqueue_many
+
+            async def first_only(sigs):  # as a shard router whose second shard went away
+                await enqueue_many(sigs[:1])
+                raise ConnectionError("shard 1 went away before acknowledging")
+
+            dispatcher.enqueue_many = first_only
+            first = await client.post("/webhook/batch", json=batch)
+            del dispatcher.enqueue_many
+            retry = await client.post("/webhook/batch", json=batch)
+            await venue.wait_filled(4, timeout=10)
+            await asyncio.sleep(0.05)
+        return first.json(), retry.json(), venue
+
+    first, retry, venue = asyncio.run(run())
+    assert first == {"status": "partial", "count": 1, "failed": 1, "duplicates": 0}
+    assert retry == {"status": "ok", "count": 1, "duplicates": 1}
+    assert sorted((o.key, o.symbol) for o in venue.log) == [
+        ("key0", "BTC/USDT"), ("key0", "ETH/USDT"), ("key1", "BTC/USDT"), ("key1", "ETH/USDT"),
+    ]
+
+def test_batch_checks_the_secret():
+    r, _ = _post("/webhook/batch", _batch({"type": "sell", "symbol": "BTCUSDT"}, auth="wrong"))
+    assert r.status_code == 403
+
+def test_rejects_before_enqueue():
+    assert _post("/webhook", content=b"{not json")[0].status_code == 400
+    assert _post("/webhook", alert("buy", "BTCUSDT"))[0].status_code == 422  # no amount
+    assert _post("/webhook", alert("sell", "NOPEUSDT"))[0].status_code == 422
+    assert _post("/webhook", alert("buy", "BTCUSDT", 0.5))[0].status_code == 422  # below the minimum notional